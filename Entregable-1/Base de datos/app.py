@@ -1,36 +1,59 @@
 import pandas as pd
 import streamlit as st
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
 import matplotlib.pyplot as plt
 import io
+from indice_ventas import IndiceVentas
+from modelo_top import CacheModelos, marcar_top_10
+from cache_archivos import CacheArchivos
 
 st.set_page_config(page_title="Dashboard Inteligente Aurelion", layout="wide")
 
-# 📥 Carga flexible desde Excel
+# 📥 Carga flexible desde Excel (cada archivo se parsea una sola vez por contenido, ver cache_archivos.py)
+@st.cache_resource
+def cache_archivos():
+    return CacheArchivos()
+
 def cargar_archivo(nombre_archivo_default, key):
     archivo = st.sidebar.file_uploader(f"Subí el archivo: {nombre_archivo_default}", type=["xlsx"], key=key)
-    if archivo:
-        return pd.read_excel(archivo)
-    else:
-        return pd.read_excel(nombre_archivo_default)
+    return cache_archivos().leer_excel(archivo if archivo else nombre_archivo_default)
 
 # 📂 Cargar los datasets
-clientes = cargar_archivo("clientes.xlsx", "clientes")
-productos = cargar_archivo("productos.xlsx", "productos")
-ventas = cargar_archivo("ventas.xlsx", "ventas")
-detalle = cargar_archivo("detalle_ventas.xlsx", "detalle")
-
-# 🧩 Preparar y unir los datasets
-ventas["fecha"] = pd.to_datetime(ventas["fecha"])
-detalle = detalle.merge(productos[["id_producto", "categoria"]], on="id_producto", how="left")
-dataset = ventas.merge(detalle, on="id_venta", how="inner")
+clientes, _ = cargar_archivo("clientes.xlsx", "clientes")
+productos, clave_productos = cargar_archivo("productos.xlsx", "productos")
+ventas, clave_ventas = cargar_archivo("ventas.xlsx", "ventas")
+detalle, clave_detalle = cargar_archivo("detalle_ventas.xlsx", "detalle")
+
+# 🧠 Modelos entrenados, compartidos entre sesiones (LRU por huella de los datos filtrados)
+@st.cache_resource
+def cache_modelos():
+    return CacheModelos()
+
+modelos = cache_modelos()
+
+# 🧩 Preparar y unir los datasets, e indexarlos por fecha y categoría (una vez por set de archivos;
+# la clave es el hash de contenido, los DataFrames no se vuelven a hashear)
+@st.cache_resource(max_entries=4)
+def construir_indice(claves, _ventas, _detalle, _productos):
+    ventas, detalle, productos = _ventas, _detalle, _productos
+    ventas = ventas.assign(fecha=pd.to_datetime(ventas["fecha"]))
+    detalle = detalle.merge(productos[["id_producto", "categoria"]], on="id_producto", how="left")
+    dataset = ventas.merge(detalle, on="id_venta", how="inner")
+    indice = IndiceVentas(dataset)
+
+    # Entrenar en segundo plano la selección por defecto (rango completo, todas las categorías);
+    # acá corre una vez por índice y no en cada interacción
+    _, ventas_por_defecto = indice.filtrar(indice.fecha_min, indice.fecha_max, productos["categoria"].unique().tolist())
+    if len(ventas_por_defecto) >= 10:
+        cache_modelos().precalentar(marcar_top_10(ventas_por_defecto))
+    return indice
+
+indice = construir_indice((clave_ventas, clave_detalle, clave_productos), ventas, detalle, productos)
 
 # 🎛️ Filtros laterales
 st.sidebar.markdown("### Filtros")
 
-min_fecha = dataset["fecha"].min()
-max_fecha = dataset["fecha"].max()
+min_fecha = indice.fecha_min
+max_fecha = indice.fecha_max
 
 fecha_inicio = st.sidebar.date_input("Desde", min_fecha, min_value=min_fecha, max_value=max_fecha)
 fecha_fin = st.sidebar.date_input("Hasta", max_fecha, min_value=min_fecha, max_value=max_fecha)
@@ -38,17 +61,13 @@ fecha_fin = st.sidebar.date_input("Hasta", max_fecha, min_value=min_fecha, max_v
 categorias = productos["categoria"].unique().tolist()
 categoria_seleccionada = st.sidebar.multiselect("Filtrar por categoría", categorias, default=categorias)
 
-# 🔍 Aplicar filtros
-dataset_filtrado = dataset[
-    (dataset["fecha"] >= pd.to_datetime(fecha_inicio)) &
-    (dataset["fecha"] <= pd.to_datetime(fecha_fin)) &
-    (dataset["categoria"].isin(categoria_seleccionada))
-]
+# 🔍 Aplicar filtros (slice por fecha + posiciones por categoría, ver indice_ventas.py)
+kpis, ventas_por_producto = indice.filtrar(fecha_inicio, fecha_fin, categoria_seleccionada)
 
 # 📊 KPIs
-ventas_totales = dataset_filtrado["importe"].sum()
-clientes_unicos = dataset_filtrado["id_cliente"].nunique()
-productos_unicos = dataset_filtrado["id_producto"].nunique()
+ventas_totales = kpis["ventas_totales"]
+clientes_unicos = kpis["clientes_unicos"]
+productos_unicos = kpis["productos_unicos"]
 
 # 🧾 Título y métricas
 st.title("📊 Dashboard Inteligente - Aurelion")
@@ -60,32 +79,13 @@ col3.metric("📦 Productos vendidos", productos_unicos)
 
 st.markdown("---")
 
-# 📈 Análisis por producto
-ventas_por_producto = (
-    dataset_filtrado.groupby(["id_producto", "nombre_producto"])
-    .agg(
-        cantidad_total_vendida=("cantidad", "sum"),
-        precio_unitario=("precio_unitario", "mean"),
-        subtotal_total=("importe", "sum")
-    )
-    .reset_index()
-)
-
 # 🔮 Modelo predictivo de productos más vendidos
-ventas_por_producto["es_top_10"] = ventas_por_producto["cantidad_total_vendida"].rank(ascending=False) <= 10
-ventas_por_producto["es_top_10"] = ventas_por_producto["es_top_10"].astype(int)
-
-X = ventas_por_producto[["cantidad_total_vendida", "precio_unitario"]]
-y = ventas_por_producto["es_top_10"]
+marcar_top_10(ventas_por_producto)
 
-# Solo entrenar si hay suficientes datos
+# Solo entrenar si hay suficientes datos (un filtro ya visto reutiliza el modelo, ver modelo_top.py)
 if len(ventas_por_producto) >= 10:
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    modelo = RandomForestClassifier(n_estimators=100, random_state=42)
-    modelo.fit(X_train, y_train)
-
     # Generar predicciones
-    ventas_por_producto["prob_top"] = modelo.predict_proba(X)[:, 1]
+    ventas_por_producto["prob_top"] = modelos.predecir(ventas_por_producto)
     top_predichos = ventas_por_producto.sort_values("prob_top", ascending=False).head(5)
 
     # 📊 Gráfico: Top 10 productos históricos
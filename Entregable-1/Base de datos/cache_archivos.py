@@ -0,0 +1,90 @@
+"""
+cache_archivos.py
+Cache de planillas parseadas para app.py, por hash del contenido:
+- clave = SHA-256 de los bytes del .xlsx (subido o el de la carpeta): el mismo
+  archivo subido de nuevo, o por otra sesión, no se vuelve a parsear
+- compartido entre sesiones (app.py lo crea con st.cache_resource)
+- límite de memoria (MB de los DataFrames, memory_usage deep) y de entradas;
+  al pasarse se descartan los menos usados recientemente (LRU)
+- los archivos de la carpeta sólo se vuelven a leer si cambian tamaño o fecha
+
+Los DataFrames devueltos son compartidos: no modificarlos en el lugar.
+
+Uso:
+    cache = CacheArchivos()
+    df, clave = cache.leer_excel(archivo_subido_o_ruta)
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+MAX_MB = 256
+MAX_ENTRADAS = 32
+
+
+class CacheArchivos:
+    def __init__(self, max_mb=MAX_MB, max_entradas=MAX_ENTRADAS):
+        self.max_bytes = max_mb * 2**20
+        self.max_entradas = max_entradas
+        self._frames = OrderedDict()  # hash -> (DataFrame, bytes en memoria)
+        self._hash_ruta = {}          # (ruta, tamaño, mtime) -> hash, para no releer los archivos locales
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.lecturas = 0
+
+    def leer_excel(self, fuente):
+        """DataFrame de `fuente` (ruta o archivo subido) y la clave de su contenido."""
+        clave, contenido = self._clave(fuente)
+        with self._lock:
+            if clave in self._frames:
+                self._frames.move_to_end(clave)
+                self.aciertos += 1
+                return self._frames[clave][0], clave
+
+        df = pd.read_excel(fuente if contenido is None else io.BytesIO(contenido))
+        tamaño = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if clave not in self._frames:
+                self._frames[clave] = (df, tamaño)
+                self._bytes += tamaño
+                self.lecturas += 1
+                self._desalojar()
+        return df, clave
+
+    def _clave(self, fuente):
+        if isinstance(fuente, (str, os.PathLike)):
+            stat = os.stat(fuente)
+            firma = (os.fspath(fuente), stat.st_size, stat.st_mtime_ns)
+            with self._lock:
+                clave = self._hash_ruta.get(firma)
+            if clave is None:
+                with open(fuente, "rb") as f:
+                    clave = hashlib.sha256(f.read()).hexdigest()
+                with self._lock:
+                    # una sola firma por ruta: la versión anterior del archivo ya no sirve
+                    self._hash_ruta = {f: c for f, c in self._hash_ruta.items() if f[0] != firma[0]}
+                    self._hash_ruta[firma] = clave
+            return clave, None
+        contenido = fuente.getvalue()
+        return hashlib.sha256(contenido).hexdigest(), contenido
+
+    def _desalojar(self):
+        # Siempre queda al menos la última entrada, aunque sola supere el límite
+        while len(self._frames) > 1 and (self._bytes > self.max_bytes or len(self._frames) > self.max_entradas):
+            _, (_, tamaño) = self._frames.popitem(last=False)
+            self._bytes -= tamaño
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entradas": len(self._frames),
+                "mb": round(self._bytes / 2**20, 1),
+                "aciertos": self.aciertos,
+                "lecturas": self.lecturas,
+            }
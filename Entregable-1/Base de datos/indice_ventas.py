@@ -0,0 +1,117 @@
+"""
+indice_ventas.py
+Índice en memoria para los filtros de app.py (rango de fechas + categorías):
+- líneas de venta ordenadas por fecha: el rango se corta con searchsorted
+- posiciones por categoría (arrays ordenados): cada categoría elegida aporta sólo
+  las posiciones que caen dentro del rango, sin máscaras booleanas sobre todo el historial
+- agregados precalculados por día y producto (cantidad, importe, precio)
+- con todas las categorías elegidas el rango es un slice directo, sin índice
+
+Un cambio de filtro cuesta lo proporcional al rango elegido, no al historial completo.
+
+Uso:
+    indice = IndiceVentas(dataset)   # dataset = ventas + detalle + categoria
+    kpis, ventas_por_producto = indice.filtrar(fecha_inicio, fecha_fin, categorias)
+"""
+
+import numpy as np
+import pandas as pd
+
+UN_DIA = np.timedelta64(1, "D")
+
+
+class IndiceVentas:
+    def __init__(self, dataset):
+        lineas = dataset.sort_values("fecha", kind="stable", ignore_index=True)
+        self.fecha_min = lineas["fecha"].min()
+        self.fecha_max = lineas["fecha"].max()
+
+        # Nivel línea: sólo lo que no se puede agregar por día (clientes únicos)
+        self.fechas = lineas["fecha"].to_numpy()
+        self.clientes = lineas["id_cliente"].to_numpy()
+        categoria = pd.Categorical(lineas["categoria"])
+        self.categorias = list(categoria.categories)
+        self.pos_lineas = self._posiciones_por_categoria(categoria.codes)
+        self.lineas_sin_categoria = bool((categoria.codes < 0).any())
+
+        # Nivel día x producto: cantidad, importe y precio (suma + líneas para el promedio)
+        claves = [lineas["fecha"].dt.normalize().rename("dia"), "id_producto", "nombre_producto", "categoria"]
+        diario = (
+            lineas.groupby(claves, sort=True, dropna=False)
+            .agg(
+                cantidad=("cantidad", "sum"),
+                importe=("importe", "sum"),
+                precio_suma=("precio_unitario", "sum"),
+                n_lineas=("precio_unitario", "count"),
+            )
+            .reset_index()
+        )
+        self.dias = diario["dia"].to_numpy()
+        producto = diario.groupby(["id_producto", "nombre_producto"], sort=True, dropna=False).ngroup()
+        self.productos = (
+            diario[["id_producto", "nombre_producto"]]
+            .assign(codigo=producto.to_numpy())
+            .drop_duplicates("codigo")
+            .sort_values("codigo", ignore_index=True)
+            .drop(columns="codigo")
+        )
+        self.producto_diario = producto.to_numpy()
+        self.valores = {col: diario[col].to_numpy() for col in ("cantidad", "importe", "precio_suma", "n_lineas")}
+        self.tipos = {"cantidad": lineas["cantidad"].dtype, "importe": lineas["importe"].dtype}
+        self.pos_diario = self._posiciones_por_categoria(
+            pd.Categorical(diario["categoria"], categories=self.categorias).codes
+        )
+        self.diario_sin_categoria = bool(diario["categoria"].isna().any())
+
+    def _posiciones_por_categoria(self, codigos):
+        return {cat: np.flatnonzero(codigos == i) for i, cat in enumerate(self.categorias)}
+
+    # ---------------------------
+    # Consultas
+    # ---------------------------
+    @staticmethod
+    def _rango(valores, inicio, fin):
+        """[a, b) de las filas con inicio <= valor < fin + 1 día (el 'Hasta' incluye el día entero)."""
+        inicio = np.datetime64(pd.Timestamp(inicio), "ns")
+        fin = np.datetime64(pd.Timestamp(fin), "ns") + UN_DIA
+        return np.searchsorted(valores, inicio, side="left"), np.searchsorted(valores, fin, side="left")
+
+    def _seleccion(self, posiciones, sin_categoria, a, b, categorias):
+        """Slice si se eligieron todas las categorías; si no, las posiciones de cada una dentro de [a, b)."""
+        categorias = set(categorias)
+        elegidas = [c for c in self.categorias if c in categorias]
+        if len(elegidas) == len(self.categorias) and not sin_categoria:
+            return slice(a, b)
+        partes = []
+        for cat in elegidas:
+            pos = posiciones[cat]
+            partes.append(pos[np.searchsorted(pos, a):np.searchsorted(pos, b)])
+        if not partes:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(partes))
+
+    def filtrar(self, inicio, fin, categorias):
+        """KPIs y ventas por producto para el rango [inicio, fin] y las categorías elegidas."""
+        a, b = self._rango(self.dias, inicio, fin)
+        sel = self._seleccion(self.pos_diario, self.diario_sin_categoria, a, b, categorias)
+        codigos = self.producto_diario[sel]
+        n = len(self.productos)
+
+        def por_producto(col):
+            return np.bincount(codigos, weights=self.valores[col][sel], minlength=n)
+
+        n_lineas = por_producto("n_lineas")
+        vendidos = np.flatnonzero(n_lineas > 0)
+        ventas_por_producto = self.productos.iloc[vendidos].reset_index(drop=True)
+        ventas_por_producto["cantidad_total_vendida"] = por_producto("cantidad")[vendidos].astype(self.tipos["cantidad"])
+        ventas_por_producto["precio_unitario"] = por_producto("precio_suma")[vendidos] / n_lineas[vendidos]
+        ventas_por_producto["subtotal_total"] = por_producto("importe")[vendidos].astype(self.tipos["importe"])
+
+        a, b = self._rango(self.fechas, inicio, fin)
+        sel_lineas = self._seleccion(self.pos_lineas, self.lineas_sin_categoria, a, b, categorias)
+        kpis = {
+            "ventas_totales": ventas_por_producto["subtotal_total"].sum(),
+            "clientes_unicos": len(pd.unique(self.clientes[sel_lineas])),
+            "productos_unicos": ventas_por_producto["id_producto"].nunique(),
+        }
+        return kpis, ventas_por_producto
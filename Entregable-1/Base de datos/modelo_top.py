@@ -0,0 +1,101 @@
+"""
+modelo_top.py
+Entrenamiento memoizado del clasificador "¿es top 10?" de app.py:
+- clave = huella (hash) de los agregados por producto filtrados (X e y)
+- LRU acotado: se guardan los últimos MAX_MODELOS filtros (modelo + predict_proba)
+- un filtro que ya se entrenó no vuelve a entrenar, aunque lo pida otra sesión
+- si dos pedidos llegan a la vez con la misma huella, se entrena una sola vez
+- precalentar(): entrena en segundo plano la selección por defecto
+  (todas las categorías, rango completo) para que la primera carga no espere
+
+Uso:
+    modelos = CacheModelos()
+    modelos.precalentar(ventas_por_producto_default)
+    prob_top = modelos.predecir(ventas_por_producto)
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+MAX_MODELOS = 16
+FEATURES = ["cantidad_total_vendida", "precio_unitario"]
+TARGET = "es_top_10"
+
+
+def marcar_top_10(ventas_por_producto):
+    """Agrega la columna objetivo es_top_10 (1 si está entre los 10 más vendidos)."""
+    ventas_por_producto[TARGET] = (ventas_por_producto["cantidad_total_vendida"].rank(ascending=False) <= 10).astype(int)
+    return ventas_por_producto
+
+
+def huella(ventas_por_producto):
+    """Hash del contenido de X e y: mismo filtro efectivo => misma huella."""
+    filas = pd.util.hash_pandas_object(ventas_por_producto[FEATURES + [TARGET]], index=False)
+    return hashlib.sha1(filas.to_numpy().tobytes()).hexdigest()
+
+
+def entrenar(ventas_por_producto):
+    X = ventas_por_producto[FEATURES]
+    y = ventas_por_producto[TARGET]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    modelo = RandomForestClassifier(n_estimators=100, random_state=42)
+    modelo.fit(X_train, y_train)
+    return modelo, modelo.predict_proba(X)[:, 1]
+
+
+class CacheModelos:
+    def __init__(self, max_entradas=MAX_MODELOS):
+        self.max_entradas = max_entradas
+        self._modelos = OrderedDict()  # huella -> (modelo, prob_top)
+        self._en_curso = {}            # huella -> Event de quien está entrenando
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.entrenamientos = 0
+
+    def predecir(self, ventas_por_producto):
+        """prob_top para cada fila de ventas_por_producto (entrena sólo si la huella es nueva)."""
+        return self._obtener(huella(ventas_por_producto), ventas_por_producto)[1]
+
+    def precalentar(self, ventas_por_producto):
+        """Entrena en un hilo aparte si la huella no está ni en cache ni entrenándose."""
+        clave = huella(ventas_por_producto)
+        with self._lock:
+            if clave in self._modelos or clave in self._en_curso:
+                return
+        threading.Thread(target=self._obtener, args=(clave, ventas_por_producto), daemon=True).start()
+
+    def contiene(self, ventas_por_producto):
+        with self._lock:
+            return huella(ventas_por_producto) in self._modelos
+
+    def _obtener(self, clave, ventas_por_producto):
+        while True:
+            with self._lock:
+                if clave in self._modelos:
+                    self._modelos.move_to_end(clave)
+                    self.aciertos += 1
+                    return self._modelos[clave]
+                evento = self._en_curso.get(clave)
+                if evento is None:
+                    evento = self._en_curso[clave] = threading.Event()
+                    break
+            evento.wait()  # otro hilo está entrenando lo mismo; si falló, se reintenta acá
+
+        try:
+            resultado = entrenar(ventas_por_producto)
+            with self._lock:
+                self._modelos[clave] = resultado
+                self._modelos.move_to_end(clave)
+                while len(self._modelos) > self.max_entradas:
+                    self._modelos.popitem(last=False)
+                self.entrenamientos += 1
+            return resultado
+        finally:
+            with self._lock:
+                self._en_curso.pop(clave, None)
+            evento.set()
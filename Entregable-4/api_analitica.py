@@ -0,0 +1,434 @@
+"""
+api_analitica.py
+API HTTP local (sólo lectura) con los agregados del pipeline, para que los dashboards
+no tengan que leer ni agregar los Excel cada uno por su cuenta:
+- lee la última corrida publicada (artefactos/latest.json, ver artefactos.py) y
+  precalcula una vez por versión: KPIs, rankings, series mensuales, top clientes,
+  pronóstico y un cubo mes x categoría x medio de pago x producto
+- asyncio (un solo proceso atiende muchas conexiones; el cálculo pesado va a un hilo)
+- sólo en localhost (127.0.0.1)
+- respuestas en JSON o Arrow (IPC stream) con ETag / Last-Modified: un cliente que
+  repite la consulta con If-None-Match / If-Modified-Since recibe 304 sin cuerpo
+- si se publica una corrida nueva se recargan los agregados en segundo plano y
+  mientras tanto se sigue sirviendo la versión anterior
+
+Instrucciones:
+- Correr antes el pipeline (python proyecto_aurelion.py) para publicar artefactos
+- Iniciar la API:
+    python api_analitica.py --port 8700
+- Consultas (formato=json por defecto; formato=arrow o Accept: application/vnd.apache.arrow.stream):
+    curl localhost:8700/kpis
+    curl "localhost:8700/rankings/predicho?top=5"
+    curl "localhost:8700/series/mensual?id_producto=18"
+    curl "localhost:8700/cubo?dims=mes,categoria&medio_pago=qr&desde=2024-03"
+    curl "localhost:8700/clientes/top?top=10"
+    curl localhost:8700/pronostico
+- Desde Python (cliente liviano con cache por ETag):
+    from api_analitica import consultar
+    df = consultar("/cubo?dims=categoria")
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import json
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from artefactos import ArtifactReader, ARTIFACTS_ROOT
+
+HOST = "127.0.0.1"
+PORT = 8700
+REFRESCO_S = 2.0          # cada cuánto se mira si hay una corrida nueva (sólo lee latest.json)
+MAX_RESPUESTAS = 512      # respuestas serializadas en cache (LRU) por versión
+MAX_CABECERAS = 64 * 1024
+BACKLOG = 256             # conexiones en espera: ráfagas de clientes concurrentes
+TOP_DEFAULT = 10
+DIMENSIONES = ("mes", "categoria", "medio_pago", "id_producto")
+MEDIDAS = ("cantidad", "importe", "lineas")
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+
+
+class ErrorApi(Exception):
+    def __init__(self, status, mensaje):
+        super().__init__(mensaje)
+        self.status = status
+
+
+# ---------------------------
+# Agregados precalculados (uno por versión de artefactos)
+# ---------------------------
+class Agregados:
+    """Todo lo que sirve la API, calculado una sola vez a partir de una corrida."""
+
+    def __init__(self, data, version, creado):
+        import pandas as pd
+
+        self.version = version
+        self.creado = creado
+        self.rankings = {
+            "historico": data.get("ranking_historico"),
+            "predicho": data.get("ranking_predicho"),
+        }
+        self.pronostico = data.get("pronostico")
+        self.kpis = self.cubo = self.clientes = None
+
+        merged = data.get("dataset_unificado")
+        if merged is None:
+            return  # corrida fuera de memoria: no publica el dataset unificado
+        nombre = "nombre_producto" if "nombre_producto" in merged.columns else "nombre_producto_x"
+        hechos = pd.DataFrame({
+            "mes": pd.to_datetime(merged["fecha"]).dt.strftime("%Y-%m"),
+            "categoria": merged.get("categoria", pd.Series("sin categoría", index=merged.index)).fillna("sin categoría"),
+            "medio_pago": merged.get("medio_pago", pd.Series("-", index=merged.index)).fillna("-"),
+            "id_producto": merged["id_producto"],
+            "cantidad": merged["cantidad"],
+            "importe": merged["importe"] if "importe" in merged.columns else merged["cantidad"] * merged["precio_unitario"],
+        })
+        self.cubo = (
+            hechos.groupby(list(DIMENSIONES), observed=True)
+            .agg(cantidad=("cantidad", "sum"), importe=("importe", "sum"), lineas=("cantidad", "size"))
+            .reset_index()
+        )
+        self.productos = merged.groupby("id_producto")[nombre].first()
+        self.kpis = {
+            "version": version,
+            "ventas": int(merged["id_venta"].nunique()),
+            "lineas": int(len(merged)),
+            "unidades": int(merged["cantidad"].sum()),
+            "importe": float(hechos["importe"].sum()),
+            "clientes": int(merged["id_cliente"].nunique()),
+            "productos": int(merged["id_producto"].nunique()),
+            "desde": hechos["mes"].min(),
+            "hasta": hechos["mes"].max(),
+        }
+        if "nombre_cliente" in merged.columns:
+            self.clientes = (
+                merged.groupby("nombre_cliente")
+                .agg(cantidad=("cantidad", "sum"), importe=("importe", "sum"), compras=("id_venta", "nunique"))
+                .sort_values("cantidad", ascending=False)
+                .reset_index()
+            )
+
+    def _requiere_hechos(self):
+        if self.cubo is None:
+            raise ErrorApi(404, "La corrida no incluye dataset_unificado (pipeline --fuera-de-memoria)")
+
+    def consulta(self, ruta, params):
+        """Resultado de una ruta: dict (JSON) o DataFrame (JSON por filas o Arrow)."""
+        if ruta == "/kpis":
+            self._requiere_hechos()
+            return self.kpis
+        if ruta.startswith("/rankings/"):
+            ranking = self.rankings.get(ruta.rsplit("/", 1)[1])
+            if ranking is None:
+                raise ErrorApi(404, f"Ranking desconocido: {ruta}")
+            return ranking.head(_entero(params, "top", len(ranking), minimo=1))
+        if ruta == "/pronostico":
+            if self.pronostico is None:
+                raise ErrorApi(404, "La corrida no incluye pronóstico (--horizonte 0)")
+            return self.pronostico.head(_entero(params, "top", len(self.pronostico), minimo=1))
+        if ruta == "/clientes/top":
+            self._requiere_hechos()
+            if self.clientes is None:
+                raise ErrorApi(404, "El dataset unificado no tiene nombre_cliente")
+            return self.clientes.head(_entero(params, "top", TOP_DEFAULT, minimo=1))
+        if ruta == "/series/mensual":
+            self._requiere_hechos()
+            return self.corte(["mes"], params)
+        if ruta == "/cubo":
+            self._requiere_hechos()
+            dims = [d for d in params.get("dims", "mes").split(",") if d]
+            desconocidas = set(dims) - set(DIMENSIONES)
+            if desconocidas:
+                raise ErrorApi(400, f"Dimensiones desconocidas: {sorted(desconocidas)} (válidas: {list(DIMENSIONES)})")
+            return self.corte(dims, params)
+        raise ErrorApi(404, f"Ruta desconocida: {ruta}")
+
+    def corte(self, dims, params):
+        """Filtra el cubo (categoria, medio_pago, id_producto, desde/hasta YYYY-MM) y lo agrupa por dims."""
+        cubo = self.cubo
+        for dim in ("categoria", "medio_pago"):
+            if dim in params:
+                cubo = cubo[cubo[dim].isin(params[dim].split(","))]
+        if "id_producto" in params:
+            ids = [_a_entero(v, "id_producto") for v in params["id_producto"].split(",")]
+            cubo = cubo[cubo["id_producto"].isin(ids)]
+        if "desde" in params:
+            cubo = cubo[cubo["mes"] >= params["desde"]]
+        if "hasta" in params:
+            cubo = cubo[cubo["mes"] <= params["hasta"]]
+        if not dims:
+            return cubo[list(MEDIDAS)].sum().to_frame().T
+        resultado = cubo.groupby(dims, observed=True)[list(MEDIDAS)].sum().reset_index()
+        if "id_producto" in dims:
+            resultado.insert(dims.index("id_producto") + 1, "nombre_producto",
+                             resultado["id_producto"].map(self.productos))
+        return resultado
+
+
+def _a_entero(valor, nombre):
+    try:
+        return int(valor)
+    except ValueError:
+        raise ErrorApi(400, f"'{nombre}' debe ser un entero: {valor!r}")
+
+
+def _entero(params, nombre, default, minimo=None):
+    if nombre not in params:
+        return default
+    valor = _a_entero(params[nombre], nombre)
+    if minimo is not None and valor < minimo:
+        raise ErrorApi(400, f"'{nombre}' debe ser >= {minimo}: {valor}")
+    return valor
+
+
+# ---------------------------
+# Serialización
+# ---------------------------
+def serializar(resultado, formato):
+    """Devuelve (cuerpo, content-type) en JSON o Arrow IPC stream."""
+    import pandas as pd
+
+    if formato == "arrow":
+        if not ARROW_AVAILABLE:
+            raise ErrorApi(406, "Formato arrow no disponible: pip install pyarrow")
+        import pyarrow as pa
+        df = pd.DataFrame([resultado]) if isinstance(resultado, dict) else resultado
+        tabla = pa.Table.from_pandas(df.rename(columns=str), preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, tabla.schema) as writer:
+            writer.write_table(tabla)
+        return sink.getvalue().to_pybytes(), ARROW_MIME
+    if isinstance(resultado, dict):
+        return json.dumps(resultado, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+    cuerpo = resultado.to_json(orient="records", date_format="iso", force_ascii=False)
+    return cuerpo.encode("utf-8"), "application/json; charset=utf-8"
+
+
+# ---------------------------
+# Servidor
+# ---------------------------
+class ApiAnalitica:
+    """Estado compartido de la API: agregados de la versión servida + respuestas serializadas."""
+
+    def __init__(self, root=ARTIFACTS_ROOT, refresco_s=REFRESCO_S):
+        self.reader = ArtifactReader(root)
+        self.refresco_s = refresco_s
+        self.agregados = None
+        self.respuestas = OrderedDict()  # (version, ruta, params, formato) -> (cuerpo, tipo, etag)
+        self._ultimo_chequeo = 0.0
+        self._recarga = None
+        self.stats = {"requests": 0, "304": 0, "cache_hits": 0, "recargas": 0}
+
+    async def _recargar(self):
+        try:
+            changed = await asyncio.to_thread(self.reader.refresh)
+        except FileNotFoundError:
+            if self.agregados is None:
+                raise
+            return  # se borró el puntero: se sigue sirviendo lo que ya está cargado
+        if changed or self.agregados is None:
+            data, version = self.reader.snapshot()
+            creado = self.reader.manifest.get("created", time.time())
+            self.agregados = await asyncio.to_thread(Agregados, data, version, creado)
+            self.respuestas.clear()
+            self.stats["recargas"] += 1
+            print(f"Agregados listos para la versión {version}")
+
+    async def actuales(self):
+        """Agregados servidos; si pasó REFRESCO_S, mira (en segundo plano) si hay corrida nueva."""
+        ahora = time.monotonic()
+        if (self._recarga is None or self._recarga.done()) and ahora - self._ultimo_chequeo >= self.refresco_s:
+            self._ultimo_chequeo = ahora
+            self._recarga = asyncio.create_task(self._recargar())
+        if self.agregados is None:
+            try:
+                await self._recarga  # la primera vez no hay nada que servir mientras tanto
+            except FileNotFoundError as e:
+                raise ErrorApi(503, str(e))
+        return self.agregados
+
+    async def respuesta(self, ruta, params, formato):
+        agregados = await self.actuales()
+        clave = (agregados.version, ruta, tuple(sorted(params.items())), formato)
+        if clave in self.respuestas:
+            self.respuestas.move_to_end(clave)
+            self.stats["cache_hits"] += 1
+            return self.respuestas[clave], agregados
+
+        def construir():
+            cuerpo, tipo = serializar(agregados.consulta(ruta, params), formato)
+            return cuerpo, tipo, '"' + hashlib.sha1(cuerpo).hexdigest()[:20] + '"'
+
+        entrada = await asyncio.to_thread(construir)
+        self.respuestas[clave] = entrada
+        while len(self.respuestas) > MAX_RESPUESTAS:
+            self.respuestas.popitem(last=False)
+        return entrada, agregados
+
+    # --- HTTP/1.1 mínimo: GET/HEAD, keep-alive ---
+    async def atender(self, reader, writer):
+        try:
+            while True:
+                try:
+                    cabecera = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lineas = cabecera.decode("latin-1").split("\r\n")
+                try:
+                    metodo, destino, protocolo = lineas[0].split(" ", 2)
+                except ValueError:
+                    await self._enviar(writer, 400, {"error": "Request mal formado"}, cerrar=True)
+                    break
+                headers = {}
+                for linea in lineas[1:]:
+                    if ":" in linea:
+                        nombre, valor = linea.split(":", 1)
+                        headers[nombre.strip().lower()] = valor.strip()
+                conexion = headers.get("connection", "").lower()
+                cerrar = conexion == "close" or (protocolo == "HTTP/1.0" and conexion != "keep-alive")
+                await self._despachar(writer, metodo, destino, headers, cerrar)
+                if cerrar:
+                    break
+        finally:
+            writer.close()
+
+    async def _despachar(self, writer, metodo, destino, headers, cerrar):
+        self.stats["requests"] += 1
+        if metodo not in ("GET", "HEAD"):
+            await self._enviar(writer, 405, {"error": "API de sólo lectura (GET/HEAD)"}, cerrar, extra={"Allow": "GET, HEAD"})
+            return
+        url = urlsplit(destino)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        formato = params.pop("formato", None) or ("arrow" if ARROW_MIME in headers.get("accept", "") else "json")
+        if url.path == "/health":
+            await self._enviar(writer, 200, {"status": "ok", "version": self.agregados and self.agregados.version,
+                                             **self.stats}, cerrar)
+            return
+        try:
+            (cuerpo, tipo, etag), agregados = await self.respuesta(url.path.rstrip("/") or "/", params, formato)
+        except ErrorApi as e:
+            await self._enviar(writer, e.status, {"error": str(e)}, cerrar)
+            return
+        except Exception as e:
+            await self._enviar(writer, 500, {"error": f"{type(e).__name__}: {e}"}, cerrar)
+            return
+
+        cache_headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(agregados.creado, usegmt=True),
+            "Cache-Control": "no-cache",  # siempre revalidar: la respuesta 304 no lleva cuerpo
+            "X-Version-Datos": agregados.version,
+        }
+        if _no_modificado(headers, etag, agregados.creado):
+            self.stats["304"] += 1
+            await self._enviar_crudo(writer, 304, b"", None, cerrar, cache_headers, metodo)
+        else:
+            await self._enviar_crudo(writer, 200, cuerpo, tipo, cerrar, cache_headers, metodo)
+
+    async def _enviar(self, writer, status, payload, cerrar, extra=None):
+        cuerpo = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await self._enviar_crudo(writer, status, cuerpo, "application/json; charset=utf-8", cerrar, extra or {})
+
+    async def _enviar_crudo(self, writer, status, cuerpo, tipo, cerrar, headers, metodo="GET"):
+        lineas = [f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}"]
+        if tipo:
+            lineas.append(f"Content-Type: {tipo}")
+        lineas.append(f"Content-Length: {len(cuerpo) if status != 304 else 0}")
+        lineas += [f"{k}: {v}" for k, v in headers.items()]
+        if cerrar:
+            lineas.append("Connection: close")
+        writer.write(("\r\n".join(lineas) + "\r\n\r\n").encode("latin-1"))
+        if metodo != "HEAD" and status != 304:
+            writer.write(cuerpo)
+        await writer.drain()
+
+
+_MOTIVOS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 406: "Not Acceptable", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+def _no_modificado(headers, etag, creado):
+    if "if-none-match" in headers:
+        etags = [e.strip() for e in headers["if-none-match"].split(",")]
+        return etag in etags or "*" in etags
+    if "if-modified-since" in headers:
+        try:
+            return int(creado) <= parsedate_to_datetime(headers["if-modified-since"]).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def _servir(port, root, refresco_s):
+    api = ApiAnalitica(root, refresco_s)
+    servidor = await asyncio.start_server(api.atender, HOST, port, limit=MAX_CABECERAS, backlog=BACKLOG)
+    print(f"API analítica escuchando en http://{HOST}:{port} (artefactos: {root}; Ctrl+C para salir)")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def serve(port=PORT, root=ARTIFACTS_ROOT, refresco_s=REFRESCO_S):
+    try:
+        asyncio.run(_servir(port, root, refresco_s))
+    except KeyboardInterrupt:
+        pass
+
+
+# ---------------------------
+# Cliente liviano para los dashboards
+# ---------------------------
+_CACHE_CLIENTE = {}
+
+
+def consultar(ruta, port=PORT, formato="arrow" if ARROW_AVAILABLE else "json", timeout=10):
+    """
+    GET a la API con cache por ETag: si los datos no cambiaron el servidor responde 304
+    y se devuelve el resultado anterior sin volver a deserializarlo.
+    Devuelve un DataFrame (o un dict para /kpis en JSON).
+    """
+    import urllib.error
+    import urllib.request
+    import pandas as pd
+
+    url = f"http://{HOST}:{port}{ruta}{'&' if '?' in ruta else '?'}formato={formato}"
+    request = urllib.request.Request(url)
+    anterior = _CACHE_CLIENTE.get(url)
+    if anterior is not None:
+        request.add_header("If-None-Match", anterior[0])
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            cuerpo, etag = response.read(), response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and anterior is not None:
+            return anterior[1]
+        raise RuntimeError(f"API analítica {e.code}: {e.read().decode('utf-8', 'replace')}") from None
+
+    if formato == "arrow":
+        import pyarrow as pa
+        resultado = pa.ipc.open_stream(cuerpo).read_all().to_pandas()
+    else:
+        datos = json.loads(cuerpo)
+        resultado = datos if isinstance(datos, dict) else pd.DataFrame(datos)
+    _CACHE_CLIENTE[url] = (etag, resultado)
+    return resultado
+
+
+# ---------------------------
+# Main
+# ---------------------------
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="API local de sólo lectura con los agregados del pipeline")
+    parser.add_argument("--port", type=int, default=PORT, help="Puerto HTTP en 127.0.0.1.")
+    parser.add_argument("--artefactos", type=Path, default=ARTIFACTS_ROOT, help="Carpeta de artefactos publicada por el pipeline.")
+    parser.add_argument("--refresco", type=float, default=REFRESCO_S, help="Segundos entre chequeos de corrida nueva.")
+    args = parser.parse_args()
+
+    serve(args.port, args.artefactos, args.refresco)
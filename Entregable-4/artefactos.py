@@ -0,0 +1,187 @@
+"""
+artefactos.py
+Escritura de artefactos del pipeline en directorios versionados y atómicos:
+- cada corrida se escribe en artefactos/runs/<version>/ (primero en una carpeta .tmp)
+- tablas en Parquet (CSV si no hay pyarrow/fastparquet) y modelo joblib comprimido
+- manifest.json con hash, filas y columnas de cada artefacto
+- al terminar se renombra la carpeta y se reemplaza el puntero artefactos/latest.json
+  con os.replace (atómico): un lector nunca ve una corrida a medio escribir
+- ArtifactReader detecta el cambio de puntero y recarga SÓLO los artefactos cuyo hash cambió
+
+Uso:
+    from artefactos import publish_run, ArtifactReader
+    publish_run({"ranking_predicho": df, ...}, model=model)
+    reader = ArtifactReader()
+    cambiados = reader.refresh()      # set con los nombres recargados
+    df = reader.get("ranking_predicho")
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+ARTIFACTS_ROOT = Path("artefactos")
+LATEST_POINTER = "latest.json"
+KEEP_RUNS = 5  # corridas que se conservan en disco
+PARQUET_AVAILABLE = any(importlib.util.find_spec(m) is not None for m in ("pyarrow", "fastparquet"))
+
+
+# ---------------------------
+# Escritura
+# ---------------------------
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_table(df, path_base):
+    """Escribe un DataFrame como Parquet (o CSV de respaldo). Devuelve la ruta escrita."""
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]  # Parquet exige nombres de columna string
+    if PARQUET_AVAILABLE:
+        path = path_base.with_suffix(".parquet")
+        df.to_parquet(path, index=False)
+    else:
+        path = path_base.with_suffix(".csv")
+        df.to_csv(path, index=False)
+    return path
+
+
+def publish_run(tables, model=None, root=ARTIFACTS_ROOT, keep=KEEP_RUNS):
+    """
+    Escribe una corrida completa y mueve el puntero `latest` de forma atómica.
+    tables: dict nombre -> DataFrame. Devuelve la carpeta de la corrida.
+    """
+    import joblib
+
+    root = Path(root)
+    runs_dir = root / "runs"
+    runs_dir.mkdir(parents=True, exist_ok=True)
+    version = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+    tmp_dir = runs_dir / f".{version}.tmp"
+    tmp_dir.mkdir()
+
+    manifest = {"version": version, "created": time.time(), "artifacts": {}}
+    try:
+        for name, df in tables.items():
+            if df is None:
+                continue
+            path = _write_table(df, tmp_dir / name)
+            manifest["artifacts"][name] = {
+                "file": path.name,
+                "kind": "table",
+                "sha256": _sha256(path),
+                "rows": int(len(df)),
+                "columns": [str(c) for c in df.columns],
+            }
+        if model is not None:
+            path = tmp_dir / "model_random_forest.joblib"
+            joblib.dump(model, path, compress=3)
+            manifest["artifacts"]["model"] = {"file": path.name, "kind": "model", "sha256": _sha256(path)}
+        (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+        # 1) la corrida aparece completa de una vez; 2) el puntero cambia de una vez
+        run_dir = runs_dir / version
+        os.replace(tmp_dir, run_dir)
+        pointer_tmp = root / f".{LATEST_POINTER}.{uuid.uuid4().hex[:6]}.tmp"
+        pointer_tmp.write_text(json.dumps({"version": version, "path": f"runs/{version}"}), encoding="utf-8")
+        os.replace(pointer_tmp, root / LATEST_POINTER)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    _prune(runs_dir, keep)
+    print(f"Artefactos publicados en {run_dir} (latest -> {version})")
+    return run_dir
+
+
+def _prune(runs_dir, keep):
+    """Borra las corridas más viejas (un lector con la corrida abierta mantiene sus datos en memoria)."""
+    runs = sorted(p for p in runs_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in runs[:-keep] if keep else []:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+# ---------------------------
+# Lectura con recarga selectiva
+# ---------------------------
+class ArtifactReader:
+    """
+    Mantiene en memoria los artefactos de la corrida `latest`.
+    refresh() es barato si el puntero no cambió (sólo lee latest.json).
+    """
+
+    def __init__(self, root=ARTIFACTS_ROOT):
+        self.root = Path(root)
+        self.version = None
+        self.manifest = {"artifacts": {}}
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def latest_version(self):
+        pointer = self.root / LATEST_POINTER
+        if not pointer.exists():
+            return None
+        return json.loads(pointer.read_text(encoding="utf-8"))
+
+    def refresh(self):
+        """Si `latest` cambió, recarga sólo los artefactos con hash distinto. Devuelve sus nombres."""
+        pointer = self.latest_version()
+        if pointer is None:
+            raise FileNotFoundError(f"No hay corridas publicadas en {self.root} (ejecutar el pipeline)")
+        if pointer["version"] == self.version:
+            return set()
+
+        run_dir = self.root / pointer["path"]
+        manifest = json.loads((run_dir / "manifest.json").read_text(encoding="utf-8"))
+        previous = self.manifest["artifacts"]
+        changed = {
+            name for name, meta in manifest["artifacts"].items()
+            if previous.get(name, {}).get("sha256") != meta["sha256"]
+        }
+        loaded = {name: self._load(run_dir, manifest["artifacts"][name]) for name in changed}
+        with self.lock:
+            for name in set(self.data) - set(manifest["artifacts"]):
+                del self.data[name]
+            self.data.update(loaded)
+            self.version = pointer["version"]
+            self.manifest = manifest
+        return changed
+
+    def _load(self, run_dir, meta):
+        path = run_dir / meta["file"]
+        if meta["kind"] == "model":
+            import joblib
+            return joblib.load(path)
+        import pandas as pd
+        return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+
+    def get(self, name):
+        with self.lock:
+            return self.data[name]
+
+    def snapshot(self):
+        """Copia consistente (misma versión) de todos los artefactos cargados."""
+        with self.lock:
+            return dict(self.data), self.version
+
+
+_READERS = {}
+
+
+def shared_reader(root=ARTIFACTS_ROOT):
+    """Un ArtifactReader por carpeta y por proceso (sobrevive a los reruns de Streamlit)."""
+    key = str(Path(root).resolve())
+    if key not in _READERS:
+        _READERS[key] = ArtifactReader(root)
+    return _READERS[key]
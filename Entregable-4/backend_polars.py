@@ -0,0 +1,203 @@
+"""
+backend_polars.py
+Backend alternativo con Polars (lazy) para el merge y la agregación mensual:
+- mismas entradas (los 4 DataFrames de load_datasets) y mismas salidas que
+  preprocess_and_merge / build_monthly_table (dataset unificado y pivot)
+- plan lazy: Polars optimiza el query (proyecciones, joins) y ejecuta multi-hilo
+- se elige con `python proyecto_aurelion.py --backend polars`
+- verificación contra el backend pandas + benchmark lado a lado
+
+Instrucciones:
+- Requiere: pip install polars pyarrow
+- Verificar y comparar tiempos:
+    python backend_polars.py
+    python backend_polars.py --escala 200 --repeats 5   # detalle de ventas replicado x200
+"""
+
+import time
+
+# Mismo esquema de nombres que pd.merge(..., suffixes=("_x", "_y"))
+SUFFIXES = ("_x", "_y")
+
+
+def _lazy(df):
+    import polars as pl
+    return pl.from_pandas(df).lazy()
+
+
+def _join_like_pandas(left, right, on, left_cols, right_cols):
+    """Left join que renombra columnas repetidas con _x/_y igual que pandas."""
+    overlap = (set(left_cols) & set(right_cols)) - {on}
+    left = left.rename({c: c + SUFFIXES[0] for c in overlap})
+    right = right.rename({c: c + SUFFIXES[1] for c in overlap})
+    columns = [c + SUFFIXES[0] if c in overlap else c for c in left_cols]
+    columns += [c + SUFFIXES[1] if c in overlap else c for c in right_cols if c != on]
+    # maintain_order="left": mismo orden de filas que pd.merge(how="left")
+    return left.join(right, on=on, how="left", coalesce=True, maintain_order="left"), columns
+
+
+# ---------------------------
+# Merge y agregación (lazy)
+# ---------------------------
+def merge_lazy(dfs):
+    """Plan lazy del dataset unificado (ventas + detalle + productos)."""
+    import polars as pl
+
+    ventas, detalle = dfs["ventas"], dfs["detalle"]
+    productos = dfs.get("productos")
+    detalle_cols = ["precio_unitario_detalle" if c == "precio_unitario" else c for c in detalle.columns]
+    merged, columns = _join_like_pandas(
+        _lazy(ventas),
+        _lazy(detalle).rename({"precio_unitario": "precio_unitario_detalle"} if "precio_unitario" in detalle.columns else {}),
+        "id_venta",
+        list(ventas.columns),
+        detalle_cols,
+    )
+    if productos is not None and len(productos.columns):
+        productos_cols = ["precio_unitario_producto" if c == "precio_unitario" else c for c in productos.columns]
+        merged, columns = _join_like_pandas(
+            merged,
+            _lazy(productos).rename({"precio_unitario": "precio_unitario_producto"} if "precio_unitario" in productos.columns else {}),
+            "id_producto",
+            columns,
+            productos_cols,
+        )
+
+    # Unificar precio (detalle manda; si falta, el de la tabla productos) y quitar auxiliares
+    precio_cols = [c for c in ("precio_unitario_detalle", "precio_unitario_producto") if c in columns]
+    if precio_cols:
+        merged = merged.with_columns(pl.coalesce([pl.col(c).cast(pl.Float64) for c in precio_cols]).alias("precio_unitario"))
+    columns = [c for c in columns if c not in precio_cols] + (["precio_unitario"] if precio_cols else [])
+    return merged.select(columns)
+
+
+def monthly_lazy(merged_lazy):
+    """Plan lazy de cantidades por (producto, mes)."""
+    import polars as pl
+    return (
+        merged_lazy
+        .select(["id_producto", "fecha", "cantidad"])
+        .with_columns(pl.col("fecha").dt.truncate("1mo").alias("period"))
+        # pandas groupby descarta claves nulas (ventas sin detalle); Polars las conserva
+        .filter(pl.col("id_producto").is_not_null() & pl.col("period").is_not_null())
+        .group_by(["id_producto", "period"])
+        .agg(pl.col("cantidad").sum())
+    )
+
+
+def preprocess_and_merge(dfs):
+    """Equivalente Polars de proyecto_aurelion.preprocess_and_merge (devuelve pandas)."""
+    return _to_pandas_like(merge_lazy(dfs).collect(), dfs)
+
+
+def build_monthly_table(merged_df):
+    """Equivalente Polars de proyecto_aurelion.build_monthly_table (devuelve pandas)."""
+    monthly = monthly_lazy(_lazy(merged_df[["id_producto", "fecha", "cantidad"]])).collect()
+    return _pivot_to_pandas(monthly, merged_df["id_producto"].dtype)
+
+
+def merge_and_pivot(dfs):
+    """Merge + pivot en un solo plan: el pivot no necesita materializar el merge completo dos veces."""
+    import polars as pl
+    merged_lazy = merge_lazy(dfs)
+    merged, monthly = pl.collect_all([merged_lazy, monthly_lazy(merged_lazy)])
+    merged = _to_pandas_like(merged, dfs)
+    return merged, _pivot_to_pandas(monthly, merged["id_producto"].dtype)
+
+
+# ---------------------------
+# Conversión a pandas con los mismos tipos que el backend pandas
+# ---------------------------
+def _to_pandas_like(merged, dfs):
+    df = merged.to_pandas()
+    # dtype de origen de cada columna (también para las renombradas con _x/_y)
+    origen = {}
+    for source in dfs.values():
+        for col, dtype in source.dtypes.items():
+            for name in (col, col + SUFFIXES[0], col + SUFFIXES[1]):
+                origen.setdefault(name, dtype)
+    origen["precio_unitario"] = dfs["detalle"].dtypes.get("precio_unitario", origen.get("precio_unitario"))
+    for col in df.columns:
+        dtype = origen.get(col)
+        # pandas conserva el dtype original cuando el merge no introdujo nulos
+        if dtype is not None and df[col].dtype != dtype and not df[col].isna().any():
+            try:
+                df[col] = df[col].astype(dtype)
+            except (TypeError, ValueError):
+                pass
+    return df
+
+
+def _pivot_to_pandas(monthly, id_dtype=None):
+    monthly = monthly.to_pandas()
+    if id_dtype is not None:
+        # Con ventas sin detalle pandas deja id_producto en float (por los NaN del merge)
+        monthly["id_producto"] = monthly["id_producto"].astype(id_dtype)
+    pivot = monthly.pivot(index="id_producto", columns="period", values="cantidad").fillna(0).astype("float64")
+    pivot = pivot.sort_index().sort_index(axis=1)
+    return pivot
+
+
+# ---------------------------
+# Verificación y benchmark
+# ---------------------------
+def replicate_sales(dfs, factor):
+    """Replica ventas/detalle `factor` veces con ids nuevos (para medir con más volumen)."""
+    import pandas as pd
+    if factor <= 1:
+        return dfs
+    ventas, detalle = dfs["ventas"], dfs["detalle"]
+    offset = int(ventas["id_venta"].max()) + 1
+    ventas = pd.concat([ventas.assign(id_venta=ventas["id_venta"] + i * offset) for i in range(factor)], ignore_index=True)
+    detalle = pd.concat([detalle.assign(id_venta=detalle["id_venta"] + i * offset) for i in range(factor)], ignore_index=True)
+    return {**dfs, "ventas": ventas, "detalle": detalle}
+
+
+def add_sale_without_lines(dfs):
+    """Agrega una venta sin renglones de detalle (el merge deja id_producto nulo)."""
+    import pandas as pd
+    ventas = dfs["ventas"]
+    extra = ventas.tail(1).assign(id_venta=int(ventas["id_venta"].max()) + 1)
+    return {**dfs, "ventas": pd.concat([ventas, extra], ignore_index=True)}
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+    import proyecto_aurelion as pa
+
+    parser = argparse.ArgumentParser(description="Verifica el backend Polars contra pandas y compara tiempos")
+    parser.add_argument("--escala", type=int, default=1, help="Factor de replicación de ventas/detalle.")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    dfs = add_sale_without_lines(replicate_sales(pa.standardize_columns(pa.load_datasets()), args.escala))
+    print(f"Detalle de ventas: {len(dfs['detalle']):,} filas")
+
+    def run_pandas():
+        merged = pa.preprocess_and_merge({k: v.copy() for k, v in dfs.items()})
+        return merged, pa.build_monthly_table(merged)
+
+    def run_polars():
+        return merge_and_pivot(dfs)
+
+    resultados, tiempos = {}, {}
+    for name, fn in (("pandas", run_pandas), ("polars", run_polars)):
+        fn()  # warm-up
+        muestras = []
+        for _ in range(args.repeats):
+            t0 = time.perf_counter()
+            resultados[name] = fn()
+            muestras.append(time.perf_counter() - t0)
+        tiempos[name] = min(muestras)
+
+    merged_pd, pivot_pd = resultados["pandas"]
+    merged_pl, pivot_pl = resultados["polars"]
+    pd.testing.assert_frame_equal(merged_pd.reset_index(drop=True), merged_pl.reset_index(drop=True))
+    pd.testing.assert_frame_equal(pivot_pd, pivot_pl)
+    print("✅ Resultados idénticos (dataset unificado y pivot)")
+
+    print(f"\n{'backend':<8} {'merge + pivot (mejor de ' + str(args.repeats) + ')':>32}")
+    for name in ("pandas", "polars"):
+        print(f"{name:<8} {tiempos[name] * 1000:>29.1f} ms")
+    print(f"Speedup polars vs pandas: x{tiempos['pandas'] / tiempos['polars']:.2f}")
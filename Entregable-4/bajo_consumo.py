@@ -0,0 +1,159 @@
+"""
+bajo_consumo.py
+Modo de bajo consumo de memoria para el pipeline de Aurelion:
+- numéricos al tipo más chico que los contiene (int64 -> int8/int16/..., float64 -> float32)
+- textos repetidos (cliente, email, medio de pago, producto, categoría) como categóricos
+- los intermedios se sueltan en cuanto la etapa siguiente los consumió
+  (clientes no se usa; ventas y detalle se liberan después del merge)
+- sin copias defensivas (build_monthly_table agrupa sin copiar merged)
+- reporte de memoria pico por etapa (RSS, Linux) para ver el ahorro
+
+Instrucciones:
+- Pipeline en modo bajo consumo (con reporte):
+    python proyecto_aurelion.py --bajo-consumo
+- Reporte de memoria por etapa en modo normal, para comparar:
+    python proyecto_aurelion.py --reporte-memoria
+- Comparación lado a lado con ventas replicadas (cada modo en un proceso nuevo):
+    python bajo_consumo.py --escala 2000
+"""
+
+import time
+
+from fuera_de_memoria import proc_status_mb, peak_rss_mb, reset_peak_rss
+
+# Una columna de texto pasa a categórica si tiene a lo sumo esta fracción de valores únicos
+MAX_UNIQUE_RATIO = 0.5
+
+
+# ---------------------------
+# Reporte de memoria por etapa
+# ---------------------------
+class MemoryReport:
+    """
+    Pico de RSS entre checkpoints: checkpoint("merge") registra el pico desde el
+    checkpoint anterior y lo reinicia. Deshabilitado no mide nada.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.rows = []
+        if enabled:
+            reset_peak_rss()
+            self.t0 = time.perf_counter()
+
+    def checkpoint(self, stage):
+        if not self.enabled:
+            return
+        self.rows.append({
+            "etapa": stage,
+            "pico_mb": round(peak_rss_mb(), 1),
+            "rss_mb": round(proc_status_mb("VmRSS") or peak_rss_mb(), 1),
+            "segundos": round(time.perf_counter() - self.t0, 3),
+        })
+        reset_peak_rss()
+        self.t0 = time.perf_counter()
+
+    def print(self, title="Memoria por etapa"):
+        if not self.enabled or not self.rows:
+            return
+        print(f"\n=== {title} (RSS del proceso, MB) ===")
+        print(f"{'etapa':<14} {'pico':>9} {'al final':>9} {'segundos':>9}")
+        for row in self.rows:
+            print(f"{row['etapa']:<14} {row['pico_mb']:>9.1f} {row['rss_mb']:>9.1f} {row['segundos']:>9.3f}")
+
+
+# ---------------------------
+# Tipos compactos
+# ---------------------------
+def optimize_frame(df, max_unique_ratio=MAX_UNIQUE_RATIO):
+    """Reduce los tipos de df en el lugar (enteros/floats más chicos, textos repetidos a category)."""
+    import pandas as pd
+
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series.dtype):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series.dtype):
+            df[col] = pd.to_numeric(series, downcast="float")
+        elif pd.api.types.is_string_dtype(series.dtype) or series.dtype == object:
+            if len(series) and series.nunique(dropna=True) <= max_unique_ratio * len(series):
+                df[col] = series.astype("category")
+    return df
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+# ---------------------------
+# Merge + pivot con liberación temprana
+# ---------------------------
+def merge_and_pivot(dfs, report=None):
+    """
+    Igual que preprocess_and_merge + build_monthly_table, pero con tipos compactos y
+    soltando ventas/detalle/clientes apenas se usaron. Modifica `dfs`: al volver sólo
+    queda 'productos' (lo necesitan los rankings).
+    """
+    import proyecto_aurelion as pa
+
+    report = report or MemoryReport(enabled=False)
+    dfs.pop("clientes", None)  # el pipeline no la usa
+    for df in dfs.values():
+        optimize_frame(df)
+    report.checkpoint("tipos")
+
+    merged = pa.preprocess_and_merge(dfs)
+    del dfs["ventas"], dfs["detalle"]
+    optimize_frame(merged)  # el merge devuelve object en columnas nuevas y float64 en el precio
+    report.checkpoint("merge")
+    return merged, pa.build_monthly_table(merged)
+
+
+# ---------------------------
+# Comparación lado a lado
+# ---------------------------
+def _run_mode(modo, escala, queue):
+    import proyecto_aurelion as pa
+    from backend_polars import replicate_sales
+
+    report = MemoryReport()
+    dfs = replicate_sales(pa.standardize_columns(pa.load_datasets()), escala)
+    report.checkpoint("cargar")
+    if modo == "bajo_consumo":
+        merged, pivot = merge_and_pivot(dfs, report)
+    else:
+        merged = pa.preprocess_and_merge(dfs)
+        report.checkpoint("merge")
+        pivot = pa.build_monthly_table(merged)
+    report.checkpoint("pivot")
+    queue.put((report.rows, memory_mb(merged), float(pivot.to_numpy().sum())))
+
+
+if __name__ == "__main__":
+    import argparse
+    import multiprocessing as mp
+
+    parser = argparse.ArgumentParser(description="Compara memoria por etapa: modo normal vs bajo consumo")
+    parser.add_argument("--escala", type=int, default=1000, help="Factor de replicación de ventas/detalle.")
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    resultados = {}
+    for modo in ("normal", "bajo_consumo"):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_mode, args=(modo, args.escala, queue))
+        proc.start()
+        resultados[modo] = queue.get()
+        proc.join()
+
+    print(f"\n=== Memoria por etapa, ventas x{args.escala} (pico RSS en MB) ===")
+    print(f"{'etapa':<10} {'normal':>10} {'bajo consumo':>14}")
+    normal = {r["etapa"]: r for r in resultados["normal"][0]}
+    bajo = {r["etapa"]: r for r in resultados["bajo_consumo"][0]}
+    for etapa in ("cargar", "tipos", "merge", "pivot"):
+        a = f"{normal[etapa]['pico_mb']:.1f}" if etapa in normal else "-"
+        b = f"{bajo[etapa]['pico_mb']:.1f}" if etapa in bajo else "-"
+        print(f"{etapa:<10} {a:>10} {b:>14}")
+    print(f"{'merged':<10} {resultados['normal'][1]:>10.1f} {resultados['bajo_consumo'][1]:>14.1f}  (MB, memory_usage deep)")
+    mismo = resultados["normal"][2] == resultados["bajo_consumo"][2]
+    print(f"Pivot: {'mismas' if mismo else 'DISTINTAS'} unidades totales en ambos modos")
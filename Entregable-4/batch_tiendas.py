@@ -0,0 +1,233 @@
+"""
+batch_tiendas.py
+Modo batch multi-tienda para el pipeline de Aurelion:
+- recibe una lista o un glob de carpetas de tiendas (cada una con su "Base de datos")
+- corre el pipeline completo de cada tienda en su propio proceso, con a lo sumo
+  --workers procesos a la vez
+- artefactos por tienda en <salida>/<tienda>/ (modelo, top_predichos.csv, log, ...)
+- un ranking consolidado (suma de las predicciones de TODOS los productos de cada
+  tienda, no sólo de su top) + resumen con tiempos y estado
+- aislamiento de fallos: una tienda con datos rotos, o cuyo proceso muere (memoria,
+  señal), se reporta como error y no corta ni afecta a las demás
+
+Instrucciones:
+- Estructura esperada (una copia de "Base de datos" por tienda):
+    tiendas/centro/Base de datos/*.xlsx
+    tiendas/norte/Base de datos/*.xlsx
+- Ejecutar:
+    python batch_tiendas.py "tiendas/*" --workers 4
+    python batch_tiendas.py tiendas/centro tiendas/norte --salida salida_tiendas
+- Salidas: salida_tiendas/<tienda>/..., ranking_consolidado.csv, resumen_tiendas.csv
+"""
+
+import contextlib
+import glob
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from pathlib import Path
+
+import proyecto_aurelion as pa
+
+OUTPUT_DIR = Path("salida_tiendas")
+DATA_DIRNAME = "Base de datos"
+
+
+# ---------------------------
+# Descubrimiento de tiendas
+# ---------------------------
+def resolve_store(path):
+    """Devuelve (nombre de tienda, carpeta con los Excel) o None si no hay datos."""
+    path = Path(path)
+    if (path / DATA_DIRNAME).is_dir():
+        return path.name, path / DATA_DIRNAME
+    if path.is_dir() and any((path / fname).exists() for fname in pa.FILES.values()):
+        # Se pasó directamente la carpeta "Base de datos": la tienda es la carpeta padre
+        name = path.parent.name if path.name == DATA_DIRNAME else path.name
+        return name, path
+    return None
+
+
+def discover_stores(patterns):
+    """Expande globs y rutas; nombres de tienda únicos (se agrega sufijo si se repiten)."""
+    stores, seen = [], {}
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        for match in matches:
+            store = resolve_store(match)
+            if store is None:
+                print(f"⚠ Se omite {match}: no contiene '{DATA_DIRNAME}' ni los Excel esperados")
+                continue
+            name, data_dir = store
+            seen[name] = seen.get(name, 0) + 1
+            if seen[name] > 1:
+                name = f"{name}_{seen[name]}"
+            stores.append((name, data_dir))
+    return stores
+
+
+# ---------------------------
+# Ejecución por tienda (en un proceso del pool)
+# ---------------------------
+def run_store(name, data_dir, output_dir, horizonte):
+    """
+    Corre el pipeline de una tienda. Nunca lanza excepciones: devuelve un dict con
+    estado, tiempo y rankings para que una tienda rota no afecte a las demás.
+    La salida de consola de la tienda queda en <output_dir>/pipeline.log.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    result = {"tienda": name, "base_dir": str(data_dir), "estado": "ok", "error": None}
+    with open(output_dir / "pipeline.log", "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            # n_jobs=1: el paralelismo es el pool de tiendas (evita sobre-suscribir los CPUs)
+            artifacts = pa.pipeline(horizonte=horizonte, base_dir=data_dir, output_dir=output_dir, n_jobs=1)
+            from ranking_topk import attach_names
+            predicciones = artifacts["predicciones"].rename("predicted_quantity").rename_axis("id_producto")
+            result["predicciones"] = attach_names(predicciones.reset_index(), artifacts["productos"])
+            result["ranking_predicho"] = artifacts["ranking_predicho"].head(pa.TOP_N)
+            result["ranking_historico"] = artifacts["ranking_historico"].head(pa.TOP_N)
+        except Exception as e:
+            traceback.print_exc()
+            result["estado"] = "error"
+            result["error"] = f"{type(e).__name__}: {e}"
+    result["segundos"] = time.perf_counter() - t0
+    return result
+
+
+def _store_process(results, store_fn, name, data_dir, output_dir, horizonte):
+    t0 = time.perf_counter()
+    try:
+        result = store_fn(name, data_dir, output_dir, horizonte)
+    except BaseException as e:  # también SystemExit (sys.exit dentro de la tienda): siempre hay resultado
+        result = {"tienda": name, "base_dir": str(data_dir), "estado": "error",
+                  "segundos": time.perf_counter() - t0, "error": f"{type(e).__name__}: {e}"}
+    results.put(result)
+
+
+# ---------------------------
+# Consolidación
+# ---------------------------
+def consolidate(results):
+    """
+    Ranking consolidado: suma por producto de las predicciones completas de cada tienda
+    (un producto fuera del top de una tienda igual suma lo que vende ahí) y luego el top.
+    Devuelve (consolidado, top N de cada tienda).
+    """
+    import pandas as pd
+
+    ok = [r for r in results if r["estado"] == "ok"]
+    if not ok:
+        return pd.DataFrame(), pd.DataFrame()
+    predicciones = pd.concat([r["predicciones"].assign(tienda=r["tienda"]) for r in ok], ignore_index=True)
+    claves = ["id_producto", "nombre_producto"] if "nombre_producto" in predicciones.columns else ["id_producto"]
+    consolidado = (
+        predicciones.groupby(claves, dropna=False)
+        .agg(predicted_quantity=("predicted_quantity", "sum"), tiendas=("tienda", "nunique"))
+        .reset_index()
+        .sort_values(["predicted_quantity", "id_producto"], ascending=[False, True])
+    )
+    detalle = pd.concat([r["ranking_predicho"].assign(tienda=r["tienda"]) for r in ok], ignore_index=True)
+    return consolidado, detalle
+
+
+def run_batch(stores, output_root=OUTPUT_DIR, workers=2, horizonte=pa.FORECAST_HORIZON, store_fn=run_store):
+    """
+    Corre cada tienda en su propio proceso, con a lo sumo `workers` a la vez. Si un proceso
+    muere sin devolver resultado (OOM, señal, os._exit) sólo esa tienda queda en error
+    (con un ProcessPoolExecutor el pool entero se rompe y fallan todas las pendientes).
+    """
+    output_root = Path(output_root)
+    output_root.mkdir(parents=True, exist_ok=True)
+    results, pendientes, activos = [], list(stores), {}
+    cola = mp.Queue()
+    t0 = time.perf_counter()
+
+    def registrar(result):
+        results.append(result)
+        estado = "✅" if result["estado"] == "ok" else f"❌ {result['error']}"
+        segundos = f"{result['segundos']:.2f} s" if result.get("segundos") is not None else "-"
+        print(f"[{len(results)}/{len(stores)}] {result['tienda']:<20} {segundos:>9}  {estado}")
+
+    def recibir(result):
+        if result["tienda"] in activos:
+            proceso, _ = activos.pop(result["tienda"])
+            proceso.join()
+            registrar(result)
+
+    while pendientes or activos:
+        while pendientes and len(activos) < workers:
+            name, data_dir = pendientes.pop(0)
+            proceso = mp.Process(target=_store_process, name=f"tienda-{name}",
+                                 args=(cola, store_fn, name, data_dir, output_root / name, horizonte))
+            proceso.start()
+            activos[name] = (proceso, time.perf_counter())
+        try:
+            recibir(cola.get(timeout=0.2))
+            continue
+        except queue.Empty:
+            pass
+        terminados = [name for name, (proceso, _) in activos.items() if proceso.exitcode is not None]
+        if not terminados:
+            continue
+        # El resultado de un proceso que ya terminó puede estar todavía en la cola
+        while True:
+            try:
+                recibir(cola.get_nowait())
+            except queue.Empty:
+                break
+        # Los que siguen sin resultado murieron antes de devolverlo (OOM, señal, os._exit)
+        for name in terminados:
+            if name not in activos:
+                continue
+            proceso, inicio = activos.pop(name)
+            if proceso.exitcode == 0:
+                motivo = "sin devolver resultado"
+            else:
+                motivo = f"señal {-proceso.exitcode}" if proceso.exitcode < 0 else f"código {proceso.exitcode}"
+                motivo = f"abruptamente ({motivo})"
+            registrar({"tienda": name, "estado": "error", "segundos": time.perf_counter() - inicio,
+                       "error": f"el proceso terminó {motivo}"})
+    total = time.perf_counter() - t0
+    return sorted(results, key=lambda r: r["tienda"]), total
+
+
+# ---------------------------
+# Main
+# ---------------------------
+if __name__ == "__main__":
+    import argparse
+    import os
+    parser = argparse.ArgumentParser(description="Corre el pipeline Aurelion para varias tiendas en paralelo")
+    parser.add_argument("tiendas", nargs="+", help="Carpetas de tiendas o globs (ej. 'tiendas/*').")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Procesos en paralelo.")
+    parser.add_argument("--salida", type=Path, default=OUTPUT_DIR, help="Carpeta raíz de artefactos.")
+    parser.add_argument("--horizonte", type=int, default=pa.FORECAST_HORIZON, help="Meses del pronóstico multi-horizonte.")
+    args = parser.parse_args()
+
+    stores = discover_stores(args.tiendas)
+    if not stores:
+        raise SystemExit("No se encontraron tiendas con datos.")
+    print(f"=== Batch multi-tienda: {len(stores)} tiendas, {args.workers} procesos ===")
+
+    results, total = run_batch(stores, args.salida, args.workers, args.horizonte)
+
+    import pandas as pd
+    resumen = pd.DataFrame([{k: r.get(k) for k in ("tienda", "base_dir", "estado", "segundos", "error")} for r in results])
+    resumen.to_csv(args.salida / "resumen_tiendas.csv", index=False)
+    consolidado, detalle = consolidate(results)
+    if not consolidado.empty:
+        consolidado.to_csv(args.salida / "ranking_consolidado.csv", index=False)
+        detalle.to_csv(args.salida / "ranking_por_tienda.csv", index=False)
+
+    ok = (resumen["estado"] == "ok").sum()
+    print(f"\n=== Resumen: {ok}/{len(results)} tiendas OK en {total:.2f} s "
+          f"(suma secuencial: {resumen['segundos'].fillna(0).sum():.2f} s) ===")
+    print(resumen[["tienda", "estado", "segundos"]].to_string(index=False))
+    if not consolidado.empty:
+        print(f"\n=== Top {pa.TOP_N} consolidado (todas las tiendas) ===")
+        print(consolidado.head(pa.TOP_N).to_string(index=False))
+    print(f"\nArtefactos en: {args.salida}/")
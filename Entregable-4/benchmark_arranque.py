@@ -0,0 +1,92 @@
+"""
+benchmark_arranque.py
+Mide el tiempo de arranque (cold start) de cada punto de entrada del proyecto:
+- tiempo total de pared de un proceso nuevo (mediana de varias corridas)
+- reporte estilo `python -X importtime`: módulos de primer nivel que más tardan en importarse
+
+Instrucciones:
+- Ejecutar desde la carpeta del entregable:
+    python benchmark_arranque.py
+    python benchmark_arranque.py --repeats 10 --top 15
+    python benchmark_arranque.py --entry ../utils/dashboard_streamlit.py   # agregar otros scripts
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+# (nombre, argumentos del intérprete) - los CLI se miden con --help y los módulos con import
+ENTRY_POINTS = [
+    ("proyecto_aurelion.py --help", ["proyecto_aurelion.py", "--help"]),
+    ("import proyecto_aurelion", ["-c", "import proyecto_aurelion"]),
+    ("pipeline_dag.py --help", ["pipeline_dag.py", "--help"]),
+    ("servicio_scoring.py --help", ["servicio_scoring.py", "--help"]),
+    ("import forest_numpy", ["-c", "import forest_numpy"]),
+    ("import main", ["-c", "import main"]),
+]
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _run(args, importtime=False):
+    cmd = [sys.executable, *(["-X", "importtime"] if importtime else []), *args]
+    # Cualquier valor no vacío desactiva los .pyc: se quita la variable para medir con bytecode en cache
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=HERE, env=env, capture_output=True, text=True)
+    return time.perf_counter() - t0, proc
+
+
+def wall_time(args, repeats):
+    """Mediana del tiempo de pared de `repeats` procesos nuevos (ms)."""
+    _run(args)  # primera corrida: genera .pyc, no se cuenta
+    return statistics.median(_run(args)[0] * 1000 for _ in range(repeats))
+
+
+def import_report(args, top):
+    """Módulos de primer nivel ordenados por tiempo acumulado (ms), a partir de -X importtime."""
+    _, proc = _run(args, importtime=True)
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:  # indentación 1 = import de primer nivel
+            modules.append((int(match.group(2)) / 1000, match.group(4)))
+    modules.sort(reverse=True)
+    total = sum(ms for ms, _ in modules)
+    return total, modules[:top], proc.returncode
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de los puntos de entrada de Aurelion")
+    parser.add_argument("--repeats", type=int, default=5, help="Corridas por punto de entrada.")
+    parser.add_argument("--top", type=int, default=8, help="Módulos más lentos a mostrar por entrada.")
+    parser.add_argument("--entry", action="append", default=[], help="Script extra a medir (se importa, no se ejecuta su main).")
+    args = parser.parse_args()
+
+    entries = list(ENTRY_POINTS)
+    for extra in args.entry:
+        path = Path(extra).resolve()
+        code = f"import runpy, sys; sys.path.insert(0, {str(path.parent)!r}); runpy.run_path({str(path)!r}, run_name='bench')"
+        entries.append((f"import {path.name}", ["-c", code]))
+
+    print(f"=== Arranque en frío ({args.repeats} corridas, mediana) — {sys.executable} ===")
+    resumen = []
+    for name, entry_args in entries:
+        total_imports, modules, returncode = import_report(entry_args, args.top)
+        ms = wall_time(entry_args, args.repeats)
+        resumen.append((name, ms, total_imports, returncode))
+        print(f"\n--- {name} ---")
+        print(f"Tiempo total: {ms:8.1f} ms | imports: {total_imports:8.1f} ms" + ("" if returncode in (0, None) else f" | exit code {returncode}"))
+        for mod_ms, mod in modules:
+            print(f"    {mod_ms:8.1f} ms  {mod}")
+
+    print("\n=== Resumen ===")
+    for name, ms, total_imports, _ in resumen:
+        print(f"{name:<32} {ms:8.1f} ms  (imports {total_imports:.1f} ms)")
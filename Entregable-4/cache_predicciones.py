@@ -0,0 +1,231 @@
+"""
+cache_predicciones.py
+Cache persistente de predicciones del modelo de Aurelion:
+- clave = (versión del modelo, hash del vector de features)
+- la versión del modelo es un hash de su contenido (los árboles del bosque o los bytes
+  del artefacto guardado, nunca la fecha del archivo): si el modelo cambia, las
+  entradas viejas se invalidan solas; reentrenar con la misma semilla y los mismos
+  datos da el mismo bosque y la cache sigue sirviendo
+- se consulta ANTES de llamar a model.predict: sólo se predicen las filas que faltan
+- desalojo LRU con tope de entradas y de bytes de la base (el archivo se achica al desalojar)
+- contadores de aciertos / fallos (sesión y acumulados)
+
+Uso (lo usan train_and_predict de proyecto_aurelion.py y servicio_scoring.py):
+    cache = PredictionCache("predicciones_cache.sqlite", model_version(model))
+    preds = cached_predict(cache, model.predict, X)
+    print(cache.stats())
+Con el modelo ya guardado, model_version(path=MODEL_PATH) hashea el archivo.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import numpy as np
+
+CACHE_PATH = Path("predicciones_cache.sqlite")
+MAX_ENTRIES = 200_000
+MAX_BYTES = 64 * 2**20  # tope de la base en disco (páginas en uso)
+
+
+# ---------------------------
+# Hashes
+# ---------------------------
+def model_version(model=None, path=None):
+    """
+    Hash corto del contenido del modelo: con `model` (un bosque de sklearn) se hashean
+    los árboles (estructura, umbrales y valores de las hojas), que son lo único que
+    define las predicciones; con `path`, los bytes del artefacto guardado.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if model is not None:
+        digest.update(str(model.n_features_in_).encode())
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            for array in (tree.children_left, tree.children_right, tree.feature, tree.threshold, tree.value):
+                digest.update(np.ascontiguousarray(array).tobytes())
+    elif path is not None:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        raise ValueError("Indicar model o path para calcular la versión del modelo")
+    return digest.hexdigest()
+
+
+def feature_hashes(X):
+    """Un hash por fila de features (float64, así 3 y 3.0 dan la misma clave)."""
+    rows = np.ascontiguousarray(np.asarray(X, dtype=np.float64))
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    return [hashlib.blake2b(row.tobytes(), digest_size=16).hexdigest() for row in rows]
+
+
+# ---------------------------
+# Cache
+# ---------------------------
+class PredictionCache:
+    """
+    Cache SQLite (model_version, feature_hash) -> predicción con desalojo LRU.
+    Se puede usar desde otro hilo que el que la creó (el batcher del servicio de
+    scoring); cached_predict toma `lock` para que las consultas no se mezclen.
+    """
+
+    def __init__(self, path=CACHE_PATH, version=None, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.path = Path(path)
+        self.version = version
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        # Con auto_vacuum incremental las páginas liberadas al desalojar se devuelven al disco
+        # (sólo tiene efecto al crear la base)
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS predicciones ("
+            " model_version TEXT, feature_hash TEXT, prediccion REAL, last_access REAL,"
+            " PRIMARY KEY (model_version, feature_hash))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_lru ON predicciones (last_access)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)")
+        self._invalidate_old_versions()
+
+    def _invalidate_old_versions(self):
+        """Borra las entradas de otros modelos: el artefacto cambió desde la última corrida."""
+        if self.version is None:
+            return
+        row = self.conn.execute("SELECT valor FROM meta WHERE clave = 'model_version'").fetchone()
+        if row is not None and row[0] != self.version:
+            borradas = self.conn.execute(
+                "DELETE FROM predicciones WHERE model_version != ?", (self.version,)
+            ).rowcount
+            print(f"Cache de predicciones: modelo nuevo, {borradas} entradas invalidadas")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (clave, valor) VALUES ('model_version', ?)", (self.version,)
+        )
+        self.conn.commit()
+
+    def get_many(self, hashes):
+        """Devuelve dict hash -> predicción para las claves presentes y actualiza el LRU."""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique), 500):  # límite de parámetros de SQLite
+            chunk = unique[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT feature_hash, prediccion FROM predicciones "
+                f"WHERE model_version = ? AND feature_hash IN ({marks})",
+                [self.version, *chunk],
+            ).fetchall()
+            found.update(rows)
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE predicciones SET last_access = ? WHERE model_version = ? AND feature_hash = ?",
+                [(now, self.version, h) for h in found],
+            )
+        return found
+
+    def put_many(self, items):
+        """Guarda pares (hash, predicción) y aplica el tope de entradas."""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO predicciones VALUES (?, ?, ?, ?)",
+            [(self.version, h, float(p), now) for h, p in items],
+        )
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COUNT(*) FROM predicciones").fetchone()[0]
+        if total > self.max_entries:
+            self._delete_oldest(total - self.max_entries)
+            total = self.max_entries
+        # Tope de bytes: de a un 10% de las entradas (las menos usadas) hasta entrar
+        if total and self.used_bytes() > self.max_bytes:
+            while total and self.used_bytes() > self.max_bytes:
+                borrar = max(1, total // 10)
+                self._delete_oldest(borrar)
+                total -= borrar
+            self.conn.commit()
+            self.conn.executescript("PRAGMA incremental_vacuum;")  # execute() libera una sola página
+
+    def _delete_oldest(self, n):
+        self.conn.execute(
+            "DELETE FROM predicciones WHERE rowid IN ("
+            " SELECT rowid FROM predicciones ORDER BY last_access LIMIT ?)",
+            (n,),
+        )
+
+    def used_bytes(self):
+        """Bytes de las páginas en uso de la base (sin las libres)."""
+        page_count, freelist_count, page_size = (
+            self.conn.execute(f"PRAGMA {nombre}").fetchone()[0] for nombre in ("page_count", "freelist_count", "page_size")
+        )
+        return (page_count - freelist_count) * page_size
+
+    def record(self, hits, misses):
+        """Acumula aciertos/fallos en la sesión y en la tabla meta."""
+        self.hits += hits
+        self.misses += misses
+        for clave, n in (("hits", hits), ("misses", misses)):
+            self.conn.execute(
+                "INSERT INTO meta (clave, valor) VALUES (?, ?) "
+                "ON CONFLICT(clave) DO UPDATE SET valor = CAST(valor AS INTEGER) + ?",
+                (clave, str(n), n),
+            )
+        self.conn.commit()
+
+    def stats(self):
+        meta = dict(self.conn.execute("SELECT clave, valor FROM meta").fetchall())
+        total_hits, total_misses = int(meta.get("hits", 0)), int(meta.get("misses", 0))
+        consultas = self.hits + self.misses
+        acumuladas = total_hits + total_misses
+        return {
+            "entradas": self.conn.execute("SELECT COUNT(*) FROM predicciones").fetchone()[0],
+            "bytes": self.used_bytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / consultas if consultas else 0.0,
+            "hit_rate_acumulado": total_hits / acumuladas if acumuladas else 0.0,
+        }
+
+    def clear(self):
+        self.conn.execute("DELETE FROM predicciones")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def cached_predict(cache, predict_fn, X):
+    """
+    Predice usando la cache: busca todas las filas, llama a predict_fn UNA vez
+    con las que faltan (sin repetir vectores iguales) y guarda los resultados.
+    """
+    with cache.lock:
+        return _cached_predict(cache, predict_fn, X)
+
+
+def _cached_predict(cache, predict_fn, X):
+    hashes = feature_hashes(X)
+    found = cache.get_many(hashes)
+
+    rows = np.asarray(X, dtype=np.float64)
+    missing = {}
+    for i, h in enumerate(hashes):
+        if h not in found and h not in missing:
+            missing[h] = i
+    if missing:
+        idx = list(missing.values())
+        preds = predict_fn(rows[idx])
+        nuevos = dict(zip(missing.keys(), preds))
+        cache.put_many(nuevos.items())
+        found.update(nuevos)
+
+    hits = sum(1 for h in hashes if h not in missing)
+    cache.record(hits, len(hashes) - hits)
+    return np.array([found[h] for h in hashes], dtype=np.float64)
@@ -0,0 +1,140 @@
+"""
+forest_numpy.py
+Motor de inferencia "compilado" para el RandomForest de Aurelion:
+- exporta el bosque entrenado a arrays NumPy contiguos (feature, threshold, hijos, valor)
+- predice por lotes evaluando todos los árboles a la vez (vectorizado)
+- la predicción NO necesita scikit-learn: sólo numpy
+
+Instrucciones:
+- Exportar el modelo guardado por el pipeline:
+    python forest_numpy.py                      # model_random_forest.joblib -> model_random_forest.npz
+    python forest_numpy.py --model otro.joblib --out otro.npz
+- Usar desde otro script (dashboard, servicio de scoring):
+    from forest_numpy import load_forest, predict_forest
+    forest = load_forest("model_random_forest.npz")
+    preds = predict_forest(forest, X)
+"""
+
+from pathlib import Path
+import numpy as np
+
+MODEL_PATH = Path("model_random_forest.joblib")
+FOREST_PATH = Path("model_random_forest.npz")
+TREE_LEAF = -1  # mismo marcador de hoja que usa sklearn en tree_.children_left
+
+
+# ---------------------------
+# Exportación (requiere el modelo entrenado, no importa sklearn)
+# ---------------------------
+def export_forest(model):
+    """
+    Aplana todos los árboles de un RandomForestRegressor en arrays contiguos.
+    Los índices de hijos pasan a ser globales (offset de cada árbol), así todos
+    los árboles viven en un único array y se recorren en paralelo.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+        is_leaf = left == TREE_LEAF
+
+        # En las hojas el nodo apunta a sí mismo: el recorrido queda "estacionado"
+        own = np.arange(tree.node_count, dtype=np.int64) + offset
+        lefts.append(np.where(is_leaf, own, left + offset))
+        rights.append(np.where(is_leaf, own, right + offset))
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+        thresholds.append(tree.threshold.astype(np.float64))
+        values.append(tree.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+
+        offset += tree.node_count
+        max_depth = max(max_depth, int(tree.max_depth))
+
+    return {
+        "feature": np.ascontiguousarray(np.concatenate(features)),
+        "threshold": np.ascontiguousarray(np.concatenate(thresholds)),
+        "children_left": np.ascontiguousarray(np.concatenate(lefts)),
+        "children_right": np.ascontiguousarray(np.concatenate(rights)),
+        "value": np.ascontiguousarray(np.concatenate(values)),
+        "roots": np.asarray(roots, dtype=np.int64),
+        "max_depth": np.int64(max_depth),
+        "n_features": np.int64(model.n_features_in_),
+    }
+
+
+def save_forest(forest, path=FOREST_PATH):
+    """Guarda el bosque aplanado en un .npz comprimido."""
+    path = Path(path)
+    np.savez_compressed(path, **forest)
+    return path
+
+
+def load_forest(path=FOREST_PATH):
+    """Carga un bosque exportado con save_forest (sólo numpy)."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Archivo no encontrado: {path}")
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+# ---------------------------
+# Predicción vectorizada
+# ---------------------------
+def predict_forest(forest, X):
+    """
+    Evalúa todos los árboles para todo el lote de productos.
+    Da el mismo resultado que RandomForestRegressor.predict:
+    - X se castea a float32 (igual que sklearn) antes de comparar con los umbrales
+    - el promedio acumula árbol por árbol en el mismo orden que sklearn
+    """
+    X = np.asarray(X, dtype=np.float32)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    n_features = int(forest["n_features"])
+    if X.shape[1] != n_features:
+        raise ValueError(f"X tiene {X.shape[1]} columnas, el modelo espera {n_features}")
+
+    feature = forest["feature"]
+    threshold = forest["threshold"]
+    left = forest["children_left"]
+    right = forest["children_right"]
+    roots = forest["roots"]
+
+    # nodes[i, t] = nodo actual del producto i en el árbol t
+    nodes = np.broadcast_to(roots, (X.shape[0], roots.shape[0])).copy()
+    rows = np.arange(X.shape[0])[:, None]
+    for _ in range(int(forest["max_depth"])):
+        go_left = X[rows, feature[nodes]] <= threshold[nodes]
+        nodes = np.where(go_left, left[nodes], right[nodes])
+
+    leaf_values = forest["value"][nodes]
+    preds = np.zeros(X.shape[0], dtype=np.float64)
+    for t in range(leaf_values.shape[1]):
+        preds += leaf_values[:, t]
+    preds /= leaf_values.shape[1]
+    return preds
+
+
+# ---------------------------
+# Main
+# ---------------------------
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Exporta el RandomForest de Aurelion a arrays NumPy")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH, help="Modelo .joblib entrenado por el pipeline.")
+    parser.add_argument("--out", type=Path, default=FOREST_PATH, help="Archivo .npz de salida.")
+    args = parser.parse_args()
+
+    import joblib  # sólo la exportación necesita deserializar el modelo de sklearn
+
+    if not args.model.exists():
+        raise FileNotFoundError(f"Archivo no encontrado: {args.model}")
+    model = joblib.load(args.model)
+    forest = export_forest(model)
+    save_forest(forest, args.out)
+    print(f"Bosque exportado: {len(forest['roots'])} árboles, {forest['value'].shape[0]} nodos, profundidad máx. {int(forest['max_depth'])}")
+    print(f"Guardado en: {args.out} ({args.out.stat().st_size / 1024:.1f} KB)")
@@ -0,0 +1,435 @@
+"""
+fuera_de_memoria.py
+Modo fuera de memoria (out-of-core) para historiales de ventas más grandes que la RAM:
+- ventas y detalle se leen por bloques (Parquet, CSV o Excel) y nunca se cargan completos
+- join por particiones hash de id_venta (cada partición de ventas entra en memoria)
+- las líneas de detalle quedan particionadas por mes en disco: <trabajo>/mes=AAAA-MM/
+- cada mes se agrega por separado (producto -> cantidad) y sólo se combinan esos
+  agregados chicos en el pivot producto x mes (mismo resultado que build_monthly_table)
+- el tamaño de bloque y la cantidad de particiones salen del tope de memoria --memoria-max-mb
+
+Instrucciones:
+- En ./Base de datos/ pueden estar ventas/detalle_ventas como .parquet, .csv o .xlsx
+  (se usa el primero que exista, en ese orden)
+- Pipeline completo en este modo:
+    python proyecto_aurelion.py --fuera-de-memoria --memoria-max-mb 256
+- Sólo el pivot, verificando contra el modo en memoria (datos chicos):
+    python fuera_de_memoria.py --verificar
+- Demostración con un dataset sintético ~7x más grande que la memoria permitida
+  (660 MB en pandas contra un tope de 96 MB; el modo en memoria supera el tope):
+    python fuera_de_memoria.py --demo 5000000 --memoria-max-mb 96
+"""
+
+import math
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import proyecto_aurelion as pa
+
+WORK_DIR = Path(".particiones")
+MEMORY_CAP_MB = 256
+SOURCE_SUFFIXES = (".parquet", ".csv", ".xlsx")
+# Un bloque de N filas usa ~FACTOR_TEMPORALES veces su tamaño (buffers del parser, copias de
+# pandas/arrow al particionar). Además arrow/pandas ocupan RESERVA_MB fijos apenas se escribe el
+# primer Parquet (bibliotecas, pools de hilos, codecs): los bloques se dimensionan con lo que queda
+# del tope. Medido con la demo de 5M líneas: pico +77 MB con tope 96 y +99 MB con 128; con 64 el
+# piso fijo (~40 MB) más los bloques mínimos ya no entra, así que no hay que bajar de ~96 MB.
+FACTOR_TEMPORALES = 16
+RESERVA_MB = 32
+VENTAS_COLS = ["id_venta", "fecha"]
+DETALLE_COLS = ["id_venta", "id_producto", "cantidad"]
+
+
+# ---------------------------
+# Lectura por bloques
+# ---------------------------
+def find_source(base_dir, key):
+    """Archivo de la tabla `key` (ventas, detalle, ...) en base_dir: Parquet, CSV o Excel."""
+    stem = Path(pa.FILES[key]).stem
+    for suffix in SOURCE_SUFFIXES:
+        path = Path(base_dir) / f"{stem}{suffix}"
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"Archivo no encontrado: {Path(base_dir) / stem}{{{','.join(SOURCE_SUFFIXES)}}}")
+
+
+def iter_chunks(path, rows, columns):
+    """Genera DataFrames de a lo sumo `rows` filas con las columnas pedidas."""
+    import pandas as pd
+
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=rows, columns=columns):
+            yield batch.to_pandas()
+    elif path.suffix == ".csv":
+        parse_dates = [c for c in columns if c == "fecha"]
+        yield from pd.read_csv(path, usecols=columns, parse_dates=parse_dates, chunksize=rows)
+    else:
+        # Excel: openpyxl en modo read_only recorre las filas sin cargar la hoja entera
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows_iter = wb.active.iter_rows(values_only=True)
+            header = [str(c).strip() for c in next(rows_iter)]
+            positions = [header.index(c) for c in columns]
+            block = []
+            for row in rows_iter:
+                block.append([row[i] for i in positions])
+                if len(block) >= rows:
+                    yield pd.DataFrame(block, columns=columns)
+                    block = []
+            if block:
+                yield pd.DataFrame(block, columns=columns)
+        finally:
+            wb.close()
+
+
+def rows_per_chunk(path, columns, memoria_max_mb):
+    """Filas por bloque para que un bloque (y sus temporales) entre en el tope de memoria."""
+    sample = next(iter_chunks(path, 1000, columns))
+    bytes_per_row = max(sample.memory_usage(deep=True, index=False).sum() / max(len(sample), 1), 1)
+    if Path(path).suffix == ".csv":
+        # el parser de CSV tokeniza la línea entera aunque se pidan pocas columnas
+        bytes_per_row = max(bytes_per_row, Path(path).stat().st_size / max(_rows_in(path), 1))
+    return max(1000, int(block_budget_bytes(memoria_max_mb) / (bytes_per_row * FACTOR_TEMPORALES)))
+
+
+def block_budget_bytes(memoria_max_mb):
+    """Bytes del tope disponibles para bloques: el tope menos la reserva fija de arrow/pandas."""
+    return max(memoria_max_mb - RESERVA_MB, memoria_max_mb / 4) * 2**20
+
+
+def _rows_in(path):
+    """Filas de la tabla (sin leerla: metadata en Parquet, conteo de líneas en CSV)."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    if path.suffix == ".csv":
+        with open(path, "rb") as f:
+            return max(sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b"")) - 1, 0)
+    return None  # Excel: se asume que entra en una sola partición
+
+
+class _PartitionWriter:
+    """
+    Un ParquetWriter abierto por partición. Los bloques se acumulan por partición hasta
+    `buffer_bytes` en total y se escriben juntos, un row group por partición: escribir cada
+    pedacito del groupby como row group deja miles de row groups chicos cuya metadata (y la
+    fragmentación del heap) hacía crecer la RSS por encima del tope.
+    """
+
+    def __init__(self, root, buffer_bytes=0):
+        self.root = Path(root)
+        self.buffer_bytes = buffer_bytes
+        self.writers = {}
+        self.pending = {}
+        self.pending_bytes = 0
+
+    def write(self, name, df):
+        self.pending.setdefault(name, []).append(df)
+        self.pending_bytes += df.memory_usage(index=False).sum()
+        if self.pending_bytes >= self.buffer_bytes:
+            self.flush()
+
+    def flush(self):
+        import pandas as pd
+        import pyarrow as pa_arrow
+        import pyarrow.parquet as pq
+
+        for name, parts in self.pending.items():
+            table = pa_arrow.Table.from_pandas(pd.concat(parts, ignore_index=True), preserve_index=False)
+            if name not in self.writers:
+                (self.root / name).mkdir(parents=True, exist_ok=True)
+                self.writers[name] = pq.ParquetWriter(self.root / name / "part-00000.parquet", table.schema)
+            self.writers[name].write_table(table)
+        self.pending, self.pending_bytes = {}, 0
+
+    def close(self):
+        self.flush()
+        for writer in self.writers.values():
+            writer.close()
+        return sorted(self.writers)
+
+
+def _read_partition(path, rows, columns=None):
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=rows, columns=columns):
+        yield batch.to_pandas()
+
+
+# ---------------------------
+# Particionado: join ventas-detalle por hash de id_venta, salida por mes
+# ---------------------------
+def partition_by_month(base_dir=pa.BASE_DIR, work_dir=WORK_DIR, memoria_max_mb=MEMORY_CAP_MB):
+    """
+    Escribe las líneas de detalle (id_producto, cantidad) particionadas por mes de venta.
+    Devuelve la lista de meses ("AAAA-MM") escritos.
+    """
+    import pandas as pd
+
+    work_dir = Path(work_dir)
+    shutil.rmtree(work_dir, ignore_errors=True)
+    ventas_path, detalle_path = find_source(base_dir, "ventas"), find_source(base_dir, "detalle")
+    ventas_rows = rows_per_chunk(ventas_path, VENTAS_COLS, memoria_max_mb)
+    detalle_rows = rows_per_chunk(detalle_path, DETALLE_COLS, memoria_max_mb)
+
+    # Particiones hash: cada una debe poder cargar su parte de ventas (id_venta -> mes) completa
+    n_ventas = _rows_in(ventas_path) or 0
+    n_buckets = max(1, math.ceil(n_ventas / ventas_rows))
+
+    # 1) ventas y detalle a particiones hash por id_venta (sólo las columnas necesarias)
+    buffer_bytes = block_budget_bytes(memoria_max_mb) / FACTOR_TEMPORALES
+    buckets = _PartitionWriter(work_dir / "_hash", buffer_bytes)
+    for chunk in iter_chunks(ventas_path, ventas_rows, VENTAS_COLS):
+        fecha = pd.to_datetime(chunk["fecha"])
+        chunk = pd.DataFrame({
+            "id_venta": chunk["id_venta"].astype("int64"),
+            "mes": (fecha.dt.year * 100 + fecha.dt.month).astype("int32"),
+        })
+        for b, part in chunk.groupby(chunk["id_venta"] % n_buckets):
+            buckets.write(f"ventas-{b:04d}", part)
+    for chunk in iter_chunks(detalle_path, detalle_rows, DETALLE_COLS):
+        chunk = chunk.dropna(subset=["id_producto"]).astype({"id_venta": "int64", "id_producto": "int64", "cantidad": "float64"})
+        for b, part in chunk.groupby(chunk["id_venta"] % n_buckets):
+            buckets.write(f"detalle-{b:04d}", part)
+    written = set(buckets.close())
+
+    # 2) join por partición hash y escritura por mes
+    months = _PartitionWriter(work_dir, buffer_bytes)
+    for b in range(n_buckets):
+        if f"ventas-{b:04d}" not in written or f"detalle-{b:04d}" not in written:
+            continue
+        mes_por_venta = pd.read_parquet(work_dir / "_hash" / f"ventas-{b:04d}").set_index("id_venta")["mes"]
+        for chunk in _read_partition(work_dir / "_hash" / f"detalle-{b:04d}" / "part-00000.parquet", detalle_rows):
+            chunk["mes"] = chunk["id_venta"].map(mes_por_venta)
+            chunk = chunk.dropna(subset=["mes"])  # líneas sin venta: el merge left de ventas las descarta
+            for mes, part in chunk.groupby(chunk["mes"].astype("int64")):
+                months.write(f"mes={mes // 100:04d}-{mes % 100:02d}", part[["id_producto", "cantidad"]])
+        del mes_por_venta
+    shutil.rmtree(work_dir / "_hash", ignore_errors=True)
+    return [name.split("=", 1)[1] for name in months.close()]
+
+
+# ---------------------------
+# Agregación por mes y combinación de agregados
+# ---------------------------
+def aggregate_month(month_dir, rows):
+    """Cantidad vendida por producto en un mes (suma por bloques: la partición no se carga entera)."""
+    import pandas as pd
+
+    total = None
+    for chunk in _read_partition(Path(month_dir) / "part-00000.parquet", rows):
+        partial = chunk.groupby("id_producto")["cantidad"].sum()
+        total = partial if total is None else total.add(partial, fill_value=0)
+    return total if total is not None else pd.Series(dtype="float64")
+
+
+def build_monthly_table(base_dir=pa.BASE_DIR, work_dir=WORK_DIR, memoria_max_mb=MEMORY_CAP_MB):
+    """Pivot producto x mes equivalente a pa.build_monthly_table(merged), sin materializar merged."""
+    import pandas as pd
+    import pyarrow
+
+    # El pool jemalloc de arrow retiene los bloques liberados: con el de sistema la RSS
+    # vuelve a bajar entre bloques y el pico respeta el tope
+    pyarrow.set_memory_pool(pyarrow.system_memory_pool())
+    t0 = time.perf_counter()
+    months = partition_by_month(base_dir, work_dir, memoria_max_mb)
+    print(f"Detalle particionado en {len(months)} meses ({time.perf_counter() - t0:.1f} s, pico RSS {peak_rss_mb():.0f} MB)")
+
+    rows = max(1000, int(block_budget_bytes(memoria_max_mb) / (16 * FACTOR_TEMPORALES)))  # id_producto + cantidad
+    columns = {}
+    for month in months:
+        columns[pd.Timestamp(f"{month}-01")] = aggregate_month(Path(work_dir) / f"mes={month}", rows)
+    pivot = pd.DataFrame(columns).fillna(0).astype("float64").sort_index().sort_index(axis=1)
+    pivot.index.name = "id_producto"
+    pivot.columns.name = "period"
+    return pivot
+
+
+def proc_status_mb(field):
+    """Campo de /proc/self/status en MB (Linux); None si no está disponible."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso (MB); NaN donde no se puede medir (Windows)."""
+    peak = proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    try:
+        import resource  # sólo Unix: importarlo arriba rompía el módulo en Windows
+    except ImportError:
+        return float("nan")
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 2**20 if sys.platform == "darwin" else maxrss / 1024  # macOS: bytes; Linux: KB
+
+
+def reset_peak_rss():
+    """Reinicia el pico de RSS (Linux >= 4.0) para medir sólo lo que viene después."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+# ---------------------------
+# Datos sintéticos y demostración
+# ---------------------------
+def generate_synthetic(out_dir, n_lineas, months=24, n_productos=100, seed=0, chunk_ventas=200_000):
+    """Escribe ventas.csv y detalle_ventas.csv con ~n_lineas de detalle, por bloques."""
+    import numpy as np
+    import pandas as pd
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    n_ventas = max(1, n_lineas // 3)
+    inicio = np.datetime64("2022-01-01")
+    medios = np.array(["efectivo", "tarjeta", "transferencia", "qr"])
+    for i, start in enumerate(range(0, n_ventas, chunk_ventas)):
+        ids = np.arange(start + 1, min(start + chunk_ventas, n_ventas) + 1)
+        clientes = rng.integers(1, 5_000, ids.size)
+        ventas = pd.DataFrame({
+            "id_venta": ids,
+            "fecha": inicio + rng.integers(0, months * 30, ids.size).astype("timedelta64[D]"),
+            "id_cliente": clientes,
+            "nombre_cliente": pd.Series(clientes).map("Cliente {}".format),
+            "email": pd.Series(clientes).map("cliente{}@mail.com".format),
+            "medio_pago": medios[rng.integers(0, medios.size, ids.size)],
+        })
+        lineas = rng.integers(1, 6, ids.size)  # 1..5 líneas por venta (media 3)
+        productos = rng.integers(1, n_productos + 1, lineas.sum())
+        precio = productos * 100
+        cantidad = rng.integers(1, 10, productos.size)
+        detalle = pd.DataFrame({
+            "id_venta": np.repeat(ids, lineas),
+            "id_producto": productos,
+            "nombre_producto": pd.Series(productos).map("Producto {}".format),
+            "cantidad": cantidad,
+            "precio_unitario": precio,
+            "importe": precio * cantidad,
+        })
+        mode, header = ("w", True) if i == 0 else ("a", False)
+        ventas.to_csv(out_dir / "ventas.csv", mode=mode, header=header, index=False)
+        detalle.to_csv(out_dir / "detalle_ventas.csv", mode=mode, header=header, index=False)
+    return out_dir
+
+
+def in_memory_size_mb(base_dir):
+    """Memoria estimada del dataset unificado (ventas x detalle) si se cargara completo con pandas."""
+    import pandas as pd
+
+    detalle_path = find_source(base_dir, "detalle")
+    ventas_path = find_source(base_dir, "ventas")
+    detalle = next(iter(pd.read_csv(detalle_path, chunksize=10_000)))
+    ventas = next(iter(pd.read_csv(ventas_path, chunksize=10_000, parse_dates=["fecha"])))
+    merged = ventas.merge(detalle, on="id_venta")
+    bytes_per_row = merged.memory_usage(deep=True, index=False).sum() / max(len(merged), 1)
+    return bytes_per_row * _rows_in(detalle_path) / 2**20
+
+
+def _watch_memory(memoria_max_mb, base_mb, on_exceed, interval=0.005):
+    """
+    Hilo que vigila la RSS del proceso y llama on_exceed() si supera base + tope.
+    (RLIMIT_DATA/RLIMIT_AS no sirven de tope: pandas y arrow reservan memoria virtual
+    que nunca usan; lo que importa es la memoria residente.)
+    """
+    import threading
+
+    def watch():
+        while True:
+            rss = proc_status_mb("VmRSS") or 0
+            if rss - base_mb > memoria_max_mb:
+                on_exceed(rss - base_mb)
+                return
+            time.sleep(interval)
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def _demo_worker(modo, base_dir, memoria_max_mb, queue):
+    import os
+    import pandas as pd  # se importa antes de medir: no es parte del dataset
+    import pyarrow.parquet  # noqa: F401
+
+    reset_peak_rss()
+    base = proc_status_mb("VmRSS") or 0
+    t0 = time.perf_counter()
+
+    def exceeded(mb):
+        queue.put((f"tope superado (+{mb:.0f} MB)", time.perf_counter() - t0, peak_rss_mb() - base, None, None))
+        queue.close()
+        queue.join_thread()
+        os._exit(3)
+
+    _watch_memory(memoria_max_mb, base, exceeded)
+    if modo == "memoria":
+        dfs = {
+            "ventas": pd.read_csv(find_source(base_dir, "ventas"), parse_dates=["fecha"]),
+            "detalle": pd.read_csv(find_source(base_dir, "detalle")),
+        }
+        pivot = pa.build_monthly_table(pa.preprocess_and_merge(dfs))
+    else:
+        pivot = build_monthly_table(base_dir, Path(base_dir) / WORK_DIR.name, memoria_max_mb)
+    pico = peak_rss_mb() - base  # pico exacto (VmHWM): el muestreo del hilo puede saltear picos cortos
+    estado = "ok" if pico <= memoria_max_mb else f"tope superado (+{pico:.0f} MB)"
+    queue.put((estado, time.perf_counter() - t0, pico, pivot.shape, float(pivot.to_numpy().sum())))
+
+
+def run_demo(n_lineas, memoria_max_mb, data_dir):
+    """Corre el modo en memoria y el fuera de memoria con el mismo tope de RSS y compara."""
+    import multiprocessing as mp
+
+    t0 = time.perf_counter()
+    generate_synthetic(data_dir, n_lineas)
+    size_mb = in_memory_size_mb(data_dir)
+    print(f"Dataset sintético: {n_lineas:,} líneas de detalle en {data_dir} ({time.perf_counter() - t0:.1f} s)")
+    print(f"Memoria estimada del dataset unificado en pandas: {size_mb:,.0f} MB | tope: {memoria_max_mb} MB "
+          f"(dataset = {size_mb / memoria_max_mb:.1f}x el tope)")
+
+    ctx = mp.get_context("spawn")
+    resultados = {}
+    for modo in ("memoria", "fuera_de_memoria"):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_demo_worker, args=(modo, data_dir, memoria_max_mb, queue))
+        proc.start()
+        proc.join()
+        resultados[modo] = queue.get() if not queue.empty() else (f"proceso terminó con código {proc.exitcode}", None, None, None, None)
+        estado, segundos, pico, shape, total = resultados[modo]
+        detalle = f"{segundos:.1f} s, pico +{pico:.0f} MB" if segundos is not None else ""
+        extra = f", pivot {shape[0]}x{shape[1]}, unidades {total:,.0f}" if shape else ""
+        print(f"  {modo:<17} {estado:<14} {detalle}{extra}")
+    return resultados
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Pivot producto x mes fuera de memoria (particiones por mes en disco)")
+    parser.add_argument("--base-dir", type=Path, default=pa.BASE_DIR, help="Carpeta con ventas y detalle_ventas.")
+    parser.add_argument("--memoria-max-mb", type=int, default=MEMORY_CAP_MB, help="Tope de memoria para bloques y particiones.")
+    parser.add_argument("--trabajo", type=Path, default=WORK_DIR, help="Carpeta de particiones temporales.")
+    parser.add_argument("--verificar", action="store_true", help="Comparar contra build_monthly_table en memoria.")
+    parser.add_argument("--demo", type=int, metavar="LINEAS", help="Generar un dataset sintético de LINEAS filas de detalle y comparar ambos modos con el tope.")
+    parser.add_argument("--demo-dir", type=Path, default=Path("demo_fuera_de_memoria"), help="Carpeta del dataset sintético.")
+    args = parser.parse_args()
+
+    if args.demo:
+        run_demo(args.demo, args.memoria_max_mb, args.demo_dir)
+    else:
+        pivot = build_monthly_table(args.base_dir, args.trabajo, args.memoria_max_mb)
+        print(f"Pivot fuera de memoria: {pivot.shape[0]} productos x {pivot.shape[1]} meses")
+        if args.verificar:
+            import pandas as pd
+            esperado = pa.build_monthly_table(pa.preprocess_and_merge(pa.standardize_columns(pa.load_datasets(args.base_dir))))
+            pd.testing.assert_frame_equal(pivot, esperado, check_index_type=False, check_column_type=False)
+            print("✅ Igual al pivot en memoria")
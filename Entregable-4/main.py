@@ -73,11 +73,12 @@ def menu():
             console.print("[red]Opción no válida. Intenta nuevamente.")
             input()
        
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-
 def exportar_resumen():
     """Genera un resumen automático estilo ejecutivo con emojis y lo exporta a MD y PDF."""
+    # reportlab sólo se carga al exportar: el menú arranca sin pagar su importación
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
     resumen = "# 🚀 Resumen Ejecutivo del Proyecto *Aurelion IA*\n\n"
     resumen += "Este documento reúne los principales puntos de cada componente del proyecto, sintetizados automáticamente para facilitar una lectura rápida y estratégica.\n\n"
 
@@ -0,0 +1,185 @@
+"""
+optimizar_modelo.py
+Optimizador de tamaño / latencia del RandomForest de Aurelion:
+- usa el mismo dataset supervisado que el pipeline (create_supervised_dataset)
+- busca n_estimators, max_depth y min_samples_leaf en una grilla
+- mide para cada combinación: MAE en test, tamaño del artefacto comprimido y latencia p99 de predict
+- descarta las combinaciones que no entran en el presupuesto (KB / ms)
+- guarda (comprimido) el modelo más chico cuyo MAE esté dentro de una tolerancia del mejor
+
+Instrucciones:
+- Colocar los Excel en ./Base de datos/ (igual que proyecto_aurelion.py)
+- Ejecutar:
+    python optimizar_modelo.py
+    python optimizar_modelo.py --max-kb 200 --max-p99-ms 5 --tolerancia 0.05
+- Salidas: model_random_forest.joblib (comprimido), optimizacion_modelo.csv y
+  parametros_modelo.json: proyecto_aurelion.py entrena con esos hiperparámetros
+  (borrar el archivo para volver al modelo original)
+"""
+
+import io
+import json
+import time
+from itertools import product
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import mean_absolute_error
+
+from proyecto_aurelion import (
+    load_datasets,
+    standardize_columns,
+    preprocess_and_merge,
+    build_monthly_table,
+    create_supervised_dataset,
+    RANDOM_STATE,
+    MODEL_PATH,
+    MODEL_PARAMS_PATH,
+    COMPRESS,
+    PAST_MONTHS_FEATURES,
+)
+
+# Grilla de búsqueda (None = profundidad sin límite, como el modelo original)
+GRID = {
+    "n_estimators": [25, 50, 100, 200],
+    "max_depth": [None, 4, 6, 8, 12],
+    "min_samples_leaf": [1, 2, 4, 8],
+}
+REPORT_PATH = Path("optimizacion_modelo.csv")
+
+
+# ---------------------------
+# Mediciones
+# ---------------------------
+def artifact_size(model, compress=COMPRESS):
+    """Tamaño en bytes del modelo serializado con joblib (en memoria, sin tocar disco)."""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer, compress=compress)
+    return buffer.getbuffer().nbytes
+
+
+def predict_latency(model, X, repeats=30):
+    """Latencias (ms) de predict sobre el lote completo; devuelve (p50, p99)."""
+    model.predict(X)  # warm-up
+    tiempos = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        model.predict(X)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return float(np.percentile(tiempos, 50)), float(np.percentile(tiempos, 99))
+
+
+# ---------------------------
+# Búsqueda
+# ---------------------------
+def search(X, y, grid=GRID, repeats=30):
+    """Entrena cada combinación de la grilla y devuelve un DataFrame con métricas."""
+    X_train, X_test, y_train, y_test = train_test_split(
+        X,
+        y,
+        test_size=0.2,
+        random_state=RANDOM_STATE,
+    )
+
+    filas = []
+    combos = list(product(grid["n_estimators"], grid["max_depth"], grid["min_samples_leaf"]))
+    for i, (n_estimators, max_depth, min_samples_leaf) in enumerate(combos, start=1):
+        model = RandomForestRegressor(
+            n_estimators=n_estimators,
+            max_depth=max_depth,
+            min_samples_leaf=min_samples_leaf,
+            random_state=RANDOM_STATE,
+        )
+        model.fit(X_train, y_train)
+        mae = mean_absolute_error(y_test, model.predict(X_test))
+        p50, p99 = predict_latency(model, X, repeats=repeats)
+        filas.append({
+            "n_estimators": n_estimators,
+            "max_depth": max_depth,
+            "min_samples_leaf": min_samples_leaf,
+            "mae": mae,
+            "size_kb": artifact_size(model) / 1024,
+            "p50_ms": p50,
+            "p99_ms": p99,
+            "n_nodos": sum(e.tree_.node_count for e in model.estimators_),
+        })
+        print(f"[{i}/{len(combos)}] n_estimators={n_estimators}, max_depth={max_depth}, "
+              f"min_samples_leaf={min_samples_leaf} -> MAE {mae:.3f}, {filas[-1]['size_kb']:.1f} KB, p99 {p99:.2f} ms")
+
+    return pd.DataFrame(filas)
+
+
+def choose(results, max_kb=None, max_p99_ms=None, tolerancia=0.05):
+    """
+    Filtra por presupuesto y elige el modelo más chico con MAE <= mejor MAE * (1 + tolerancia).
+    Devuelve (fila elegida, DataFrame de candidatos dentro del presupuesto).
+    """
+    factibles = results
+    if max_kb is not None:
+        factibles = factibles[factibles["size_kb"] <= max_kb]
+    if max_p99_ms is not None:
+        factibles = factibles[factibles["p99_ms"] <= max_p99_ms]
+    if factibles.empty:
+        raise ValueError("Ninguna combinación entra en el presupuesto de tamaño/latencia indicado")
+
+    mejor_mae = factibles["mae"].min()
+    dentro = factibles[factibles["mae"] <= mejor_mae * (1 + tolerancia)]
+    elegido = dentro.sort_values(["size_kb", "p99_ms", "mae"]).iloc[0]
+    return elegido, factibles
+
+
+# ---------------------------
+# Main
+# ---------------------------
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Busca el RandomForest más chico/rápido dentro de un presupuesto de tamaño y latencia")
+    parser.add_argument("--max-kb", type=float, default=None, help="Tamaño máximo del artefacto comprimido (KB).")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Latencia p99 máxima de predict sobre todos los productos (ms).")
+    parser.add_argument("--tolerancia", type=float, default=0.05, help="Tolerancia relativa sobre el mejor MAE (0.05 = 5%%).")
+    parser.add_argument("--repeats", type=int, default=30, help="Repeticiones para medir la latencia.")
+    parser.add_argument("--out", type=Path, default=MODEL_PATH, help="Dónde guardar el modelo elegido.")
+    args = parser.parse_args()
+
+    print("=== Optimizador de modelo Aurelion: tamaño / latencia / precisión ===")
+    dfs = standardize_columns(load_datasets())
+    pivot = build_monthly_table(preprocess_and_merge(dfs))
+    X, y, feat_cols, target_col = create_supervised_dataset(pivot, n_lags=PAST_MONTHS_FEATURES)
+    print(f"Dataset supervisado: {X.shape[0]} productos, {X.shape[1]} features -> target: {target_col}")
+
+    results = search(X, y, repeats=args.repeats)
+    results.to_csv(REPORT_PATH, index=False)
+    print(f"\nReporte completo guardado en {REPORT_PATH}")
+
+    elegido, factibles = choose(results, args.max_kb, args.max_p99_ms, args.tolerancia)
+    referencia = results[(results["n_estimators"] == 200) & results["max_depth"].isna() & (results["min_samples_leaf"] == 1)]
+
+    print("\n=== Trade-off precisión / tamaño (dentro del presupuesto) ===")
+    print(factibles.sort_values("size_kb").to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    if not referencia.empty:
+        ref = referencia.iloc[0]
+        print(f"\nModelo original (200 árboles, sin límite): MAE {ref['mae']:.3f}, {ref['size_kb']:.1f} KB, p99 {ref['p99_ms']:.2f} ms")
+    max_depth = None if pd.isna(elegido["max_depth"]) else int(elegido["max_depth"])
+    print(f"Modelo elegido: n_estimators={int(elegido['n_estimators'])}, max_depth={max_depth}, "
+          f"min_samples_leaf={int(elegido['min_samples_leaf'])} -> MAE {elegido['mae']:.3f}, "
+          f"{elegido['size_kb']:.1f} KB, p99 {elegido['p99_ms']:.2f} ms")
+
+    # Reentrenar la combinación elegida con el mismo split y guardarla comprimida
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE)
+    params = {
+        "n_estimators": int(elegido["n_estimators"]),
+        "max_depth": max_depth,
+        "min_samples_leaf": int(elegido["min_samples_leaf"]),
+    }
+    model = RandomForestRegressor(**params, random_state=RANDOM_STATE)
+    model.fit(X_train, y_train)
+    joblib.dump(model, args.out, compress=COMPRESS)
+    print(f"Modelo guardado (compress={COMPRESS}) en: {args.out} ({args.out.stat().st_size / 1024:.1f} KB)")
+
+    # El pipeline reentrena en cada corrida: con este archivo usa la combinación elegida
+    MODEL_PARAMS_PATH.write_text(json.dumps(params, indent=2), encoding="utf-8")
+    print(f"Hiperparámetros guardados en {MODEL_PARAMS_PATH} (proyecto_aurelion.py los usa al entrenar)")
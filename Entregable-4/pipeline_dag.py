@@ -0,0 +1,312 @@
+"""
+pipeline_dag.py
+Runner por etapas (grafo) para el pipeline de Aurelion con cache por hash de contenido:
+- cada etapa declara sus entradas (otras etapas) y parámetros
+- la salida se guarda en .cache_pipeline/ bajo un hash de:
+  entradas (hash de las etapas previas o de los Excel), código de la etapa (funciones y
+  módulos auxiliares completos), parámetros e hiperparámetros (incluida la versión de sklearn)
+- si nada cambió, la etapa se salta y se carga de la cache
+- flags para correr una sola etapa, forzar etapas o retomar tras un fallo
+
+Instrucciones:
+- Ejecutar todo (saltando lo que no cambió):
+    python pipeline_dag.py
+- Sólo una etapa (con sus dependencias desde cache):
+    python pipeline_dag.py --stage pivot
+- Forzar una o varias etapas (y todo lo que depende de ellas):
+    python pipeline_dag.py --force entrenar
+- Retomar después de un fallo: repite la misma corrida (etapas pedidas y forzadas) sin
+  recalcular las que ya terminaron, aunque hayan sido forzadas:
+    python pipeline_dag.py --resume
+- Ver el estado de cada etapa sin ejecutar:
+    python pipeline_dag.py --list
+"""
+
+import hashlib
+import inspect
+import json
+import time
+from importlib.metadata import version
+from pathlib import Path
+
+import proyecto_aurelion as pa
+
+CACHE_DIR = Path(".cache_pipeline")
+MANIFEST = CACHE_DIR / "manifest.json"
+
+
+# ---------------------------
+# Definición de etapas
+# ---------------------------
+class Stage:
+    """Etapa del grafo: función, entradas (nombres de etapas), parámetros y código a versionar."""
+
+    def __init__(self, name, fn, inputs=(), params=None, code=(), files=(), config=None, cache=True):
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.params = params or {}  # se pasan a la función y forman parte del hash
+        self.config = config or {}  # constantes globales que usa la etapa: sólo forman parte del hash
+        self.code = [fn, *code]   # funciones o módulos cuyo código forma parte del hash
+        self.files = list(files)  # archivos externos (Excel) cuyo contenido forma parte del hash
+        self.cache = cache        # False = siempre se ejecuta (efectos: escribir CSV/modelo)
+
+
+def _stage_cargar():
+    return pa.standardize_columns(pa.load_datasets())
+
+
+def _stage_merge(dfs):
+    # preprocess_and_merge renombra columnas in-place: trabajar sobre copias
+    return pa.preprocess_and_merge({k: df.copy() for k, df in dfs.items()})
+
+
+def _stage_pivot(merged):
+    pivot = pa.build_monthly_table(merged)
+    print(f"Pivot table creada: {pivot.shape[0]} productos x {pivot.shape[1]} meses")
+    return pivot
+
+
+def _stage_supervisado(pivot, n_lags):
+    X, y, feat_cols, target_col = pa.create_supervised_dataset(pivot, n_lags=n_lags)
+    print(f"Dataset supervisado: {X.shape[0]} productos -> target: {target_col}")
+    return {"X": X, "y": y, "target_col": target_col}
+
+
+def _stage_entrenar(supervisado, params):
+    model, preds_series = pa.train_and_predict(supervisado["X"], supervisado["y"], params=params)
+    return {"model": model, "preds": preds_series}
+
+
+def _stage_rankings(pivot, supervisado, entrenar, cargar):
+    return pa.build_rankings(pivot, supervisado["target_col"], entrenar["preds"], cargar.get("productos"))
+
+
+def _stage_pronostico(pivot, n_lags, horizonte, params):
+    if horizonte <= 0:
+        return None
+    from pronostico_multihorizonte import forecast_multi_horizon
+    return forecast_multi_horizon(pivot, n_lags=n_lags, horizonte=horizonte, params=params)
+
+
+def _stage_resumen(cargar):
+    return pa.build_dashboard_summary(cargar)
+
+
+def _stage_exportar(entrenar, rankings, pronostico, resumen, cargar, merge):
+    # Mismas salidas que pa.pipeline(): archivos sueltos + corrida versionada en ./artefactos
+    ranking_historico, ranking_predicho = rankings
+    productos = cargar.get("productos")
+    pa.save_outputs(entrenar["model"], ranking_historico, ranking_predicho, pronostico, productos, resumen=resumen)
+    pa.publish_outputs(entrenar["model"], ranking_historico, ranking_predicho, pronostico, productos, merge)
+    return True
+
+
+def build_stages(horizonte=pa.FORECAST_HORIZON):
+    """Grafo del pipeline Aurelion (mismo orden lógico que pa.pipeline())."""
+    import artefactos
+    import forest_numpy
+    import ranking_topk
+    import pronostico_multihorizonte
+    import resumen_dashboard
+
+    excel = [pa.BASE_DIR / fname for fname in pa.FILES.values()]
+    # Hiperparámetros y versión de sklearn: cambiarlos invalida los modelos en cache
+    modelo = {"random_state": pa.RANDOM_STATE, "sklearn": version("scikit-learn")}
+    params = pa.model_params()
+    stages = [
+        Stage("cargar", _stage_cargar, code=[pa.load_datasets, pa.read_excel_safe, pa.standardize_columns], files=excel),
+        Stage("merge", _stage_merge, ["cargar"], code=[pa.preprocess_and_merge]),
+        Stage("pivot", _stage_pivot, ["merge"], code=[pa.build_monthly_table]),
+        Stage("supervisado", _stage_supervisado, ["pivot"], {"n_lags": pa.PAST_MONTHS_FEATURES},
+              code=[pa.create_supervised_dataset]),
+        Stage("entrenar", _stage_entrenar, ["supervisado"], {"params": params},
+              code=[pa.train_and_predict], config=modelo),
+        Stage("rankings", _stage_rankings, ["pivot", "supervisado", "entrenar", "cargar"],
+              code=[pa.build_rankings, ranking_topk], config={"k": pa.RANKING_K}),
+        Stage("pronostico", _stage_pronostico, ["pivot"],
+              {"n_lags": pa.PAST_MONTHS_FEATURES, "horizonte": horizonte, "params": params},
+              code=[pronostico_multihorizonte], config=modelo),
+        Stage("resumen", _stage_resumen, ["cargar"], code=[pa.build_dashboard_summary, resumen_dashboard]),
+        Stage("exportar", _stage_exportar, ["entrenar", "rankings", "pronostico", "resumen", "cargar", "merge"],
+              code=[pa.save_outputs, pa.publish_outputs, forest_numpy, artefactos], cache=False),
+    ]
+    return {s.name: s for s in stages}
+
+
+# ---------------------------
+# Hashes y cache
+# ---------------------------
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stage_key(stage, input_keys):
+    """Hash de: nombre, código de la etapa, parámetros, claves de las entradas y archivos externos."""
+    # inspect.getsource acepta funciones y módulos: un módulo entra completo (constantes y
+    # helpers que la etapa usa sin listarlos)
+    digest = hashlib.sha256(stage.name.encode())
+    for fn in stage.code:
+        digest.update(inspect.getsource(fn).encode())
+    digest.update(json.dumps([stage.params, stage.config], sort_keys=True, default=str).encode())
+    for name in stage.inputs:
+        digest.update(input_keys[name].encode())
+    for path in stage.files:
+        digest.update(_hash_file(path).encode() if Path(path).exists() else b"missing")
+    return digest.hexdigest()[:16]
+
+
+def _cache_path(name, key):
+    return CACHE_DIR / f"{name}-{key}.joblib"
+
+
+def _load_manifest():
+    if MANIFEST.exists():
+        return json.loads(MANIFEST.read_text(encoding="utf-8"))
+    return {"stages": {}, "failed": None}
+
+
+def _save_manifest(manifest):
+    CACHE_DIR.mkdir(exist_ok=True)
+    MANIFEST.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+def topological_order(stages, targets=None):
+    """Orden de ejecución; con targets, sólo esas etapas y sus dependencias."""
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Ciclo en el grafo de etapas en: {name}")
+        if name not in stages:
+            raise KeyError(f"Etapa desconocida: {name} (disponibles: {', '.join(stages)})")
+        visiting.add(name)
+        for dep in stages[name].inputs:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in (targets or stages):
+        visit(name)
+    return order
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+def run(stages, targets=None, force=(), dry_run=False, return_outputs=True):
+    """
+    Ejecuta el grafo. Las etapas con la misma clave que una salida en cache no se
+    recalculan; las forzadas (y todas las que dependen de ellas) se vuelven a ejecutar.
+    Devuelve las salidas de las etapas pedidas (o de todas); con return_outputs=False
+    no se cargan de la cache las que no hizo falta ejecutar.
+    """
+    import joblib
+
+    CACHE_DIR.mkdir(exist_ok=True)
+    manifest = _load_manifest()
+    if manifest.get("failed") and not dry_run:
+        print(f"Última ejecución falló en la etapa '{manifest['failed']}' (--resume la repite sin recalcular lo terminado).")
+
+    order = topological_order(stages, targets)
+    keys, outputs, forced = {}, {}, set(force)
+    for name in order:
+        if forced & set(stages[name].inputs):
+            forced.add(name)  # forzar una etapa también recalcula las que dependen de ella
+    for name in order:
+        stage = stages[name]
+        key = stage_key(stage, keys)
+        keys[name] = key
+        path = _cache_path(name, key)
+        hit = stage.cache and name not in forced and path.exists()
+
+        if dry_run:
+            estado = "cache" if hit else ("siempre" if not stage.cache else "pendiente")
+            print(f"{name:<12} {key}  {estado}")
+            continue
+
+        if hit:
+            # Carga diferida: sólo se lee de disco si una etapa que se ejecuta la necesita
+            print(f"[{name}] sin cambios -> se usa la cache ({path.name})")
+            continue
+
+        t0 = time.perf_counter()
+        print(f"[{name}] ejecutando...")
+        try:
+            outputs[name] = stage.fn(*[_load_input(dep, keys, outputs) for dep in stage.inputs], **stage.params)
+        except Exception:
+            # Para --resume: la misma corrida, sin volver a forzar lo que ya se recalculó
+            manifest["failed"] = name
+            manifest["resume"] = {"targets": targets, "force": sorted(forced - set(outputs))}
+            _save_manifest(manifest)
+            print(f"[{name}] FALLÓ. Corregir y ejecutar con --resume para retomar desde aquí.")
+            raise
+        if stage.cache:
+            joblib.dump(outputs[name], path, compress=3)
+        manifest["stages"][name] = {"key": key, "seconds": round(time.perf_counter() - t0, 3)}
+        print(f"[{name}] listo en {time.perf_counter() - t0:.2f} s")
+
+    if dry_run:
+        return {}
+    manifest["failed"] = None
+    manifest.pop("resume", None)
+    _save_manifest(manifest)
+    if not return_outputs:
+        return {}
+    return {name: _load_input(name, keys, outputs) for name in (targets or order) if stages[name].cache or name in outputs}
+
+
+def resume_args():
+    """(targets, force) de la corrida que falló, o None si la última terminó bien."""
+    manifest = _load_manifest()
+    if not manifest.get("failed"):
+        return None
+    resume = manifest.get("resume", {})
+    return resume.get("targets"), resume.get("force", [])
+
+
+def _load_input(name, keys, outputs):
+    import joblib
+
+    if name not in outputs:
+        outputs[name] = joblib.load(_cache_path(name, keys[name]))
+    return outputs[name]
+
+
+# ---------------------------
+# Main
+# ---------------------------
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Pipeline Aurelion por etapas con cache por hash de contenido")
+    parser.add_argument("--stage", action="append", help="Ejecutar sólo esta etapa (y sus dependencias). Repetible.")
+    parser.add_argument("--force", action="append", default=[], help="Recalcular esta etapa aunque esté en cache. Repetible.")
+    parser.add_argument("--force-all", action="store_true", help="Recalcular todas las etapas.")
+    parser.add_argument("--resume", action="store_true", help="Repetir la corrida que falló sin recalcular las etapas que ya terminaron.")
+    parser.add_argument("--list", action="store_true", help="Mostrar etapas, claves y estado sin ejecutar.")
+    parser.add_argument("--horizonte", type=int, default=pa.FORECAST_HORIZON, help="Meses del pronóstico multi-horizonte.")
+    args = parser.parse_args()
+
+    stages = build_stages(args.horizonte)
+    force = list(stages) if args.force_all else args.force
+    for name in force:
+        if name not in stages:
+            parser.error(f"Etapa desconocida: {name}")
+
+    targets = args.stage
+    if args.resume:
+        previa = resume_args()
+        if previa is None:
+            print("Sin fallos registrados: se ejecuta normalmente.")
+        else:
+            targets, force = previa
+            print(f"Retomando la corrida que falló en '{_load_manifest()['failed']}' "
+                  f"(etapas: {', '.join(targets or stages)}; forzadas pendientes: {', '.join(force) or 'ninguna'})")
+
+    run(stages, targets=targets, force=force, dry_run=args.list, return_outputs=False)
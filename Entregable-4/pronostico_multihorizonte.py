@@ -0,0 +1,142 @@
+"""
+pronostico_multihorizonte.py
+Pronóstico de los próximos K meses para todos los productos a la vez:
+- ventanas deslizantes sobre el pivot (productos x meses) armadas con numpy, sin loops por producto
+- método "directo": un RandomForest por horizonte, entrenados en paralelo (joblib, n_jobs
+  procesos; 1 cuando ya se corre dentro de un pool, como en batch_tiendas.py)
+- método "recursivo": un único modelo a 1 mes; las predicciones se realimentan como lags
+  en un loop vectorizado (todo el lote de productos por paso)
+- salida: tabla producto x horizonte (una columna por mes futuro)
+
+Instrucciones:
+- Se usa desde proyecto_aurelion.py (pipeline(horizonte=3)) o directamente:
+    python pronostico_multihorizonte.py --horizonte 6 --metodo recursivo
+- Salida: pronostico_multihorizonte.csv
+"""
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+
+from proyecto_aurelion import RANDOM_STATE, model_params  # mismos hiperparámetros y semilla que el modelo a 1 mes
+
+OUTPUT_FORECAST = Path("pronostico_multihorizonte.csv")
+
+
+# ---------------------------
+# Ventanas deslizantes
+# ---------------------------
+def sliding_windows(values, n_lags, horizon):
+    """
+    Para cada producto y cada posición t arma (lags t-n_lags..t-1, valor en t+horizon-1).
+    values: array (productos x meses). Devuelve X (muestras x n_lags), y (muestras,).
+    """
+    n_months = values.shape[1]
+    n_pos = n_months - n_lags - horizon + 1
+    if n_pos < 1:
+        raise ValueError(
+            f"No hay meses suficientes para horizonte {horizon} "
+            f"(necesarios {n_lags + horizon}, hay {n_months})"
+        )
+    windows = np.lib.stride_tricks.sliding_window_view(values, n_lags, axis=1)[:, :n_pos]
+    X = windows.reshape(-1, n_lags)
+    y = values[:, n_lags + horizon - 1:n_lags + horizon - 1 + n_pos].reshape(-1)
+    return X, y
+
+
+def _fit_horizon(values, n_lags, horizon, params):
+    X, y = sliding_windows(values, n_lags, horizon)
+    model = RandomForestRegressor(**params, random_state=RANDOM_STATE)
+    model.fit(X, y)
+    return model
+
+
+# ---------------------------
+# Métodos de pronóstico
+# ---------------------------
+def forecast_direct(values, n_lags, horizonte, params, n_jobs=-1):
+    """Un modelo por horizonte (entrenados en paralelo); todos predicen desde los últimos lags."""
+    models = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_horizon)(values, n_lags, h, params) for h in range(1, horizonte + 1)
+    )
+    last = values[:, -n_lags:]
+    return np.column_stack([model.predict(last) for model in models])
+
+
+def forecast_recursive(values, n_lags, horizonte, params):
+    """Un modelo a 1 mes; en cada paso predice todo el lote y desplaza la ventana de lags."""
+    model = _fit_horizon(values, n_lags, 1, params)
+    window = values[:, -n_lags:].astype(np.float64)
+    preds = np.empty((values.shape[0], horizonte))
+    for h in range(horizonte):
+        preds[:, h] = model.predict(window)
+        window = np.column_stack([window[:, 1:], preds[:, h]])
+    return preds
+
+
+def forecast_multi_horizon(pivot_table, n_lags=3, horizonte=3, metodo="auto", params=None, n_jobs=-1):
+    """
+    Pronostica los próximos `horizonte` meses para todos los productos del pivot.
+    metodo: "directo", "recursivo" o "auto" (directo si hay historia suficiente, si no recursivo).
+    params: hiperparámetros del RandomForest (por defecto model_params(), los del modelo a 1 mes).
+    n_jobs: procesos para entrenar los modelos del método directo (-1 = todos los CPUs).
+    Devuelve DataFrame (id_producto x mes futuro).
+    """
+    params = params or model_params()
+    cols_sorted = sorted(pivot_table.columns)
+    values = pivot_table[cols_sorted].to_numpy(dtype=np.float64)
+
+    if metodo == "auto":
+        metodo = "directo" if values.shape[1] >= n_lags + horizonte else "recursivo"
+    if metodo == "directo":
+        preds = forecast_direct(values, n_lags, horizonte, params, n_jobs)
+    elif metodo == "recursivo":
+        preds = forecast_recursive(values, n_lags, horizonte, params)
+    else:
+        raise ValueError(f"Método desconocido: {metodo} (usar 'directo', 'recursivo' o 'auto')")
+
+    last_period = pd.Timestamp(cols_sorted[-1])
+    future = [last_period + pd.DateOffset(months=h) for h in range(1, horizonte + 1)]
+    forecast = pd.DataFrame(preds, index=pivot_table.index, columns=future)
+    forecast.columns.name = "period"
+    print(f"Pronóstico multi-horizonte ({metodo}): {forecast.shape[0]} productos x {horizonte} meses")
+    return forecast
+
+
+def forecast_table(forecast, productos_df=None):
+    """Tabla plana para CSV: id_producto, nombre_producto, un mes por columna y total del período."""
+    table = forecast.copy()
+    table.columns = [c.strftime("%Y-%m") for c in table.columns]
+    table["total_horizonte"] = table.sum(axis=1)
+    table = table.reset_index()
+    if productos_df is not None and "nombre_producto" in productos_df.columns:
+        table = table.merge(productos_df[["id_producto", "nombre_producto"]], on="id_producto", how="left")
+    return table.sort_values("total_horizonte", ascending=False)
+
+
+# ---------------------------
+# Main
+# ---------------------------
+if __name__ == "__main__":
+    import argparse
+    from proyecto_aurelion import (
+        load_datasets,
+        standardize_columns,
+        preprocess_and_merge,
+        build_monthly_table,
+        PAST_MONTHS_FEATURES,
+    )
+    parser = argparse.ArgumentParser(description="Pronóstico de los próximos K meses para todos los productos")
+    parser.add_argument("--horizonte", type=int, default=3, help="Cantidad de meses a pronosticar.")
+    parser.add_argument("--metodo", choices=["auto", "directo", "recursivo"], default="auto")
+    args = parser.parse_args()
+
+    dfs = standardize_columns(load_datasets())
+    pivot = build_monthly_table(preprocess_and_merge(dfs))
+    forecast = forecast_multi_horizon(pivot, PAST_MONTHS_FEATURES, args.horizonte, args.metodo)
+    table = forecast_table(forecast, dfs.get("productos"))
+    table.to_csv(OUTPUT_FORECAST, index=False)
+    print(table.head(10).to_string(index=False))
+    print(f"Pronóstico guardado en {OUTPUT_FORECAST}")
@@ -5,7 +5,13 @@ Script académico para:
 - construcción de dataset agregado mensual por producto
 - entrenamiento de un modelo de Machine Learning supervisado de regresión (RandomForest)
 - predicción de productos más vendidos (Top N)
-- mini-dashboard con Streamlit (opcional)
+- pronóstico multi-horizonte de los próximos meses (pronostico_multihorizonte.py)
+- exportación del bosque a arrays NumPy para inferencia sin sklearn (forest_numpy.py)
+- backend opcional Polars (lazy) para merge y agregación mensual (backend_polars.py)
+- modo fuera de memoria con particiones mensuales en disco (fuera_de_memoria.py)
+- modo de bajo consumo: tipos compactos, categóricos y liberación temprana (bajo_consumo.py)
+- mini-dashboard con Streamlit (opcional) que lee los KPIs y series precalculados por el
+  pipeline en resumen_dashboard.json (resumen_dashboard.py) en lugar de recalcularlos
 
 Instrucciones:
 - Colocar los archivos en ./Base de datos/ con los nombres:
@@ -14,26 +20,27 @@ Instrucciones:
     
     
 - Ejecutar (CLI): python proyecto_aurelion.py
+- Ejecutar con Polars: python proyecto_aurelion.py --backend polars
+- Historial más grande que la RAM: python proyecto_aurelion.py --fuera-de-memoria --memoria-max-mb 256
+- Bajo consumo de memoria (con reporte por etapa): python proyecto_aurelion.py --bajo-consumo
 - Ejecutar (Dashboard): streamlit run proyecto_aurelion.py
+- Hiperparámetros del modelo: los de parametros_modelo.json si existe (lo escribe
+  optimizar_modelo.py); si no, N_ESTIMATORS árboles sin límite de profundidad
 """
 
 import os
+import importlib.util
 from pathlib import Path
-import pandas as pd
-import numpy as np
 from datetime import datetime
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-import joblib
 
-# Optional visualization libs for dashboard
-try:
-    import streamlit as st
-    import altair as alt
-    STREAMLIT_AVAILABLE = True
-except Exception:
-    STREAMLIT_AVAILABLE = False
+# Las dependencias pesadas (pandas, scikit-learn, joblib, streamlit, altair) se importan
+# dentro de las funciones que las usan: `--help` o leer artefactos no las carga.
+# Medir el arranque con: python benchmark_arranque.py
+
+# Optional visualization libs for dashboard (sólo se verifica que estén instaladas)
+STREAMLIT_AVAILABLE = all(importlib.util.find_spec(m) is not None for m in ("streamlit", "altair"))
+POLARS_AVAILABLE = importlib.util.find_spec("polars") is not None
+BACKENDS = ("pandas", "polars")  # motor para merge + agregación mensual (ver backend_polars.py)
 
 # Config
 BASE_DIR = Path.cwd() / "Base de datos"
@@ -44,15 +51,22 @@ FILES = {
     "detalle": "detalle_ventas.xlsx"
 }
 RANDOM_STATE = 42
+N_ESTIMATORS = 200  # árboles del RandomForestRegressor
 MODEL_PATH = Path("model_random_forest.joblib")
+MODEL_PARAMS_PATH = Path("parametros_modelo.json")  # hiperparámetros elegidos por optimizar_modelo.py
+COMPRESS = 3  # nivel de compresión zlib de joblib para el modelo guardado (ver optimizar_modelo.py)
+PREDICTIONS_CACHE_PATH = Path("predicciones_cache.sqlite")  # ver cache_predicciones.py
 TOP_N = 10  # número de productos top que queremos obtener en la predicción
 PAST_MONTHS_FEATURES = 3  # cuántos meses anteriores usamos como features
+RANKING_K = max(TOP_N, 20)  # filas de ranking que se conservan (el dashboard muestra 20)
+FORECAST_HORIZON = 3  # meses a futuro del pronóstico multi-horizonte (0 = desactivado)
 
 
 # ---------------------------
 # Utilities: lectura y chequeos
 # ---------------------------
 def read_excel_safe(path: Path):
+    import pandas as pd
     if not path.exists():
         raise FileNotFoundError(f"Archivo no encontrado: {path}")
     return pd.read_excel(path)
@@ -88,6 +102,8 @@ def standardize_columns(dfs):
 # ---------------------------
 def preprocess_and_merge(dfs):
     """Normaliza y fusiona los DataFrames en un dataset unificado."""
+    import pandas as pd
+
     ventas = dfs["ventas"]
     detalle = dfs["detalle"]
     clientes = dfs.get("clientes", pd.DataFrame())
@@ -119,11 +135,9 @@ def preprocess_and_merge(dfs):
 # ---------------------------
 def build_monthly_table(merged_df):
     """Construye tabla mensual (product_id x period) con suma de cantidades vendidas."""
-    df = merged_df.copy()
-    df['period'] = df['fecha'].dt.to_period('M').dt.to_timestamp()
-    monthly = df.groupby(['id_producto', 'period']).agg({
-        'cantidad': 'sum'
-    }).reset_index()
+    # Sin copiar merged_df: el período se calcula aparte y se usa como clave de agrupación
+    period = merged_df['fecha'].dt.to_period('M').dt.to_timestamp().rename('period')
+    monthly = merged_df['cantidad'].groupby([merged_df['id_producto'], period]).sum().reset_index()
     # Asegurar que no haya periodos faltantes por producto (rellenar con 0)
     pivot = monthly.pivot_table(index='id_producto', columns='period', values='cantidad', fill_value=0)
     pivot = pivot.sort_index(axis=1)  # columnas cronológicas
@@ -139,6 +153,8 @@ def create_supervised_dataset(pivot_table, n_lags=PAST_MONTHS_FEATURES):
     y el mes siguiente como target (cantidad).
     Retorna X (features), y (target) y la fecha objetivo (next_period)
     """
+    import pandas as pd
+
     # Ordenar columnas (periods) por fecha
     cols = list(pivot_table.columns)
     cols_sorted = sorted(cols)
@@ -170,11 +186,33 @@ def create_supervised_dataset(pivot_table, n_lags=PAST_MONTHS_FEATURES):
 # ---------------------------
 # Entrenamiento y predicción
 # ---------------------------
-def train_and_predict(X, y):
+def model_params(path=MODEL_PARAMS_PATH):
+    """
+    Hiperparámetros del RandomForestRegressor: los guardados por optimizar_modelo.py
+    si existe `path`, si no los originales (N_ESTIMATORS árboles, sin límite de profundidad).
     """
-    Entrena un modelo de regresión supervisada (RandomForestRegressor)
-    y devuelve el modelo entrenado y las predicciones para todos los productos.
+    import json
+
+    params = {"n_estimators": N_ESTIMATORS, "max_depth": None, "min_samples_leaf": 1}
+    path = Path(path)
+    if path.exists():
+        guardados = json.loads(path.read_text(encoding="utf-8"))
+        params.update({clave: guardados[clave] for clave in params if clave in guardados})
+    return params
+
+
+def train_and_predict(X, y, params=None, cache_path=PREDICTIONS_CACHE_PATH):
     """
+    Entrena un modelo de regresión supervisada (RandomForestRegressor) con `params`
+    (por defecto model_params()) y devuelve el modelo entrenado y las predicciones
+    para todos los productos. Las predicciones pasan por la cache de cache_path
+    (cache_predicciones.py; None = sin cache).
+    """
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
     # División en train / test para evaluar el modelo
     X_train, X_test, y_train, y_test = train_test_split(
         X,
@@ -184,8 +222,9 @@ def train_and_predict(X, y):
     )
 
     # Modelo de regresión supervisada basado en Random Forest
+    params = params or model_params()
     model = RandomForestRegressor(
-        n_estimators=200,
+        **params,
         random_state=RANDOM_STATE,
     )
     model.fit(X_train, y_train)
@@ -198,27 +237,178 @@ def train_and_predict(X, y):
     r2 = r2_score(y_test, preds_test)
 
     print("\n=== Evaluación del modelo de regresión (Random Forest) ===")
+    print(f"Hiperparámetros: {params}")
     print(f"MSE (error cuadrático medio)   : {mse:.3f}")
     print(f"MAE (error absoluto medio)     : {mae:.3f}")
     print(f"R²  (coeficiente de determinación): {r2:.3f}")
 
-    # Predicciones para todos los productos (dataset completo) para armar el ranking
-    preds_all = model.predict(X)
+    # Predicciones para todos los productos (dataset completo) para armar el ranking.
+    # La cache se versiona por el contenido del bosque: con la misma semilla y los mismos
+    # datos el modelo reentrenado es idéntico y las filas ya vistas no se vuelven a predecir
+    if cache_path is None:
+        preds_all = model.predict(X)
+    else:
+        from cache_predicciones import PredictionCache, cached_predict, model_version
+
+        cache = PredictionCache(cache_path, model_version(model))
+        try:
+            preds_all = cached_predict(cache, lambda rows: model.predict(pd.DataFrame(rows, columns=X.columns)), X)
+            stats = cache.stats()
+            print(f"Cache de predicciones: {stats['hits']} aciertos / {stats['misses']} fallos "
+                  f"({stats['entradas']} entradas, {stats['bytes'] / 1024:.0f} KB)")
+        finally:
+            cache.close()
     preds_series = pd.Series(preds_all, index=X.index, name="predicted_quantity")
 
     return model, preds_series
 
 
 
+# ---------------------------
+# Rankings y guardado de resultados
+# ---------------------------
+def build_rankings(pivot, target_col, preds_series, productos_df=None):
+    """
+    Rankings Top-K con selección parcial (ranking_topk.py): no se ordena todo el
+    catálogo y los nombres se unen sólo a los productos ganadores.
+    Se guardan RANKING_K filas porque el dashboard muestra hasta 20.
+    """
+    from ranking_topk import top_k_frame, attach_names
+
+    ranking_historico = top_k_frame(pivot[target_col], RANKING_K, 'historical_quantity')
+    ranking_predicho = top_k_frame(preds_series, RANKING_K, 'predicted_quantity')
+
+    # Unir con tabla productos si existe para mostrar nombres
+    ranking_predicho = attach_names(ranking_predicho, productos_df)
+    ranking_historico = attach_names(ranking_historico, productos_df)
+    return ranking_historico, ranking_predicho
+
+
+def build_dashboard_summary(dfs, base_dir=BASE_DIR):
+    """KPIs y series del dashboard (resumen_dashboard.py) con la huella de los Excel de base_dir."""
+    from resumen_dashboard import construir_hechos, construir_resumen, huella_contenido
+
+    hechos = construir_hechos(dfs["ventas"], dfs["detalle"], dfs.get("productos"), dfs.get("clientes"))
+    return construir_resumen(hechos, clientes=dfs.get("clientes"), ventas=dfs["ventas"],
+                             huella=huella_contenido([Path(base_dir) / fname for fname in FILES.values()]))
+
+
+def save_outputs(model, ranking_historico, ranking_predicho, pronostico=None, productos_df=None, output_dir=Path("."),
+                 resumen=None):
+    """
+    Guarda modelo, bosque NumPy, rankings top-N, pronóstico y el resumen del dashboard
+    en output_dir (por defecto, el directorio actual).
+    """
+    import joblib
+    from forest_numpy import export_forest, save_forest, FOREST_PATH
+    from pronostico_multihorizonte import forecast_table, OUTPUT_FORECAST
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Guardar modelo
+    joblib.dump(model, output_dir / MODEL_PATH, compress=COMPRESS)
+    print(f"Modelo guardado (compress={COMPRESS}) en: {output_dir / MODEL_PATH}")
+
+    # Exportar el bosque a arrays NumPy (inferencia sin sklearn, ver forest_numpy.py)
+    save_forest(export_forest(model), output_dir / FOREST_PATH)
+    print(f"Bosque exportado para inferencia NumPy en: {output_dir / FOREST_PATH}")
+
+    # Guardar predicciones top-N en CSV
+    ranking_predicho.head(TOP_N).to_csv(output_dir / "top_predichos.csv", index=False)
+    print(f"Top {TOP_N} productos predichos guardados en top_predichos.csv")
+    ranking_historico.head(TOP_N).to_csv(output_dir / "ranking_historico.csv", index=False)
+    print(f"Top {TOP_N} productos históricos guardados en ranking_historico.csv")
+
+    if pronostico is not None:
+        forecast_table(pronostico, productos_df).to_csv(output_dir / OUTPUT_FORECAST, index=False)
+        print(f"Pronóstico de {pronostico.shape[1]} meses guardado en {output_dir / OUTPUT_FORECAST}")
+
+    if resumen is not None:
+        from resumen_dashboard import guardar_resumen, RESUMEN_PATH
+        guardar_resumen(resumen, output_dir / RESUMEN_PATH)
+        print(f"Resumen para el dashboard guardado en {output_dir / RESUMEN_PATH}")
+
+
+def publish_outputs(model, ranking_historico, ranking_predicho, pronostico=None, productos_df=None, merged=None,
+                    output_dir=Path(".")):
+    """
+    Corrida versionada (Parquet + modelo comprimido) con puntero `latest` atómico
+    para que los dashboards nunca lean artefactos a medio escribir (artefactos.py).
+    """
+    from artefactos import publish_run, ARTIFACTS_ROOT
+    from pronostico_multihorizonte import forecast_table
+    return publish_run(
+        {
+            'ranking_historico': ranking_historico,
+            'ranking_predicho': ranking_predicho,
+            'dataset_unificado': merged,
+            'pronostico': forecast_table(pronostico, productos_df) if pronostico is not None else None,
+        },
+        model=model,
+        root=Path(output_dir) / ARTIFACTS_ROOT,
+    )
+
+
 # ---------------------------
 # Pipeline completo
 # ---------------------------
-def pipeline():
+class _SinReporteMemoria:
+    """Reemplazo mudo de bajo_consumo.MemoryReport cuando no se mide memoria."""
+
+    def checkpoint(self, stage):
+        pass
+
+    def print(self, title=None):
+        pass
+
+
+def pipeline(horizonte=FORECAST_HORIZON, base_dir=BASE_DIR, output_dir=Path("."), backend="pandas",
+             fuera_de_memoria=False, memoria_max_mb=None, bajo_consumo=False, reporte_memoria=False, n_jobs=-1):
+    """
+    Ejecuta el pipeline completo leyendo los Excel de base_dir y escribiendo
+    los artefactos en output_dir (ver batch_tiendas.py para varias tiendas).
+    backend: "pandas" o "polars" para el merge y la agregación mensual (mismo resultado).
+    fuera_de_memoria: arma el pivot por particiones mensuales en disco sin cargar
+    ventas/detalle completos (fuera_de_memoria.py); 'merged' queda en None.
+    bajo_consumo: tipos compactos y liberación temprana de intermedios (bajo_consumo.py).
+    reporte_memoria: imprime el pico de memoria de cada etapa (siempre con bajo_consumo).
+    n_jobs: procesos para el pronóstico multi-horizonte (1 si ya se corre dentro de un pool).
+    """
     print("=== Pipeline Aurelion: carga, preproc, modelado, predicción ===")
-    dfs = load_datasets()
-    dfs = standardize_columns(dfs)
-    merged = preprocess_and_merge(dfs)
-    pivot = build_monthly_table(merged)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if bajo_consumo or reporte_memoria:
+        # bajo_consumo mide RSS con resource (solo POSIX): se importa solo si se pide
+        from bajo_consumo import MemoryReport
+        memoria = MemoryReport()
+    else:
+        memoria = _SinReporteMemoria()
+    if fuera_de_memoria:
+        import fuera_de_memoria as ooc
+        dfs = standardize_columns({"productos": read_excel_safe(Path(base_dir) / FILES["productos"])})
+        merged = resumen = None  # sin ventas/detalle en memoria no hay resumen del dashboard
+        pivot = ooc.build_monthly_table(Path(base_dir), output_dir / ooc.WORK_DIR, memoria_max_mb or ooc.MEMORY_CAP_MB)
+    else:
+        dfs = load_datasets(Path(base_dir))
+        dfs = standardize_columns(dfs)
+        memoria.checkpoint("cargar")
+        # KPIs y series del dashboard una vez por corrida (antes del merge, que renombra en el lugar)
+        resumen = build_dashboard_summary(dfs, base_dir)
+        memoria.checkpoint("resumen")
+        if bajo_consumo:
+            from bajo_consumo import merge_and_pivot
+            merged, pivot = merge_and_pivot(dfs, memoria)
+        elif backend == "polars":
+            if not POLARS_AVAILABLE:
+                raise RuntimeError("El backend polars requiere: pip install polars pyarrow")
+            import backend_polars
+            merged, pivot = backend_polars.merge_and_pivot(dfs)
+        else:
+            merged = preprocess_and_merge(dfs)
+            memoria.checkpoint("merge")
+            pivot = build_monthly_table(merged)
+    memoria.checkpoint("pivot")
     print(f"Pivot table creada: {pivot.shape[0]} productos x {pivot.shape[1]} meses")
 
     # Crear dataset supervisado para ML (regresión)
@@ -237,29 +427,29 @@ def pipeline():
     print("Algoritmo          : RandomForestRegressor (bosque de árboles de decisión)")
 
     # Entrenamiento, evaluación y predicciones
-    model, preds_series = train_and_predict(X, y)
-
+    model, preds_series = train_and_predict(X, y, cache_path=output_dir / PREDICTIONS_CACHE_PATH)
+    if bajo_consumo:
+        del X, y  # el ranking sólo necesita las predicciones
+    memoria.checkpoint("entrenar")
 
-    # Ranking histórico (último mes real)
-    histórico = pivot[target_col].sort_values(ascending=False).rename('historical_quantity')
-    ranking_historico = histórico.reset_index().rename(columns={'id_producto': 'id_producto', target_col: 'historical_quantity'})
-
-    # Ranking predicho
-    ranking_predicho = preds_series.sort_values(ascending=False).reset_index().rename(columns={'index': 'id_producto', 'predicted_quantity': 'predicted_quantity'})
-
-    # Unir con tabla productos si existe para mostrar nombres
+    # Rankings histórico (último mes real) y predicho
     productos_df = dfs.get('productos')
-    if productos_df is not None:
-        ranking_predicho = ranking_predicho.merge(productos_df[['id_producto', 'nombre_producto']], on='id_producto', how='left')
-        ranking_historico = ranking_historico.merge(productos_df[['id_producto', 'nombre_producto']], on='id_producto', how='left')
+    ranking_historico, ranking_predicho = build_rankings(pivot, target_col, preds_series, productos_df)
+    memoria.checkpoint("rankings")
 
-    # Guardar modelo
-    joblib.dump(model, MODEL_PATH)
-    print(f"Modelo guardado en: {MODEL_PATH}")
+    # Pronóstico de los próximos meses (producto x horizonte) para compras
+    pronostico = None
+    if horizonte > 0:
+        from pronostico_multihorizonte import forecast_multi_horizon
+        pronostico = forecast_multi_horizon(pivot, n_lags=PAST_MONTHS_FEATURES, horizonte=horizonte,
+                                            params=model_params(), n_jobs=n_jobs)
+        memoria.checkpoint("pronostico")
 
-    # Guardar predicciones top-N en CSV
-    ranking_predicho.head(TOP_N).to_csv("top_predichos.csv", index=False)
-    print(f"Top {TOP_N} productos predichos guardados en top_predichos.csv")
+    save_outputs(model, ranking_historico, ranking_predicho, pronostico, productos_df, output_dir, resumen)
+
+    publish_outputs(model, ranking_historico, ranking_predicho, pronostico, productos_df, merged, output_dir)
+    memoria.checkpoint("exportar")
+    memoria.print()
 
     # Mostrar resumen en consola
     print("\n=== Top productos históricos (último mes real) ===")
@@ -272,10 +462,131 @@ def pipeline():
         'pivot': pivot,
         'ranking_historico': ranking_historico,
         'ranking_predicho': ranking_predicho,
+        'predicciones': preds_series,  # todos los productos (el ranking es sólo el top)
+        'productos': productos_df,
+        'pronostico': pronostico,
+        'resumen': resumen,
         'model': model
     }
 
 
+def load_published_artifacts(root=None):
+    """
+    Artefactos de la última corrida publicada (sin re-ejecutar el pipeline).
+    Sólo se releen de disco los artefactos que cambiaron desde la última llamada.
+    """
+    from artefactos import shared_reader, ARTIFACTS_ROOT
+    reader = shared_reader(root or ARTIFACTS_ROOT)
+    changed = reader.refresh()
+    if changed:
+        print(f"Artefactos recargados ({reader.version}): {', '.join(sorted(changed))}")
+    data, version = reader.snapshot()
+    return {
+        'merged': data.get('dataset_unificado'),
+        'ranking_historico': data['ranking_historico'],
+        'ranking_predicho': data['ranking_predicho'],
+        'pronostico': data.get('pronostico'),
+        'model': data.get('model'),
+        'version': version,
+    }
+
+
+def input_fingerprint(base_dir=BASE_DIR):
+    """Huella barata de los Excel de entrada (nombre, tamaño, mtime): cambia si cambia un archivo."""
+    fingerprint = []
+    for fname in FILES.values():
+        path = Path(base_dir) / fname
+        stat = path.stat() if path.exists() else None
+        fingerprint.append((fname, stat.st_size if stat else None, stat.st_mtime_ns if stat else None))
+    return tuple(fingerprint)
+
+
+def cached_pipeline(**pipeline_kwargs):
+    """
+    pipeline() cacheado entre reruns de Streamlit (st.cache_resource): la clave es la huella
+    de los Excel + la configuración del modelo, así que sólo se re-ejecuta si cambian los datos.
+    Agrega a los artefactos 'cache' = {estado, actualizado, segundos, huella}.
+    """
+    import hashlib
+    import json
+    import time
+    import streamlit as st
+
+    config = {
+        'modelo': model_params(),
+        'random_state': RANDOM_STATE,
+        'n_lags': PAST_MONTHS_FEATURES,
+        **pipeline_kwargs,
+    }
+    fingerprint = input_fingerprint(pipeline_kwargs.get('base_dir', BASE_DIR))
+
+    # Streamlit identifica la función cacheada por módulo + nombre + código, así que
+    # redefinirla en cada rerun reutiliza la misma cache.
+    @st.cache_resource(max_entries=4, show_spinner="Ejecutando el pipeline (cambiaron los datos o la configuración)...")
+    def _run(fingerprint, config_json):
+        t0 = time.perf_counter()
+        artifacts = pipeline(**json.loads(config_json)['pipeline'])
+        artifacts['cache'] = {'actualizado': datetime.now(), 'segundos': time.perf_counter() - t0}
+        return artifacts
+
+    if st.session_state.pop('aurelion_forzar_pipeline', False):
+        _run.clear()
+    config_json = json.dumps({'config': config, 'pipeline': pipeline_kwargs}, sort_keys=True, default=str)
+    inicio = datetime.now()
+    artifacts = dict(_run(fingerprint, config_json))  # copia: el dict cacheado se comparte entre sesiones
+    recalculado = artifacts['cache']['actualizado'] >= inicio
+    artifacts['cache'] = {
+        **artifacts['cache'],
+        'estado': 'recalculado' if recalculado else 'cache',
+        'huella': hashlib.sha256(repr((fingerprint, config_json)).encode()).hexdigest()[:12],
+    }
+    return artifacts
+
+
+def show_cache_status(artifacts):
+    """Panel lateral con el estado de la cache del pipeline y la última actualización de datos."""
+    import streamlit as st
+
+    info = artifacts.get('cache')
+    with st.sidebar:
+        st.subheader("⚙️ Datos")
+        if info is None:
+            version = artifacts.get('version')
+            st.caption(f"Corrida publicada: {version}" if version else "Sin cache (pipeline ejecutado en este proceso).")
+            return
+        if info['estado'] == 'cache':
+            st.success("Cache: reutilizada (los Excel no cambiaron)")
+        else:
+            st.info(f"Cache: recalculada en {info['segundos']:.1f} s")
+        st.caption(f"Última actualización: {info['actualizado']:%Y-%m-%d %H:%M:%S}")
+        st.caption(f"Huella de datos + config: {info['huella']}")
+        if st.button("🔄 Forzar recálculo"):
+            st.session_state['aurelion_forzar_pipeline'] = True
+            st.rerun()
+
+
+def dashboard_summary(base_dir=BASE_DIR, en_vivo=True):
+    """
+    Resumen del dashboard: el que guardó el pipeline si corresponde a los Excel actuales;
+    si falta o está desactualizado, el mismo resumen calculado en vivo desde los Excel
+    (None si en_vivo=False, p. ej. tras una corrida --fuera-de-memoria, o si faltan los
+    Excel). Se cachea entre reruns de Streamlit por la huella de los Excel y del resumen.
+    """
+    import streamlit as st
+    from resumen_dashboard import leer_resumen, RESUMEN_PATH
+
+    @st.cache_resource(max_entries=2, show_spinner="Calculando el resumen del dashboard...")
+    def _cargar(base_dir, en_vivo, fingerprint, resumen_stat):
+        resumen = leer_resumen(RESUMEN_PATH, base_dir)
+        if resumen is None and en_vivo and all((Path(base_dir) / fname).exists() for fname in FILES.values()):
+            resumen = build_dashboard_summary(standardize_columns(load_datasets(Path(base_dir))), base_dir)
+        return resumen
+
+    stat = RESUMEN_PATH.stat() if RESUMEN_PATH.exists() else None
+    return _cargar(str(base_dir), en_vivo, input_fingerprint(base_dir),
+                   (stat.st_size, stat.st_mtime_ns) if stat else None)
+
+
 # ---------------------------
 # Simple Streamlit dashboard (opcional)
 # ---------------------------
@@ -286,27 +597,34 @@ def run_streamlit_app(artifacts):
     if not STREAMLIT_AVAILABLE:
         print("Streamlit no está instalado. Instala streamlit para usar el dashboard: pip install streamlit")
         return
+    import streamlit as st
+    import altair as alt
 
     st.title("📊 Aurelion - Dashboard Interactivo de Ventas y Predicción")
     st.markdown("Visualiza las métricas clave, productos más vendidos y predicciones de demanda basadas en el modelo Random Forest.")
+    show_cache_status(artifacts)
 
     ranking_historico = artifacts['ranking_historico']
     ranking_predicho = artifacts['ranking_predicho']
-    merged = artifacts['merged']
+    # KPIs y series precalculados por el pipeline (no se recalculan sobre 'merged' en cada rerun)
+    resumen = dashboard_summary(en_vivo=artifacts.get('merged') is not None)
+    if resumen is None:
+        # Corrida --fuera-de-memoria (o sin los Excel): no hay resumen de estos datos
+        st.warning("Sin resumen de los datos (corrida fuera de memoria o faltan los Excel): sólo se muestran los rankings.")
+        st.dataframe(ranking_historico.head(20))
+        st.dataframe(ranking_predicho.head(20))
+        return
+    kpis, series = resumen['kpis'], resumen['series']
+    st.caption("Resumen " + ("precalculado por el pipeline" if resumen['origen'] == 'pipeline' else "calculado en vivo"))
 
     # ---------------------------
     # MÉTRICAS PRINCIPALES (KPIs)
     # ---------------------------
-    total_ventas = merged['cantidad'].sum()
-    n_productos = merged['id_producto'].nunique()
-    n_ventas = merged['id_venta'].nunique()
-    n_clientes = merged['id_cliente'].nunique()
-
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("💰 Ventas totales (unidades)", int(total_ventas))
-    col2.metric("📦 Productos únicos", int(n_productos))
-    col3.metric("🧾 Transacciones (ventas)", int(n_ventas))
-    col4.metric("👥 Clientes activos", int(n_clientes))
+    col1.metric("💰 Ventas totales (unidades)", int(kpis['unidades']))
+    col2.metric("📦 Productos únicos", int(kpis['productos']))
+    col3.metric("🧾 Transacciones (ventas)", int(kpis['ventas']))
+    col4.metric("👥 Clientes activos", int(kpis['clientes_con_ventas']))
 
     # ---------------------------
     # TOP HISTÓRICO Y PREDICHO
@@ -344,13 +662,7 @@ def run_streamlit_app(artifacts):
     # CLIENTES MÁS ACTIVOS
     # ---------------------------
     st.subheader("👥 Clientes más activos")
-    clientes_top = (
-        merged.groupby("nombre_cliente")["cantidad"]
-        .sum()
-        .reset_index()
-        .sort_values(by="cantidad", ascending=False)
-        .head(10)
-    )
+    clientes_top = series['clientes'].sort_values(by="cantidad", ascending=False).head(10)
     chart_clientes = alt.Chart(clientes_top).mark_bar(color='#2ca02c').encode(
         x=alt.X('cantidad:Q', title='Unidades compradas'),
         y=alt.Y('nombre_cliente:N', sort='-x', title='Cliente'),
@@ -361,14 +673,9 @@ def run_streamlit_app(artifacts):
     # ---------------------------
     # COMPARATIVA POR CATEGORÍA
     # ---------------------------
-    if "categoria" in merged.columns:
+    if "categorias" in series:
         st.subheader("🧮 Comparativa entre categorías")
-        categoria_sum = (
-            merged.groupby("categoria")["cantidad"]
-            .sum()
-            .reset_index()
-            .sort_values(by="cantidad", ascending=False)
-        )
+        categoria_sum = series['categorias'].sort_values(by="cantidad", ascending=False)
         chart_cat = alt.Chart(categoria_sum).mark_bar(color='#9467bd').encode(
             x=alt.X('cantidad:Q', title='Unidades vendidas'),
             y=alt.Y('categoria:N', sort='-x', title='Categoría'),
@@ -394,10 +701,29 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Pipeline Aurelion - análisis y predicción de productos más vendidos")
     parser.add_argument("--run-streamlit", action="store_true", help="Ejecutar dashboard Streamlit tras procesar (streamlit debe estar instalado).")
+    parser.add_argument("--horizonte", type=int, default=FORECAST_HORIZON, help="Meses a pronosticar por producto (0 = sólo el próximo mes).")
+    parser.add_argument("--backend", choices=BACKENDS, default="pandas", help="Motor para merge y agregación mensual (polars: plan lazy multi-hilo).")
+    parser.add_argument("--fuera-de-memoria", action="store_true", help="Pivot por particiones mensuales en disco (historial más grande que la RAM).")
+    parser.add_argument("--memoria-max-mb", type=int, default=None, help="Tope de memoria del modo --fuera-de-memoria (MB).")
+    parser.add_argument("--bajo-consumo", action="store_true", help="Tipos compactos, categóricos y liberación temprana de intermedios.")
+    parser.add_argument("--reporte-memoria", action="store_true", help="Imprimir el pico de memoria de cada etapa.")
+    parser.add_argument("--desde-artefactos", action="store_true", help="No ejecutar el pipeline: usar la última corrida publicada en ./artefactos.")
     args = parser.parse_args()
 
+    pipeline_kwargs = dict(
+        horizonte=args.horizonte, backend=args.backend,
+        fuera_de_memoria=args.fuera_de_memoria, memoria_max_mb=args.memoria_max_mb,
+        bajo_consumo=args.bajo_consumo, reporte_memoria=args.reporte_memoria,
+    )
     try:
-        artifacts = pipeline()
+        if args.desde_artefactos:
+            artifacts = load_published_artifacts()
+        elif args.run_streamlit and STREAMLIT_AVAILABLE:
+            # Streamlit re-ejecuta el script en cada interacción: el pipeline sólo corre
+            # de nuevo si cambian los Excel o la configuración
+            artifacts = cached_pipeline(**pipeline_kwargs)
+        else:
+            artifacts = pipeline(**pipeline_kwargs)
     except Exception as e:
         print("Error en pipeline:", e)
         raise
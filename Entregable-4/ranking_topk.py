@@ -0,0 +1,206 @@
+"""
+ranking_topk.py
+Motor de ranking Top-K para Aurelion:
+- selección parcial (np.partition) en lugar de ordenar todo el catálogo
+- modo streaming: procesa el catálogo por bloques (chunks) y sólo guarda K candidatos
+- Top-K por grupo (categoría, ciudad, ...) para varias agrupaciones en una sola pasada
+- los nombres de producto se unen sólo a los ganadores, no a todo el ranking
+- empates resueltos por id_producto (resultado determinístico)
+- NaN al final, como sort_values (sólo aparecen si hay menos de K valores válidos)
+
+Instrucciones:
+- Uso desde el pipeline:
+    ranking = top_k_frame(preds_series, k=10, value_name="predicted_quantity")
+    ranking = attach_names(ranking, productos_df)
+- Benchmark con un catálogo sintético:
+    python ranking_topk.py --n 5000000 --k 10
+"""
+
+import time
+import numpy as np
+import pandas as pd
+
+ID_COL = "id_producto"
+MAX_GROUPS_PARTITION = 256  # hasta cuántos grupos conviene una selección parcial por grupo
+
+
+# ---------------------------
+# Selección parcial
+# ---------------------------
+def top_k_indices(values, k, ids=None):
+    """
+    Índices de los K valores más grandes, ordenados de mayor a menor.
+    Sólo ordena los candidatos (>= K-ésimo valor), no el array completo.
+    """
+    values = np.asarray(values)
+    n = values.shape[0]
+    ids = np.arange(n) if ids is None else np.asarray(ids)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if values.dtype.kind == "f":
+        nan = np.isnan(values)
+        if nan.any():
+            # Con NaN el K-ésimo valor de np.partition puede ser NaN (y `>= nan` es todo False):
+            # se elige entre los válidos y los NaN completan al final, por id
+            valid, missing = np.flatnonzero(~nan), np.flatnonzero(nan)
+            top = valid[top_k_indices(values[valid], k, ids[valid])]
+            rest = missing[np.argsort(ids[missing], kind="stable")][:k - len(top)]
+            return np.concatenate([top, rest])
+    if k < n:
+        kth = np.partition(values, n - k)[n - k]
+        cand = np.flatnonzero(values >= kth)  # puede haber más de K por empates
+    else:
+        cand = np.arange(n)
+    order = np.lexsort((ids[cand], -values[cand]))
+    return cand[order][:k]
+
+
+def top_k_frame(series, k, value_name=None):
+    """Top-K de una Series indexada por id_producto -> DataFrame (id_producto, valor)."""
+    value_name = value_name or series.name
+    idx = top_k_indices(series.to_numpy(), k, ids=series.index.to_numpy())
+    return pd.DataFrame({
+        ID_COL: series.index.to_numpy()[idx],
+        value_name: series.to_numpy()[idx],
+    })
+
+
+def top_k_by_group(ids, values, groups, k):
+    """
+    Top-K dentro de cada grupo (ej. categoría o ciudad).
+    Devuelve DataFrame (grupo, id_producto, valor, rank) con a lo sumo K filas por grupo.
+    Con pocos grupos hace una selección parcial por grupo (O(n) cada una);
+    con muchos grupos ordena una sola vez por (grupo, -valor, id).
+    """
+    ids = np.asarray(ids)
+    values = np.asarray(values)
+    # Con una Series categórica la factorización es gratis (ya tiene los códigos)
+    groups = groups if isinstance(groups, pd.Series) else np.asarray(groups)
+    codes, labels = pd.factorize(groups, use_na_sentinel=False)
+    labels = np.asarray(labels)
+    if len(labels) <= MAX_GROUPS_PARTITION:
+        keep, rank = [], []
+        for g in range(len(labels)):
+            members = np.flatnonzero(codes == g)
+            sel = members[top_k_indices(values[members], k, ids[members])]
+            keep.append(sel)
+            rank.append(np.arange(1, len(sel) + 1))
+        keep = np.concatenate(keep) if keep else np.empty(0, dtype=np.int64)
+        rank = np.concatenate(rank) if rank else np.empty(0, dtype=np.int64)
+    else:
+        order = np.lexsort((ids, -values, codes))
+        sorted_codes = codes[order]
+        starts = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+        lengths = np.diff(np.r_[starts, len(order)])
+        position = np.arange(len(order)) - np.repeat(starts, lengths)
+        keep = order[position < k]
+        rank = position[position < k] + 1
+    return pd.DataFrame({
+        "grupo": labels[codes[keep]],
+        ID_COL: ids[keep],
+        "valor": values[keep],
+        "rank": rank,
+    })
+
+
+# ---------------------------
+# Streaming por bloques
+# ---------------------------
+class StreamingTopK:
+    """
+    Mantiene el Top-K global y el Top-K por cada agrupación mientras se recorre
+    el catálogo por bloques. Memoria: K candidatos por grupo, no el catálogo.
+    """
+
+    def __init__(self, k, group_cols=()):
+        self.k = k
+        self.group_cols = list(group_cols)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=np.float64)
+        self.groups = {col: pd.DataFrame(columns=["grupo", ID_COL, "valor"]) for col in self.group_cols}
+        self.n_seen = 0
+
+    def update(self, chunk, value_col):
+        """Incorpora un bloque (DataFrame con id_producto, value_col y las columnas de grupo)."""
+        ids = chunk[ID_COL].to_numpy()
+        values = chunk[value_col].to_numpy(dtype=np.float64)
+        self.n_seen += len(chunk)
+
+        # Global: candidatos actuales + mejores K del bloque
+        local = top_k_indices(values, self.k, ids)
+        all_ids = np.concatenate([self.ids, ids[local]])
+        all_values = np.concatenate([self.values, values[local]])
+        keep = top_k_indices(all_values, self.k, all_ids)
+        self.ids, self.values = all_ids[keep], all_values[keep]
+
+        # Por grupo: mismo esquema, con las K mejores de cada grupo
+        for col in self.group_cols:
+            local = top_k_by_group(ids, values, chunk[col], self.k)
+            prev = self.groups[col]
+            merged = pd.concat([prev, local[["grupo", ID_COL, "valor"]]], ignore_index=True) if len(prev) else local
+            self.groups[col] = top_k_by_group(
+                merged[ID_COL].to_numpy(), merged["valor"].to_numpy(dtype=np.float64), merged["grupo"].to_numpy(), self.k
+            )
+
+    def result(self, value_name="valor"):
+        """Dict con el ranking global ('global') y uno por cada columna de grupo."""
+        out = {"global": pd.DataFrame({ID_COL: self.ids, value_name: self.values})}
+        for col in self.group_cols:
+            out[col] = self.groups[col].rename(columns={"grupo": col, "valor": value_name})
+        return out
+
+
+# ---------------------------
+# Nombres sólo para los ganadores
+# ---------------------------
+def attach_names(ranking, productos_df, name_col="nombre_producto"):
+    """Agrega el nombre de producto a las filas del ranking (K filas, no el catálogo)."""
+    if productos_df is None or name_col not in productos_df.columns:
+        return ranking
+    nombres = productos_df[[ID_COL, name_col]].drop_duplicates(ID_COL)
+    nombres = nombres[nombres[ID_COL].isin(ranking[ID_COL])]
+    return ranking.merge(nombres, on=ID_COL, how="left")
+
+
+# ---------------------------
+# Benchmark
+# ---------------------------
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark del ranking Top-K con un catálogo sintético")
+    parser.add_argument("--n", type=int, default=5_000_000, help="Cantidad de SKUs sintéticos.")
+    parser.add_argument("--k", type=int, default=10, help="Tamaño del Top-K.")
+    parser.add_argument("--chunk", type=int, default=1_000_000, help="Tamaño de bloque para el modo streaming.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    catalogo = pd.DataFrame({
+        ID_COL: np.arange(args.n),
+        "predicted_quantity": rng.gamma(2.0, 3.0, args.n),
+        "categoria": pd.Categorical(rng.choice(["Alimentos", "Limpieza", "Bebidas", "Perfumería"], args.n)),
+        "ciudad": pd.Categorical(rng.choice(["Córdoba", "Carlos Paz", "Rio Cuarto", "Villa María", "Alta Gracia"], args.n)),
+    })
+    serie = catalogo.set_index(ID_COL)["predicted_quantity"]
+    print(f"=== Benchmark Top-{args.k} sobre {args.n:,} SKUs ===")
+
+    t0 = time.perf_counter()
+    completo = serie.sort_values(ascending=False).head(args.k)
+    t_sort = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    parcial = top_k_frame(serie, args.k)
+    t_topk = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    motor = StreamingTopK(args.k, group_cols=["categoria", "ciudad"])
+    for start in range(0, args.n, args.chunk):
+        motor.update(catalogo.iloc[start:start + args.chunk], "predicted_quantity")
+    resultado = motor.result("predicted_quantity")
+    t_stream = time.perf_counter() - t0
+
+    assert np.allclose(np.sort(completo.to_numpy())[::-1], parcial["predicted_quantity"].to_numpy())
+    assert np.array_equal(parcial[ID_COL].to_numpy(), resultado["global"][ID_COL].to_numpy())
+    print(f"sort_values completo           : {t_sort * 1000:8.1f} ms")
+    print(f"Top-K parcial                  : {t_topk * 1000:8.1f} ms")
+    print(f"Streaming global+categoría+ciudad ({args.chunk:,} por bloque): {t_stream * 1000:8.1f} ms")
+    print(resultado["categoria"].head(args.k).to_string(index=False))
@@ -0,0 +1,174 @@
+"""
+resumen_dashboard.py
+Resumen precalculado para el dashboard de Streamlit (el mismo resumen_dashboard.json de utils/):
+- el pipeline arma la tabla de hechos (construir_hechos) y los KPIs y series
+  (construir_resumen) una vez por corrida y los guarda junto a los demás artefactos
+- el dashboard lo lee en lugar de recalcular sumas, nunique y groupbys en cada rerun
+- huella: sha256 de cada Excel de origen; leer_resumen() devuelve None si el archivo
+  falta, es de otro formato o algún Excel cambió, y el dashboard calcula en vivo con
+  las mismas funciones
+- con la tabla de ventas, kpis["ventas"] es len(ventas) y kpis["clientes_con_ventas"]
+  cuenta los clientes de ventas: los KPIs originales (merge left desde ventas), que
+  también cuentan las ventas sin líneas
+
+Uso (lo usan pipeline() y run_streamlit_app() de proyecto_aurelion.py):
+    hechos = construir_hechos(dfs["ventas"], dfs["detalle"], dfs["productos"], dfs["clientes"])
+    guardar_resumen(construir_resumen(hechos, dfs["clientes"], ventas=dfs["ventas"], huella=...))
+    resumen = leer_resumen(RESUMEN_PATH, BASE_DIR)  # None -> calcular en vivo
+"""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+RESUMEN_PATH = Path("resumen_dashboard.json")
+FORMATO = 2  # mismo formato que utils/resumen_dashboard.py: un resumen de otro formato se ignora
+SERIES_FECHA = ("mensual_total", "mensual", "diaria")  # su columna "periodo" es una fecha
+
+
+def huella_contenido(rutas):
+    """sha256 del contenido de cada archivo, por nombre (las copias en otra carpeta coinciden)."""
+    huella = {}
+    for ruta in rutas:
+        digest = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                digest.update(bloque)
+        huella[os.path.basename(ruta)] = digest.hexdigest()
+    return huella
+
+
+# ---------------------------
+# Tabla de hechos y resumen
+# ---------------------------
+def construir_hechos(ventas, detalle, productos=None, clientes=None):
+    """
+    Una fila por línea de detalle con la fecha y el cliente de su venta, la categoría
+    del producto y el nombre del cliente. importe: la columna del detalle; si no está,
+    cantidad * precio_unitario (el del detalle o, si falta, el de productos).
+    No modifica los DataFrames recibidos (preprocess_and_merge renombra en el lugar).
+    """
+    import pandas as pd
+
+    ventas = ventas.rename(columns={"fecha_venta": "fecha"}) if "fecha" not in ventas.columns else ventas
+    cabecera = ventas[[c for c in ("id_venta", "fecha", "id_cliente", "nombre_cliente") if c in ventas.columns]]
+    hechos = detalle.drop(columns=[c for c in cabecera.columns if c != "id_venta"], errors="ignore")
+    hechos = hechos.merge(cabecera, on="id_venta", how="inner")
+
+    if productos is not None:
+        catalogo = productos[[c for c in ("id_producto", "nombre_producto", "categoria", "precio_unitario") if c in productos.columns]]
+        hechos = hechos.merge(catalogo.drop(columns=[c for c in hechos.columns if c != "id_producto"], errors="ignore"),
+                              on="id_producto", how="left")
+        catalogo = catalogo.set_index("id_producto")
+        for col in ("nombre_producto", "precio_unitario"):
+            if col in catalogo.columns:
+                hechos[col] = hechos[col].fillna(hechos["id_producto"].map(catalogo[col]))
+    if clientes is not None and "nombre_cliente" not in hechos.columns and "nombre_cliente" in clientes.columns:
+        hechos = hechos.merge(clientes[["id_cliente", "nombre_cliente"]], on="id_cliente", how="left")
+
+    if "importe" not in hechos.columns:
+        hechos["importe"] = hechos["cantidad"] * hechos["precio_unitario"]
+    hechos["fecha"] = pd.to_datetime(hechos["fecha"])
+    columnas = ["fecha", "id_venta", "id_cliente", "nombre_cliente", "id_producto", "nombre_producto",
+                "categoria", "cantidad", "importe"]
+    return hechos[[c for c in columnas if c in hechos.columns]]
+
+
+def construir_resumen(hechos, clientes=None, importe="importe", huella=None, ventas=None):
+    """
+    KPIs y series (por producto, cliente, categoría, mes y día) de la tabla de hechos.
+    nombre_cliente y categoria son opcionales: sin ellas no se arma esa serie.
+    """
+    import pandas as pd
+
+    fecha = pd.to_datetime(hechos["fecha"])
+    valores = pd.DataFrame({"cantidad": hechos["cantidad"], "importe": hechos[importe]})
+
+    def por(*claves):
+        return valores.groupby(list(claves)).sum().reset_index()
+
+    mes = fecha.dt.to_period("M").dt.to_timestamp().rename("periodo")
+    series = {
+        "productos": por(hechos["nombre_producto"]),
+        "mensual_total": por(mes),
+        "mensual": por(mes, hechos["nombre_producto"]),
+        "diaria": por(fecha.dt.normalize().rename("periodo"), hechos["nombre_producto"]),
+    }
+    if "nombre_cliente" in hechos.columns:
+        series["clientes"] = por(hechos["nombre_cliente"])
+    if "categoria" in hechos.columns:
+        series["categorias"] = por(hechos["categoria"])
+
+    kpis = {
+        "unidades": valores["cantidad"].sum(),
+        "importe": valores["importe"].sum(),
+        "ventas": len(ventas) if ventas is not None else hechos["id_venta"].nunique(),
+        "productos": hechos["id_producto"].nunique(),
+        "clientes": hechos["id_cliente"].nunique(),
+    }
+    if clientes is not None:
+        kpis["clientes_registrados"] = len(clientes)
+    if ventas is not None:
+        kpis["clientes_con_ventas"] = ventas["id_cliente"].nunique()
+
+    return {
+        "formato": FORMATO,
+        "creado": time.time(),
+        "origen": "en vivo",
+        "huella": huella or {},
+        "kpis": {clave: valor.item() if hasattr(valor, "item") else valor for clave, valor in kpis.items()},
+        "series": series,
+        "figuras": {},
+    }
+
+
+# ---------------------------
+# Lectura y escritura
+# ---------------------------
+def guardar_resumen(resumen, ruta=RESUMEN_PATH):
+    """Escribe el resumen como JSON (tmp + os.replace: un lector nunca ve un archivo a medias)."""
+    contenido = {clave: valor for clave, valor in resumen.items() if clave not in ("series", "origen")}
+    contenido["series"] = {
+        nombre: json.loads(serie.to_json(orient="split", index=False, date_format="iso"))
+        for nombre, serie in resumen["series"].items()
+    }
+    tmp = f"{ruta}.{uuid.uuid4().hex[:6]}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(contenido, f, ensure_ascii=False)
+    os.replace(tmp, ruta)
+    return Path(ruta)
+
+
+def leer_resumen(ruta=RESUMEN_PATH, carpeta_datos=None):
+    """
+    Resumen guardado por el pipeline, o None si falta, es de otro formato o (con
+    carpeta_datos) algún Excel de la huella cambió: en ese caso hay que calcular en vivo.
+    """
+    import pandas as pd
+
+    if not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            contenido = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠ Resumen ilegible ({e}): se calcula en vivo")
+        return None
+    if contenido.get("formato") != FORMATO:
+        return None
+    if carpeta_datos is not None:
+        rutas = [os.path.join(carpeta_datos, nombre) for nombre in contenido["huella"]]
+        if not all(os.path.exists(r) for r in rutas) or huella_contenido(rutas) != contenido["huella"]:
+            print("⚠ Resumen desactualizado (cambiaron los Excel): se calcula en vivo")
+            return None
+
+    series = {}
+    for nombre, datos in contenido["series"].items():
+        serie = pd.DataFrame(datos["data"], columns=datos["columns"])
+        if nombre in SERIES_FECHA:
+            serie["periodo"] = pd.to_datetime(serie["periodo"]).dt.tz_localize(None)
+        series[nombre] = serie
+    return {**contenido, "series": series, "origen": "pipeline"}
@@ -0,0 +1,310 @@
+"""
+servicio_scoring.py
+Servicio local de scoring por lotes para el modelo de Aurelion:
+- carga el bosque UNA sola vez al iniciar (model_random_forest.npz vía forest_numpy, o el .joblib)
+- HTTP sólo en localhost (127.0.0.1)
+- acepta filas de features o ids de producto y devuelve cantidades predichas
+- agrupa (micro-batching) las requests concurrentes en una sola llamada a predict
+- cache de predicciones (cache_predicciones.py) delante del modelo, versionada por el
+  contenido del artefacto cargado: las filas ya puntuadas no se vuelven a predecir
+- reporta percentiles de latencia por request y throughput
+
+Instrucciones:
+- Correr antes el pipeline (python proyecto_aurelion.py) para tener el modelo exportado
+- Iniciar el servicio:
+    python servicio_scoring.py --port 8600
+- Consultas:
+    curl -X POST localhost:8600/predict -d '{"rows": [[3, 1, 0], [5, 2, 4]]}'
+    curl -X POST localhost:8600/predict -d '{"ids": [18, 59]}'
+    curl localhost:8600/stats
+- Sin cache de predicciones: python servicio_scoring.py --sin-cache
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import numpy as np
+
+from cache_predicciones import PredictionCache, cached_predict, model_version
+from forest_numpy import load_forest, predict_forest, FOREST_PATH
+
+HOST = "127.0.0.1"
+PORT = 8600
+MAX_BATCH_ROWS = 4096   # tope de filas por llamada a predict
+MAX_WAIT_MS = 2.0       # cuánto espera el batcher a que lleguen más requests
+LATENCY_WINDOW = 10000  # últimas N latencias usadas para los percentiles
+# Base propia: la del pipeline se versiona con el bosque en memoria y se invalidarían entre sí
+CACHE_PATH = Path("predicciones_servicio.sqlite")
+
+
+# ---------------------------
+# Carga del modelo y de las features por producto
+# ---------------------------
+def load_predict_fn(forest_path=FOREST_PATH, model_path=None):
+    """Devuelve (predict(X), n_features del modelo) cargando el modelo una única vez."""
+    if model_path is not None:
+        import joblib
+        model = joblib.load(model_path)
+        print(f"Modelo sklearn cargado desde {model_path}")
+        return model.predict, int(model.n_features_in_)
+    forest = load_forest(forest_path)
+    print(f"Bosque NumPy cargado desde {forest_path}: {len(forest['roots'])} árboles")
+    return lambda X: predict_forest(forest, X), int(forest["n_features"])
+
+
+def load_product_features():
+    """
+    Arma las features por producto igual que el pipeline (últimos meses del pivot),
+    para poder puntuar por id_producto. Devuelve (dict id -> fila, n_features).
+    """
+    from proyecto_aurelion import (
+        load_datasets,
+        standardize_columns,
+        preprocess_and_merge,
+        build_monthly_table,
+        create_supervised_dataset,
+        PAST_MONTHS_FEATURES,
+    )
+    dfs = standardize_columns(load_datasets())
+    pivot = build_monthly_table(preprocess_and_merge(dfs))
+    X, _, _, _ = create_supervised_dataset(pivot, n_lags=PAST_MONTHS_FEATURES)
+    values = X.to_numpy(dtype=np.float64)
+    return {int(pid): values[i] for i, pid in enumerate(X.index)}, values.shape[1]
+
+
+# ---------------------------
+# Micro-batching
+# ---------------------------
+class MicroBatcher:
+    """
+    Junta las filas de requests concurrentes y las predice en una sola llamada.
+    Cada request espera su porción del resultado.
+    """
+
+    def __init__(self, predict_fn, max_batch_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.perf_counter()
+        self.n_requests = 0
+        self.n_rows = 0
+        self.n_batches = 0
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def submit(self, rows):
+        """Encola un bloque de filas y bloquea hasta tener sus predicciones."""
+        item = {"rows": rows, "done": threading.Event(), "result": None, "error": None}
+        self.pending.put(item)
+        item["done"].wait()
+        if item["error"] is not None:
+            raise item["error"]
+        return item["result"]
+
+    def _run(self):
+        while True:
+            batch = [self.pending.get()]
+            n_rows = len(batch[0]["rows"])
+            deadline = time.perf_counter() + self.max_wait
+            while n_rows < self.max_batch_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n_rows += len(item["rows"])
+
+            try:
+                preds = self.predict_fn(np.vstack([item["rows"] for item in batch]))
+                start = 0
+                for item in batch:
+                    end = start + len(item["rows"])
+                    item["result"] = preds[start:end]
+                    start = end
+            except Exception:
+                # Reintentar de a una: el error le llega sólo a la request que lo causa
+                for item in batch:
+                    try:
+                        item["result"] = self.predict_fn(item["rows"])
+                    except Exception as e:
+                        item["error"] = e
+            with self.lock:
+                self.n_batches += 1
+            for item in batch:
+                item["done"].set()
+
+    def record(self, latency_ms, n_rows):
+        with self.lock:
+            self.latencies.append(latency_ms)
+            self.n_requests += 1
+            self.n_rows += n_rows
+
+    def stats(self):
+        """Percentiles de latencia (ms) y throughput desde el arranque."""
+        with self.lock:
+            lat = np.array(self.latencies) if self.latencies else np.zeros(1)
+            elapsed = time.perf_counter() - self.started
+            return {
+                "requests": self.n_requests,
+                "rows": self.n_rows,
+                "batches": self.n_batches,
+                "avg_rows_per_batch": self.n_rows / self.n_batches if self.n_batches else 0.0,
+                "latency_ms": {
+                    "p50": float(np.percentile(lat, 50)),
+                    "p95": float(np.percentile(lat, 95)),
+                    "p99": float(np.percentile(lat, 99)),
+                    "max": float(lat.max()),
+                },
+                "throughput_rps": self.n_requests / elapsed,
+                "throughput_rows_s": self.n_rows / elapsed,
+                "uptime_s": elapsed,
+            }
+
+
+# ---------------------------
+# Servidor HTTP
+# ---------------------------
+class ScoringHandler(BaseHTTPRequestHandler):
+    """POST /predict con {"rows": [[...]]} o {"ids": [...]}; GET /stats; GET /health."""
+
+    batcher = None
+    cache = None  # PredictionCache delante del modelo (None = sin cache)
+    product_features = {}
+    n_features = None  # del modelo cargado: toda fila se valida contra este ancho
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            stats = self.batcher.stats()
+            if self.cache is not None:
+                stats["cache"] = self.cache.stats()
+            self._send_json(200, stats)
+        elif self.path == "/health":
+            self._send_json(200, {"status": "ok", "productos": len(self.product_features)})
+        else:
+            self._send_json(404, {"error": f"Ruta desconocida: {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": f"Ruta desconocida: {self.path}"})
+            return
+        t0 = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            rows, ids = self._parse(payload)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            preds = self.batcher.submit(rows)
+        except Exception as e:
+            self._send_json(500, {"error": f"Error en predict: {e}"})
+            return
+        latency_ms = (time.perf_counter() - t0) * 1000
+        self.batcher.record(latency_ms, len(rows))
+
+        response = {"predicted_quantity": [float(p) for p in preds], "latency_ms": latency_ms}
+        if ids is not None:
+            response["id_producto"] = ids
+        self._send_json(200, response)
+
+    def _parse(self, payload):
+        if not isinstance(payload, dict):
+            raise ValueError("El cuerpo debe ser un objeto JSON con 'rows' o 'ids'")
+        if "ids" in payload:
+            if not isinstance(payload["ids"], list) or not payload["ids"]:
+                raise ValueError("'ids' debe ser una lista no vacía")
+            ids = [int(i) for i in payload["ids"]]
+            faltantes = [i for i in ids if i not in self.product_features]
+            if faltantes:
+                raise KeyError(f"Productos sin features: {faltantes}")
+            return np.array([self.product_features[i] for i in ids], dtype=np.float64), ids
+        if "rows" in payload:
+            rows = np.asarray(payload["rows"], dtype=np.float64)  # filas desparejas: ValueError
+            if rows.ndim == 1:
+                rows = rows.reshape(1, -1)
+            if rows.ndim != 2 or rows.size == 0:
+                raise ValueError("'rows' debe ser una lista no vacía de filas de features")
+            if rows.shape[1] != self.n_features:
+                raise ValueError(f"Cada fila debe tener {self.n_features} features")
+            return rows, None
+        raise ValueError("El cuerpo debe incluir 'rows' o 'ids'")
+
+    def log_message(self, format, *args):
+        pass  # sin log por request: las métricas están en /stats
+
+
+class ScoringServer(ThreadingHTTPServer):
+    request_queue_size = 256  # backlog amplio para ráfagas de clientes concurrentes
+
+
+def serve(host=HOST, port=PORT, forest_path=FOREST_PATH, model_path=None, with_products=True,
+          max_batch_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS, cache_path=CACHE_PATH):
+    """Carga modelo (+ features por producto) y atiende requests hasta Ctrl+C (cache_path=None: sin cache)."""
+    predict_fn, ScoringHandler.n_features = load_predict_fn(forest_path, model_path)
+    if cache_path is not None:
+        # El artefacto cargado es fijo: su contenido es la versión de las entradas de la cache
+        ScoringHandler.cache = PredictionCache(cache_path, model_version(path=model_path or forest_path))
+        predict_model = predict_fn
+        predict_fn = lambda X: cached_predict(ScoringHandler.cache, predict_model, X)
+        print(f"Cache de predicciones en {cache_path}: {ScoringHandler.cache.stats()['entradas']} entradas")
+    ScoringHandler.batcher = MicroBatcher(predict_fn, max_batch_rows, max_wait_ms)
+    if with_products:
+        ScoringHandler.product_features, n_features = load_product_features()
+        if n_features != ScoringHandler.n_features:
+            raise ValueError(f"Las features por producto tienen {n_features} columnas y el modelo espera "
+                             f"{ScoringHandler.n_features}: volver a correr el pipeline")
+        print(f"Features cargadas para {len(ScoringHandler.product_features)} productos")
+
+    server = ScoringServer((host, port), ScoringHandler)
+    print(f"Servicio de scoring escuchando en http://{host}:{port} (Ctrl+C para salir)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("\n=== Estadísticas finales ===")
+        print(json.dumps(ScoringHandler.batcher.stats(), indent=2))
+        if ScoringHandler.cache is not None:
+            print(json.dumps({"cache": ScoringHandler.cache.stats()}, indent=2))
+            ScoringHandler.cache.close()
+
+
+# ---------------------------
+# Main
+# ---------------------------
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Servicio local de scoring por lotes (modelo cargado una sola vez)")
+    parser.add_argument("--port", type=int, default=PORT, help="Puerto HTTP en 127.0.0.1.")
+    parser.add_argument("--forest", type=Path, default=FOREST_PATH, help="Bosque exportado con forest_numpy.py.")
+    parser.add_argument("--model", type=Path, default=None, help="Usar el .joblib de sklearn en lugar del bosque NumPy.")
+    parser.add_argument("--sin-productos", action="store_true", help="No cargar los Excel: sólo se aceptan filas de features.")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_ROWS, help="Máximo de filas por llamada a predict.")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS, help="Espera máxima para juntar requests.")
+    parser.add_argument("--cache", type=Path, default=CACHE_PATH, help="Base SQLite de la cache de predicciones.")
+    parser.add_argument("--sin-cache", action="store_true", help="Predecir siempre con el modelo, sin cache.")
+    args = parser.parse_args()
+
+    serve(HOST, args.port, args.forest, args.model, not args.sin_productos, args.max_batch, args.max_wait_ms,
+          None if args.sin_cache else args.cache)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Los módulos de Entregable-4 son scripts sueltos (sin paquete): se importan por ruta
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
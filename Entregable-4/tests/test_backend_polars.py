@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+import proyecto_aurelion as pa
+
+pl_backend = pytest.importorskip("backend_polars")
+pytest.importorskip("polars")
+
+
+def _dfs():
+    ventas = pd.DataFrame({
+        "id_venta": [3, 1, 2, 4],  # desordenadas: el merge debe conservar el orden de ventas
+        "fecha": pd.to_datetime(["2024-02-10", "2024-01-05", "2024-01-20", "2024-03-01"]),
+        "id_cliente": [1, 2, 1, 3],
+        "medio_pago": ["qr", "efectivo", "tarjeta", "qr"],
+    })
+    detalle = pd.DataFrame({  # la venta 4 no tiene renglones
+        "id_venta": [1, 1, 2, 3],
+        "id_producto": [10, 20, 10, 20],
+        "cantidad": [2, 1, 5, 3],
+        "precio_unitario": [100, 250, 100, 250],
+    })
+    productos = pd.DataFrame({
+        "id_producto": [10, 20],
+        "nombre_producto": ["Yerba", "Azúcar"],
+        "precio_unitario": [100, 250],
+    })
+    return {"ventas": ventas, "detalle": detalle, "productos": productos}
+
+
+def test_polars_igual_a_pandas_con_venta_sin_detalle():
+    merged_pd = pa.preprocess_and_merge({k: v.copy() for k, v in _dfs().items()})
+    pivot_pd = pa.build_monthly_table(merged_pd)
+    merged_pl, pivot_pl = pl_backend.merge_and_pivot(_dfs())
+
+    pd.testing.assert_frame_equal(merged_pd.reset_index(drop=True), merged_pl.reset_index(drop=True))
+    pd.testing.assert_frame_equal(pivot_pd, pivot_pl)
+    assert pivot_pl.index.tolist() == [10, 20]
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pandas as pd
+
+from batch_tiendas import consolidate, run_batch
+
+
+def _tienda_falsa(name, data_dir, output_dir, horizonte):
+    if name == "rota":
+        os._exit(3)  # el proceso muere sin devolver resultado, como un OOM kill
+    if name == "sale":
+        sys.exit(0)  # SystemExit no es Exception
+    if name == "muda":
+        os._exit(0)  # termina bien pero sin resultado
+    return {"tienda": name, "estado": "ok", "error": None, "segundos": 0.0}
+
+
+def test_un_proceso_que_muere_no_afecta_a_las_demas_tiendas(tmp_path):
+    stores = [(name, tmp_path) for name in ("a", "rota", "b", "c", "d")]
+    results, _ = run_batch(stores, tmp_path / "salida", workers=2, store_fn=_tienda_falsa)
+    estados = {r["tienda"]: r["estado"] for r in results}
+    assert estados == {"a": "ok", "rota": "error", "b": "ok", "c": "ok", "d": "ok"}
+    assert "código 3" in next(r["error"] for r in results if r["tienda"] == "rota")
+
+
+def test_un_proceso_que_sale_con_codigo_0_no_cuelga_el_batch(tmp_path):
+    stores = [(name, tmp_path) for name in ("a", "sale", "muda", "b")]
+    results, _ = run_batch(stores, tmp_path / "salida", workers=2, store_fn=_tienda_falsa)
+    errores = {r["tienda"]: r["error"] for r in results if r["estado"] == "error"}
+    assert set(errores) == {"sale", "muda"}
+    assert errores["sale"].startswith("SystemExit")
+    assert "sin devolver resultado" in errores["muda"]
+
+
+def test_consolidado_suma_las_predicciones_completas_de_cada_tienda():
+    def tienda(name, cantidades):
+        predicciones = pd.DataFrame({"id_producto": list(cantidades), "predicted_quantity": list(cantidades.values())})
+        return {"tienda": name, "estado": "ok", "predicciones": predicciones,
+                "ranking_predicho": predicciones.nlargest(1, "predicted_quantity")}
+
+    # El producto 2 no es el top de ninguna tienda pero es el que más vende en total
+    results = [tienda("norte", {1: 10.0, 2: 9.0, 3: 0.0}), tienda("sur", {1: 0.0, 2: 9.0, 3: 10.0})]
+    consolidado, detalle = consolidate(results)
+    assert consolidado["id_producto"].tolist() == [2, 1, 3]
+    assert consolidado["predicted_quantity"].tolist() == [18.0, 10.0, 10.0]
+    assert len(detalle) == 2
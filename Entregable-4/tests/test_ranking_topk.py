@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from ranking_topk import top_k_frame, top_k_indices
+
+
+def test_top_k_con_nan_los_deja_al_final():
+    values = np.array([1, np.nan, 3, np.nan, 2])
+    assert top_k_indices(values, 3).tolist() == [2, 4, 0]
+    assert top_k_indices(values, 2).tolist() == [2, 4]
+    # Más K que valores válidos: los NaN completan, ordenados por id
+    assert top_k_indices(values, 5).tolist() == [2, 4, 0, 1, 3]
+
+
+def test_top_k_con_nan_y_empates_igual_que_sort_values():
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 5, 200).astype(float)
+    values[rng.choice(200, 30, replace=False)] = np.nan
+    serie = pd.Series(values, index=pd.Index(np.arange(1000, 1200), name="id_producto"), name="valor")
+    for k in (1, 10, 50, 180, 200):
+        esperado = serie.reset_index().sort_values(
+            ["valor", "id_producto"], ascending=[False, True], na_position="last"
+        ).head(k)
+        obtenido = top_k_frame(serie, k)
+        assert obtenido["id_producto"].tolist() == esperado["id_producto"].tolist()
+
+
+def test_top_k_empates_por_id():
+    values = np.array([5.0, 7.0, 5.0, 7.0, 5.0])
+    ids = np.array([40, 30, 20, 10, 0])
+    assert top_k_indices(values, 3, ids).tolist() == [3, 1, 4]
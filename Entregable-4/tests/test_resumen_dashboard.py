@@ -0,0 +1,37 @@
+import pandas as pd
+
+from resumen_dashboard import construir_hechos, construir_resumen, guardar_resumen, huella_contenido, leer_resumen
+
+
+def _tablas():
+    ventas = pd.DataFrame({"id_venta": [1, 2, 3], "fecha": ["2024-01-05", "2024-02-10", "2024-02-11"],
+                           "id_cliente": [10, 20, 30], "nombre_cliente": ["Ana", "Beto", "Caro"]})
+    # La venta 3 no tiene líneas
+    detalle = pd.DataFrame({"id_venta": [1, 1, 2], "id_producto": [100, 200, 100], "cantidad": [2, 1, 5],
+                            "precio_unitario": [10.0, 30.0, 10.0]})
+    productos = pd.DataFrame({"id_producto": [100, 200], "nombre_producto": ["Pan", "Leche"],
+                              "categoria": ["Alimentos", "Bebidas"], "precio_unitario": [10.0, 30.0]})
+    return ventas, detalle, productos
+
+
+def test_las_ventas_sin_lineas_cuentan_como_en_el_merge_left_original():
+    ventas, detalle, productos = _tablas()
+    kpis = construir_resumen(construir_hechos(ventas, detalle, productos), ventas=ventas)["kpis"]
+    assert kpis["ventas"] == 3 and kpis["clientes_con_ventas"] == 3
+    assert kpis["unidades"] == 8 and kpis["importe"] == 100.0
+    assert kpis["clientes"] == 2  # clientes con alguna línea
+
+
+def test_el_resumen_guardado_se_ignora_si_cambian_los_datos(tmp_path):
+    ventas, detalle, productos = _tablas()
+    excel = tmp_path / "ventas.xlsx"
+    excel.write_bytes(b"v1")
+    resumen = construir_resumen(construir_hechos(ventas, detalle, productos), huella=huella_contenido([excel]))
+    guardar_resumen(resumen, tmp_path / "resumen.json")
+
+    leido = leer_resumen(tmp_path / "resumen.json", tmp_path)
+    assert leido["origen"] == "pipeline" and leido["kpis"] == resumen["kpis"]
+    pd.testing.assert_frame_equal(leido["series"]["mensual_total"], resumen["series"]["mensual_total"],
+                                  check_dtype=False)
+    excel.write_bytes(b"v2")
+    assert leer_resumen(tmp_path / "resumen.json", tmp_path) is None
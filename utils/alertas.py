@@ -0,0 +1,152 @@
+# ======================================
+# ⚠ MOTOR DE ALERTAS DE VENTAS - PROYECTO G25
+# ======================================
+# Detecta caídas de ventas para TODOS los productos en una sola pasada vectorizada
+# (matriz producto x mes con NumPy), en lugar de filtrar el DataFrame producto por producto.
+# Reglas:
+#   - caida:          variación del último mes vs el promedio de los `ventana` meses previos
+#   - zscore:         último mes vs la media/desvío de su historia (z-score)
+#   - cero_repentino: el último mes no vendió nada y venía vendiendo
+# Devuelve las alertas ordenadas por impacto (unidades o $ perdidos vs la referencia).
+# Lo usan dashboard_dash.py y dashboard_streamlit.py.
+#
+# Benchmark contra el loop original:  python alertas.py --productos 5000
+# ======================================
+
+import numpy as np
+import pandas as pd
+
+REGLAS = ("cero_repentino", "caida", "zscore")  # en orden de prioridad
+CAIDA_PCT = 0.20   # alerta si cae más de 20% vs la referencia
+Z_UMBRAL = -2.0    # alerta si el último mes está 2 desvíos por debajo de su historia
+VENTANA = 1        # meses previos promediados como referencia (1 = mes contra mes)
+MIN_HISTORIA = 3   # meses previos mínimos para calcular el z-score
+
+
+def serie_mensual(df, producto_col="nombre_producto", fecha_col="fecha", valor_col="total"):
+    """Matriz producto x mes (suma de valor_col), con 0 en los meses sin ventas."""
+    mes = pd.to_datetime(df[fecha_col]).dt.to_period("M").dt.to_timestamp()
+    mensual = df[valor_col].groupby([df[producto_col], mes.rename("mes")]).sum()
+    return mensual.unstack("mes", fill_value=0).sort_index(axis=1)
+
+
+def calcular_alertas(mensual, reglas=REGLAS, caida_pct=CAIDA_PCT, z_umbral=Z_UMBRAL,
+                     ventana=VENTANA, min_historia=MIN_HISTORIA):
+    """
+    Evalúa las reglas en el último mes de `mensual` (salida de serie_mensual).
+    Devuelve un DataFrame ordenado por impacto, una fila por producto, con: producto,
+    regla (la de mayor prioridad), reglas (todas las que se cumplen), mes, actual,
+    referencia, cambio_pct, zscore, impacto y descripcion.
+    """
+    columnas = ["producto", "regla", "reglas", "mes", "actual", "referencia", "cambio_pct", "zscore", "impacto", "descripcion"]
+    if mensual.shape[1] < 2:
+        return pd.DataFrame(columns=columnas)
+
+    valores = mensual.to_numpy(dtype="float64")
+    actual = valores[:, -1]
+    previos = valores[:, :-1]
+    referencia = previos[:, -ventana:].mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cambio = np.where(referencia > 0, (actual - referencia) / referencia, np.nan)
+        if previos.shape[1] >= min_historia:
+            desvio = previos.std(axis=1, ddof=1)
+            zscore = np.where(desvio > 0, (actual - previos.mean(axis=1)) / desvio, np.nan)
+        else:
+            zscore = np.full(actual.shape, np.nan)
+
+    mascaras = {
+        "caida": cambio < -caida_pct,
+        "zscore": zscore < z_umbral,
+        "cero_repentino": (actual == 0) & (previos[:, -1] > 0),
+    }
+    partes = []
+    for regla in reglas:
+        idx = np.flatnonzero(mascaras[regla])
+        if idx.size:
+            partes.append(pd.DataFrame({
+                "producto": mensual.index[idx],
+                "regla": regla,
+                "actual": actual[idx],
+                "referencia": referencia[idx],
+                "cambio_pct": cambio[idx],
+                "zscore": zscore[idx],
+            }))
+    if not partes:
+        return pd.DataFrame(columns=columnas)
+
+    alertas = pd.concat(partes, ignore_index=True)
+    reglas_por_producto = alertas.groupby("producto", sort=False)["regla"].agg(", ".join)
+    alertas = alertas.drop_duplicates("producto", ignore_index=True)  # partes en orden de prioridad
+    alertas["reglas"] = alertas["producto"].map(reglas_por_producto)
+    alertas["mes"] = mensual.columns[-1]
+    alertas["impacto"] = alertas["referencia"] - alertas["actual"]
+    alertas["descripcion"] = _descripciones(alertas)
+    return alertas.sort_values(["impacto", "producto"], ascending=[False, True], ignore_index=True)[columnas]
+
+
+def _descripciones(alertas):
+    textos = np.where(
+        alertas["regla"] == "cero_repentino",
+        "sin ventas en el último mes",
+        np.where(
+            alertas["regla"] == "zscore",
+            "muy por debajo de su historia (z = " + alertas["zscore"].round(1).astype(str) + ")",
+            "caída de " + (-alertas["cambio_pct"] * 100).round(1).astype(str) + "% vs el período anterior",
+        ),
+    )
+    return textos
+
+
+def productos_con_alerta(alertas):
+    """Productos únicos en orden de impacto (para mensajes cortos)."""
+    return list(dict.fromkeys(alertas["producto"]))
+
+
+# ======================================
+# Benchmark: loop original vs motor vectorizado
+# ======================================
+def _caidas_loop(ventas_mensuales_prod):
+    """Versión original de dashboard_dash.py (filtra el frame entero por cada producto)."""
+    ultimos = ventas_mensuales_prod["fecha"].sort_values().unique()[-3:]
+    caidas = []
+    for prod in ventas_mensuales_prod["nombre_producto"].unique():
+        subset = ventas_mensuales_prod[ventas_mensuales_prod["nombre_producto"] == prod]
+        subset = subset[subset["fecha"].isin(ultimos)]
+        if len(subset) >= 2:
+            diff = (subset["total"].iloc[-1] - subset["total"].iloc[-2]) / subset["total"].iloc[-2]
+            if diff < -0.2:
+                caidas.append(prod)
+    return caidas
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark del motor de alertas vs el loop por producto")
+    parser.add_argument("--productos", type=int, default=5000)
+    parser.add_argument("--meses", type=int, default=12)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.productos * args.meses
+    df = pd.DataFrame({
+        "nombre_producto": np.repeat([f"Producto {i}" for i in range(args.productos)], args.meses),
+        "fecha": np.tile(pd.date_range("2024-01-01", periods=args.meses, freq="MS"), args.productos),
+        "total": rng.gamma(2.0, 500.0, n).round(2),
+    })
+
+    t0 = time.perf_counter()
+    mensual = serie_mensual(df)
+    alertas = calcular_alertas(mensual, reglas=("caida",))
+    t_motor = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    caidas = _caidas_loop(df.assign(fecha=pd.to_datetime(df["fecha"])))
+    t_loop = time.perf_counter() - t0
+
+    print(f"{args.productos} productos x {args.meses} meses")
+    print(f"loop por producto : {t_loop * 1000:9.1f} ms ({len(caidas)} caídas)")
+    print(f"motor vectorizado : {t_motor * 1000:9.1f} ms ({len(alertas)} caídas)")
+    print("Mismos productos:", set(caidas) == set(alertas["producto"]))
+    print(calcular_alertas(mensual).head(10).to_string(index=False))
@@ -2,16 +2,39 @@
 # 📊 DASHBOARD DE VENTAS - PROYECTO G25
 # ======================================
 # Autor: Alexis Roldan
-# Descripción: Dashboard interactivo con KPIs, gráficos Plotly y alertas automáticas.
+# Descripción: Dashboard interactivo con KPIs, gráficos Plotly y alertas automáticas (alertas.py).
+# Los datos y los gráficos se construyen en callbacks (no al importar) y se guardan
+# en una cache del servidor con TTL, por elemento y versión de los datos. Un vigilante
+# (vigilante.py) recarga los datos en segundo plano cuando cambian los archivos y
+# define la versión servida; cada versión se construye con sus propios datos.
+# La evolución se reduce (LTTB, graficos.py) según el ancho de la pantalla; el detalle
+# diario de un producto se pide al elegirlo en el desplegable.
+# Los gráficos salen del resumen de KPIs y series que deja el pipeline
+# (resumen_dashboard.json); si falta o los Excel cambiaron, se arma en vivo.
+# Sólo en ese caso se arma la tabla unificada: con varios workers (gunicorn) la arma
+# uno solo y los demás la mapean en memoria (tabla_compartida.py, requiere pyarrow);
+# cada worker calcula el resumen y la suelta.
 # ======================================
 
+import os
+import threading
+import time
+from collections import OrderedDict
+
 import pandas as pd
 import plotly.express as px
-from dash import Dash, html, dcc
+import plotly.graph_objects as go
+from dash import Dash, html, dcc, Input, Output, State, no_update
 import dash_bootstrap_components as dbc
 
+from alertas import calcular_alertas, productos_con_alerta
+from graficos import puntos_para_ancho, reducir_series
+from resumen_dashboard import construir_hechos, construir_resumen, leer_resumen, matriz_mensual, top_productos
+from tabla_compartida import ARROW_AVAILABLE, cargar_compartida
+from vigilante import VigilanteDatos, huella_archivos
+
 # =============================
-# 📂 CARGA DE DATOS
+# 📂 CONFIGURACIÓN
 # =============================
 
 # Archivos de entrada (ajustá si cambian los nombres)
@@ -19,134 +42,313 @@ PATH_VENTAS = "./base de datos/ventas.xlsx"
 PATH_DETALLE = "./base de datos/detalle_ventas.xlsx"
 PATH_PRODUCTOS = "./base de datos/productos.xlsx"
 PATH_CLIENTES = "./base de datos/clientes.xlsx"
+PATH_PREDICCIONES = "./top_predichos.csv"  # generado por proyecto_aurelion.py
+PATH_RESUMEN = "./resumen_dashboard.json"  # KPIs y series, también de proyecto_aurelion.py
+
+CACHE_TTL = 10 * 60  # segundos que una entrada se sirve sin recalcular
+MAX_VERSIONES = 2  # versiones de datos en cache: la servida y la que se precalienta
+INTERVALO_REFRESCO_MS = 30 * 1000  # cada cuánto el navegador pregunta si cambiaron los datos
+ANCHO_PANTALLA_PX = 1920  # hasta que el navegador informe el suyo
+FRACCION_EVOLUCION = 0.5  # el gráfico de evolución ocupa media pantalla (md=6)
+
+
+# =============================
+# 🗄 CACHE DEL SERVIDOR
+# =============================
+
+class CacheServidor:
+    """
+    Memoización en memoria del proceso, por (clave, versión de datos):
+    - dentro del TTL -> se devuelve sin recalcular
+    - vencida -> se devuelve el valor y se recalcula en un hilo aparte (el callback no espera)
+    - sin valor -> se calcula en el momento, una sola vez aunque lleguen varios
+      requests juntos (lock por clave y versión)
+    Guarda hasta max_versiones versiones (la servida y la que se precalienta no se
+    pisan); al entrar una más se descarta la usada hace más tiempo.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, max_versiones=MAX_VERSIONES):
+        self.ttl = ttl
+        self.max_versiones = max_versiones
+        self.entradas = {}  # (clave, version) -> (creado, valor)
+        self.versiones = OrderedDict()  # version -> None, de la usada hace más tiempo a la última
+        self.lock = threading.Lock()
+        self.locks_clave = {}
+        self.en_recalculo = set()
+        self.hits = self.misses = 0
+
+    def _lock_de(self, clave, version):
+        with self.lock:
+            return self.locks_clave.setdefault((clave, version), threading.Lock())
+
+    def _entrada(self, clave, version):
+        with self.lock:
+            self._usar_version(version)
+            return self.entradas.get((clave, version))
+
+    def _usar_version(self, version):
+        """Marca la versión como recién usada y descarta las que sobran (con self.lock tomado)."""
+        self.versiones[version] = None
+        self.versiones.move_to_end(version)
+        while len(self.versiones) > self.max_versiones:
+            vieja, _ = self.versiones.popitem(last=False)
+            for llave in [llave for llave in self.entradas if llave[1] == vieja]:
+                del self.entradas[llave]
+            for llave in [llave for llave in self.locks_clave if llave[1] == vieja]:
+                del self.locks_clave[llave]
+
+    def get(self, clave, version, construir):
+        entrada = self._entrada(clave, version)
+        if entrada is None:
+            with self._lock_de(clave, version):
+                entrada = self._entrada(clave, version)
+                if entrada is None:
+                    self.misses += 1
+                    return self._guardar(clave, version, construir())[1]
+        self.hits += 1
+        if time.monotonic() - entrada[0] >= self.ttl:
+            self._recalcular_en_segundo_plano(clave, version, construir)
+        return entrada[1]
+
+    def contiene(self, claves, version):
+        with self.lock:
+            return all((clave, version) in self.entradas for clave in claves)
+
+    def _guardar(self, clave, version, valor):
+        entrada = (time.monotonic(), valor)
+        with self.lock:
+            # si la versión ya se descartó, no se guarda (el valor igual se devuelve)
+            if version in self.versiones:
+                self.entradas[(clave, version)] = entrada
+        return entrada
+
+    def _recalcular_en_segundo_plano(self, clave, version, construir):
+        with self.lock:
+            if (clave, version) in self.en_recalculo:
+                return
+            self.en_recalculo.add((clave, version))
+
+        def tarea():
+            try:
+                self._guardar(clave, version, construir())
+            finally:
+                with self.lock:
+                    self.en_recalculo.discard((clave, version))
+
+        threading.Thread(target=tarea, daemon=True).start()
+
+    def invalidar(self, clave=None):
+        with self.lock:
+            if clave is None:
+                self.entradas.clear()
+            else:
+                for llave in [llave for llave in self.entradas if llave[0] == clave]:
+                    del self.entradas[llave]
+
+    def stats(self):
+        with self.lock:
+            return {"entradas": len(self.entradas), "versiones": len(self.versiones), "hits": self.hits, "misses": self.misses}
+
+
+cache = CacheServidor()
+
+
+def snapshot_datos():
+    """Última versión de los datos ya cargada por el vigilante (no lee archivos)."""
+    return vigilante.snapshot()
 
-try:
-    ventas = pd.read_excel(PATH_VENTAS)
-    detalle = pd.read_excel(PATH_DETALLE)
-    productos = pd.read_excel(PATH_PRODUCTOS)
-    clientes = pd.read_excel(PATH_CLIENTES)
-except Exception as e:
-    raise FileNotFoundError(f"❌ Error al cargar los datos: {e}")
 
 # =============================
-# 🧮 PREPROCESAMIENTO
+# 📂 CARGA Y PREPROCESAMIENTO
 # =============================
 
-# Unir tablas
-df = detalle.merge(ventas, on="id_venta", how="left")
-df = df.merge(productos, on="id_producto", how="left")
-df = df.merge(clientes, on="id_cliente", how="left")
+def cargar_datos():
+    """Tabla de hechos de los 4 Excel (la misma del pipeline, ver resumen_dashboard.construir_hechos)."""
+    try:
+        ventas = pd.read_excel(PATH_VENTAS)
+        detalle = pd.read_excel(PATH_DETALLE)
+        productos = pd.read_excel(PATH_PRODUCTOS)
+        clientes = pd.read_excel(PATH_CLIENTES)
+    except Exception as e:
+        raise FileNotFoundError(f"❌ Error al cargar los datos: {e}")
+    return construir_hechos(ventas, detalle, productos, clientes)
+
+
+def leer_predicciones():
+    """Top de productos predichos por el modelo (top_predichos.csv del pipeline), o None."""
+    if not os.path.exists(PATH_PREDICCIONES):
+        return None
+    preds = pd.read_csv(PATH_PREDICCIONES)
+    etiqueta = "nombre_producto" if "nombre_producto" in preds.columns else "id_producto"
+    preds[etiqueta] = preds[etiqueta].astype(str)
+    return preds
+
+
+ARCHIVOS_DATOS = [PATH_VENTAS, PATH_DETALLE, PATH_PRODUCTOS, PATH_CLIENTES]
+
+
+def cargar_datos_compartidos():
+    """
+    cargar_datos() compartido entre workers: uno solo arma la tabla de estos Excel y la
+    publica; los demás la mapean sin copiarla (sólo lectura). Si la carpeta compartida
+    falla, cada worker usa su copia privada. Se usa sólo cuando el resumen del pipeline
+    falta o quedó viejo (cargar_resumen), y la tabla se suelta apenas se resume.
+    """
+    if not ARROW_AVAILABLE:
+        return cargar_datos()
+    return cargar_compartida("hechos", huella_archivos(ARCHIVOS_DATOS), cargar_datos)
+
+
+def cargar_resumen():
+    """Resumen del pipeline si corresponde a estos Excel; si no, calculado en vivo (mismo formato)."""
+    resumen = leer_resumen(PATH_RESUMEN, os.path.dirname(PATH_VENTAS))
+    if resumen is None:
+        resumen = construir_resumen(cargar_datos_compartidos())
+    return resumen
 
-# Crear columna total
-if "precio_unitario" in df.columns and "cantidad" in df.columns:
-    df["total"] = df["precio_unitario"] * df["cantidad"]
-else:
-    raise KeyError("❌ Faltan columnas 'precio_unitario' o 'cantidad' en los datos.")
 
-# Convertir fechas
-if "fecha_venta" in df.columns:
-    df["fecha_venta"] = pd.to_datetime(df["fecha_venta"])
-else:
-    raise KeyError("❌ Falta la columna 'fecha_venta' en los datos.")
+# Se recarga sólo lo que cambió: los Excel o el resumen -> "resumen", el CSV del pipeline -> "predicciones"
+vigilante = VigilanteDatos({
+    "resumen": (ARCHIVOS_DATOS + [PATH_RESUMEN], cargar_resumen),
+    "predicciones": ([PATH_PREDICCIONES], leer_predicciones),
+})
+
 
 # =============================
 # 📈 KPI CARDS
 # =============================
 
-total_ventas = df["total"].sum()
-clientes_unicos = df["id_cliente"].nunique()
-productos_vendidos = df["id_producto"].nunique()
+def construir_kpis(resumen):
+    total_ventas = resumen["kpis"]["importe"]
+    clientes_unicos = resumen["kpis"]["clientes"]
+    productos_vendidos = resumen["kpis"]["productos"]
+
+    return dbc.Row([
+        dbc.Col(html.Div([
+            html.H6("🏅 Ventas Totales", className="text-muted"),
+            html.H3(f"${total_ventas:,.2f}", className="text-light"),
+        ]), md=4),
+        dbc.Col(html.Div([
+            html.H6("🎮 Clientes únicos", className="text-muted"),
+            html.H3(f"{clientes_unicos}", className="text-light"),
+        ]), md=4),
+        dbc.Col(html.Div([
+            html.H6("📦 Productos vendidos", className="text-muted"),
+            html.H3(f"{productos_vendidos}", className="text-light"),
+        ]), md=4),
+    ], className="text-center mb-4")
 
-kpi_cards = dbc.Row([
-    dbc.Col(html.Div([
-        html.H6("🏅 Ventas Totales", className="text-muted"),
-        html.H3(f"${total_ventas:,.2f}", className="text-light"),
-    ]), md=4),
-    dbc.Col(html.Div([
-        html.H6("🎮 Clientes únicos", className="text-muted"),
-        html.H3(f"{clientes_unicos}", className="text-light"),
-    ]), md=4),
-    dbc.Col(html.Div([
-        html.H6("📦 Productos vendidos", className="text-muted"),
-        html.H3(f"{productos_vendidos}", className="text-light"),
-    ]), md=4),
-], className="text-center mb-4")
 
 # =============================
 # 🎨 GRAFICOS PLOTLY
 # =============================
 
-# --- Top 10 productos ---
-ventas_por_producto = (
-    df.groupby("nombre_producto")
-    .agg({"total": "sum"})
-    .sort_values("total", ascending=False)
-    .head(10)
-    .reset_index()
-)
+def construir_fig_top_productos(resumen):
+    ventas_por_producto = top_productos(resumen, por="importe").rename(columns={"importe": "total"})
 
-fig_top_productos = px.bar(
-    ventas_por_producto,
-    x="total",
-    y="nombre_producto",
-    orientation="h",
-    title="🏆 Top 10 Productos más vendidos (por monto total)",
-    labels={"total": "Monto total ($)", "nombre_producto": "Producto"},
-    color="total",
-    color_continuous_scale=["#3a7bd5", "#00d2ff"]
-)
-fig_top_productos.update_layout(
-    template="plotly_dark",
-    xaxis_title="Monto total ($)",
-    yaxis_title="Producto",
-    yaxis=dict(autorange="reversed"),
-    margin=dict(l=80, r=20, t=60, b=60)
-)
+    fig = px.bar(
+        ventas_por_producto,
+        x="total",
+        y="nombre_producto",
+        orientation="h",
+        title="🏆 Top 10 Productos más vendidos (por monto total)",
+        labels={"total": "Monto total ($)", "nombre_producto": "Producto"},
+        color="total",
+        color_continuous_scale=["#3a7bd5", "#00d2ff"]
+    )
+    fig.update_layout(
+        template="plotly_dark",
+        xaxis_title="Monto total ($)",
+        yaxis_title="Producto",
+        yaxis=dict(autorange="reversed"),
+        margin=dict(l=80, r=20, t=60, b=60)
+    )
+    return fig
+
+
+def puntos_evolucion(ancho_pantalla):
+    return puntos_para_ancho((ancho_pantalla or ANCHO_PANTALLA_PX) * FRACCION_EVOLUCION)
+
+
+def construir_fig_evolucion(resumen, max_puntos=None):
+    """Total mensual, reducido con LTTB a lo sumo a max_puntos (graficos.py)."""
+    ventas_mensuales = resumen["series"]["mensual_total"].rename(columns={"periodo": "fecha", "importe": "total"})
+    ventas_mensuales = reducir_series(ventas_mensuales, "fecha", "total", max_puntos=max_puntos or puntos_evolucion(None))
+
+    fig = px.line(
+        ventas_mensuales,
+        x="fecha",
+        y="total",
+        markers=True,
+        title="📈 Evolución Mensual de Ventas",
+        labels={"fecha": "Mes", "total": "Monto Total ($)"},
+        line_shape="spline",
+    )
+    fig.update_traces(line_color="#3a7bd5", fill="tozeroy", fillcolor="rgba(58,123,213,0.2)")
+    fig.update_layout(template="plotly_dark", margin=dict(l=40, r=40, t=60, b=40))
+    return fig
+
+
+def construir_fig_evolucion_producto(resumen, producto):
+    """Detalle de un producto: ventas diarias, todos los puntos (se pide al elegirlo)."""
+    diaria = resumen["series"]["diaria"]
+    diario = diaria.loc[diaria["nombre_producto"] == producto].rename(columns={"periodo": "fecha", "importe": "total"})
+    fig = px.line(
+        diario,
+        x="fecha",
+        y="total",
+        markers=True,
+        title=f"📈 {producto}: ventas diarias",
+        labels={"fecha": "Día", "total": "Monto Total ($)"},
+    )
+    fig.update_traces(line_color="#00d2ff")
+    fig.update_layout(template="plotly_dark", margin=dict(l=40, r=40, t=60, b=40))
+    return fig
+
+
+def construir_fig_predicciones(preds):
+    """Top de productos predichos por el modelo (top_predichos.csv del pipeline)."""
+    if preds is None:
+        fig = go.Figure()
+        fig.add_annotation(text="Sin predicciones: ejecutar proyecto_aurelion.py", showarrow=False)
+        fig.update_layout(template="plotly_dark", xaxis_visible=False, yaxis_visible=False)
+        return fig
+
+    etiqueta = "nombre_producto" if "nombre_producto" in preds.columns else "id_producto"
+    fig = px.bar(
+        preds.sort_values("predicted_quantity", ascending=False),
+        x="predicted_quantity",
+        y=etiqueta,
+        orientation="h",
+        title="🔮 Cantidad predicha para el próximo mes",
+        labels={"predicted_quantity": "Unidades predichas", etiqueta: "Producto"},
+        color="predicted_quantity",
+        color_continuous_scale=["#8e2de2", "#4a00e0"],
+    )
+    fig.update_layout(template="plotly_dark", yaxis=dict(autorange="reversed"), margin=dict(l=80, r=20, t=60, b=40))
+    return fig
 
-# --- Evolución mensual de ventas ---
-df["fecha"] = pd.to_datetime(df["fecha_venta"])
-ventas_mensuales = (
-    df.groupby(df["fecha"].dt.to_period("M"))
-    .agg({"total": "sum"})
-    .reset_index()
-)
-ventas_mensuales["fecha"] = ventas_mensuales["fecha"].dt.to_timestamp()
-
-fig_evolucion = px.line(
-    ventas_mensuales,
-    x="fecha",
-    y="total",
-    markers=True,
-    title="📈 Evolución Mensual de Ventas",
-    labels={"fecha": "Mes", "total": "Monto Total ($)"},
-    line_shape="spline",
-)
-fig_evolucion.update_traces(line_color="#3a7bd5", fill="tozeroy", fillcolor="rgba(58,123,213,0.2)")
-fig_evolucion.update_layout(template="plotly_dark", margin=dict(l=40, r=40, t=60, b=40))
 
 # =============================
 # ⚠ RECOMENDACIONES AUTOMÁTICAS
 # =============================
 
-ventas_mensuales_prod = (
-    df.groupby([df["fecha"].dt.to_period("M"), "nombre_producto"])
-    .agg({"total": "sum"})
-    .reset_index()
-)
-ventas_mensuales_prod["fecha"] = ventas_mensuales_prod["fecha"].dt.to_timestamp()
+MAX_ALERTAS_DETALLE = 10  # alertas con detalle debajo del mensaje
+
 
-ultimos = ventas_mensuales_prod["fecha"].sort_values().unique()[-3:]
-caidas = []
-for prod in ventas_mensuales_prod["nombre_producto"].unique():
-    subset = ventas_mensuales_prod[ventas_mensuales_prod["nombre_producto"] == prod]
-    subset = subset[subset["fecha"].isin(ultimos)]
-    if len(subset) >= 2:
-        diff = (subset["total"].iloc[-1] - subset["total"].iloc[-2]) / subset["total"].iloc[-2]
-        if diff < -0.2:
-            caidas.append(prod)
+def construir_mensaje(resumen):
+    """Mensaje + detalle de las alertas de mayor impacto (motor vectorizado de alertas.py)."""
+    alertas = calcular_alertas(matriz_mensual(resumen, "importe"))
+    if alertas.empty:
+        return "✅ Todo estable en las ventas recientes."
+
+    caidas = productos_con_alerta(alertas)
+    detalle = html.Ul([
+        html.Li(f"{fila.producto}: {fila.descripcion} (−${fila.impacto:,.0f})", className="text-light fw-normal")
+        for fila in alertas.head(MAX_ALERTAS_DETALLE).itertuples()
+    ], className="list-unstyled small mt-2")
+    return ["⚠ Los siguientes productos muestran caída de ventas: " + ", ".join(caidas), detalle]
 
-mensaje = "✅ Todo estable en las ventas recientes." if not caidas else \
-    "⚠ Los siguientes productos muestran caída de ventas: " + ", ".join(caidas)
 
 # =============================
 # 🧱 LAYOUT DEL DASHBOARD
@@ -154,27 +356,153 @@ mensaje = "✅ Todo estable en las ventas recientes." if not caidas else \
 
 app = Dash(__name__, external_stylesheets=[dbc.themes.CYBORG])
 app.title = "Dashboard de Ventas - G25"
+server = app.server  # para correr con varios workers: gunicorn dashboard_dash:server
 
 app.layout = html.Div([
+    dcc.Interval(id="refresco", interval=INTERVALO_REFRESCO_MS),
+    dcc.Store(id="version_datos"),
+    dcc.Store(id="ancho_pantalla"),
     html.H1("📊 Dashboard de Ventas", className="text-center text-light mt-3"),
-    kpi_cards,
+    html.Div(id="kpis"),
     html.Hr(),
     dbc.Container([
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=fig_top_productos), md=6),
-            dbc.Col(dcc.Graph(figure=fig_evolucion), md=6),
+            dbc.Col(dcc.Loading(dcc.Graph(id="grafico_top_productos")), md=6),
+            dbc.Col([
+                dcc.Dropdown(id="producto_evolucion", placeholder="Detalle diario de un producto…", className="mb-2"),
+                dcc.Loading(dcc.Graph(id="grafico_evolucion")),
+            ], md=6),
         ], className="g-4"),
         html.Hr(className="my-4"),
         html.H3("🔮 Predicciones del modelo", className="text-center text-light"),
-        dcc.Graph(id="grafico_predicciones"),  # Placeholder para futuro ML
+        dcc.Loading(dcc.Graph(id="grafico_predicciones")),
         html.Div(
-            html.P(mensaje, className="text-center text-warning mt-3 fw-bold"),
+            html.Div(id="mensaje_caidas", className="text-center text-warning mt-3 fw-bold"),
         ),
+        html.P(id="estado_cache", className="text-center text-muted small"),
     ], fluid=True)
 ])
 
+
+# =============================
+# 🔁 CALLBACKS
+# =============================
+
+# Qué construye cada elemento del dashboard a partir de los datos de una versión
+# (snapshot.datos del vigilante: "resumen" y "predicciones")
+CONSTRUCTORES = {
+    "kpis": lambda datos: construir_kpis(datos["resumen"]),
+    "fig_top_productos": lambda datos: construir_fig_top_productos(datos["resumen"]),
+    "fig_evolucion": lambda datos: construir_fig_evolucion(datos["resumen"]),
+    "productos": lambda datos: sorted(datos["resumen"]["series"]["productos"]["nombre_producto"]),
+    "fig_predicciones": lambda datos: construir_fig_predicciones(datos["predicciones"]),
+    "mensaje": lambda datos: construir_mensaje(datos["resumen"]),
+}
+_estado = {"servida": None, "precalentando": set()}
+
+
+def elemento(clave, snapshot):
+    """Elemento del dashboard para la versión del snapshot, construido con los datos de esa versión."""
+    return cache.get(clave, snapshot.version, lambda: CONSTRUCTORES[clave](snapshot.datos))
+
+
+def snapshot_servido():
+    """Última versión con el dashboard completo en cache (la primera se construye al pedirla)."""
+    if _estado["servida"] is None:
+        _estado["servida"] = snapshot_datos()
+    return _estado["servida"]
+
+
+def precalentar(snapshot):
+    """Construye en segundo plano todo el dashboard para una versión nueva de los datos."""
+    if snapshot.version in _estado["precalentando"]:
+        return
+    _estado["precalentando"].add(snapshot.version)
+
+    def tarea():
+        try:
+            for clave in CONSTRUCTORES:
+                elemento(clave, snapshot)
+            _estado["servida"] = snapshot
+        finally:
+            _estado["precalentando"].discard(snapshot.version)
+
+    threading.Thread(target=tarea, daemon=True).start()
+
+
+@app.callback(Output("version_datos", "data"), Input("refresco", "n_intervals"), Input("version_datos", "data"))
+def actualizar_version(_, version_cliente):
+    """
+    Si el vigilante cargó datos nuevos, se precalientan los gráficos en segundo plano y
+    el navegador recibe la versión recién cuando está lista (mientras, sigue viendo la anterior).
+    """
+    servida = snapshot_servido().version
+    actual = snapshot_datos()
+    if actual.version != servida:
+        precalentar(actual)
+    return servida if servida != version_cliente else no_update
+
+
+@app.callback(Output("kpis", "children"), Input("version_datos", "data"))
+def mostrar_kpis(_):
+    return elemento("kpis", snapshot_servido())
+
+
+@app.callback(Output("grafico_top_productos", "figure"), Input("version_datos", "data"))
+def mostrar_top_productos(_):
+    return elemento("fig_top_productos", snapshot_servido())
+
+
+# El navegador informa su ancho (sólo cuando cambia) para no mandar más puntos que píxeles
+app.clientside_callback(
+    """
+    function(_, actual) {
+        const ancho = window.innerWidth;
+        return ancho === actual ? window.dash_clientside.no_update : ancho;
+    }
+    """,
+    Output("ancho_pantalla", "data"),
+    Input("refresco", "n_intervals"),
+    State("ancho_pantalla", "data"),
+)
+
+
+@app.callback(Output("producto_evolucion", "options"), Input("version_datos", "data"))
+def mostrar_productos(_):
+    return elemento("productos", snapshot_servido())
+
+
+@app.callback(
+    Output("grafico_evolucion", "figure"),
+    Input("version_datos", "data"),
+    Input("ancho_pantalla", "data"),
+    Input("producto_evolucion", "value"),
+)
+def mostrar_evolucion(_, ancho_pantalla, producto):
+    snapshot = snapshot_servido()
+    resumen = snapshot.datos["resumen"]
+    if producto:
+        return construir_fig_evolucion_producto(resumen, producto)
+    puntos = puntos_evolucion(ancho_pantalla)
+    if puntos == puntos_evolucion(None):
+        return elemento("fig_evolucion", snapshot)
+    return cache.get(f"fig_evolucion:{puntos}", snapshot.version, lambda: construir_fig_evolucion(resumen, puntos))
+
+
+@app.callback(Output("grafico_predicciones", "figure"), Input("version_datos", "data"))
+def mostrar_predicciones(_):
+    return elemento("fig_predicciones", snapshot_servido())
+
+
+@app.callback(Output("mensaje_caidas", "children"), Output("estado_cache", "children"), Input("version_datos", "data"))
+def mostrar_mensaje(_):
+    mensaje = elemento("mensaje", snapshot_servido())
+    stats = cache.stats()
+    return mensaje, f"Cache del servidor: {stats['entradas']} entradas, {stats['hits']} hits / {stats['misses']} misses"
+
+
 # =============================
 # ▶️ EJECUCIÓN LOCAL
 # =============================
 if __name__ == "__main__":
-    app.run_server(debug=True, port=8501)
+    app.run(debug=True, port=8501)
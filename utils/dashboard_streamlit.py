@@ -2,54 +2,99 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from alertas import calcular_alertas
+from graficos import puntos_para_ancho, reducir_series, top_k_con_otros, TOP_K
+from resumen_dashboard import construir_hechos, construir_resumen, fig_top_productos, figura, leer_resumen, matriz_mensual
+from vigilante import VigilanteDatos
+
+ANCHO_GRAFICO_PX = 1200  # Streamlit no informa el ancho real del gráfico al servidor
+CARPETA_DATOS = "./base_de_datos"
+PATH_RESUMEN = "./resumen_dashboard.json"  # KPIs y series precalculados por proyecto_aurelion.py
+
 # Configuración general
 st.set_page_config(page_title="Aurelion IA Retail", page_icon="🧠", layout="wide")
 
-# Cargar datasets
-@st.cache_data
+# Cargar datasets (una vez; el vigilante los recarga en segundo plano si cambian los Excel)
 def cargar_datos():
     ventas = pd.read_excel("./base_de_datos/ventas.xlsx")
     detalle = pd.read_excel("./base_de_datos/detalle_ventas.xlsx")
     productos = pd.read_excel("./base_de_datos/productos.xlsx")
     clientes = pd.read_excel("./base_de_datos/clientes.xlsx")
 
-    merged = detalle.merge(productos, on="id_producto", how="left")
-    merged = merged.merge(ventas, on="id_venta", how="left")
-    return merged, ventas, clientes
+    # Misma tabla de hechos que el pipeline (resumen_dashboard.construir_hechos)
+    return construir_hechos(ventas, detalle, productos, clientes), ventas, clientes
+
+# Resumen del pipeline si corresponde a estos Excel; si no (o no existe), el mismo resumen en vivo
+def cargar_resumen():
+    resumen = leer_resumen(PATH_RESUMEN, CARPETA_DATOS)
+    if resumen is None:
+        hechos, ventas, clientes = cargar_datos()
+        resumen = construir_resumen(hechos, clientes=clientes, ventas=ventas)
+    return resumen
+
+@st.cache_resource
+def vigilante_datos():
+    return VigilanteDatos({"resumen": ([f"{CARPETA_DATOS}/*.xlsx", PATH_RESUMEN], cargar_resumen)})
 
-df, ventas, clientes = cargar_datos()
+datos = vigilante_datos().snapshot()
+resumen = datos.datos["resumen"]
+kpis, series = resumen["kpis"], resumen["series"]
 
 st.title("🧠 Dashboard de Ventas - Proyecto Aurelion")
 st.markdown("### **Análisis histórico y predictivo del comportamiento de ventas.**")
+st.caption(f"Datos versión {datos.version} · cargados {pd.Timestamp(datos.cargado, unit='s'):%d/%m %H:%M:%S} UTC"
+           f" · resumen {'precalculado por el pipeline' if resumen['origen'] == 'pipeline' else 'calculado en vivo'}")
 
 # KPIs principales
 col1, col2, col3, col4 = st.columns(4)
-col1.metric("🛒 Total Ventas", f"{len(ventas):,}")
-col2.metric("💰 Importe Total", f"${df['importe'].sum():,.2f}")
-col3.metric("📦 Productos Vendidos", f"{df['cantidad'].sum():,}")
-col4.metric("👥 Clientes Activos", f"{len(clientes):,}")
+col1.metric("🛒 Total Ventas", f"{kpis['ventas']:,}")
+col2.metric("💰 Importe Total", f"${kpis['importe']:,.2f}")
+col3.metric("📦 Productos Vendidos", f"{kpis['unidades']:,}")
+col4.metric("👥 Clientes Activos", f"{kpis['clientes_registrados']:,}")
 
-# Top 10 productos
+# Top 10 productos (figura ya serializada si el pipeline corrió con --figuras)
 st.subheader("🏆 Top 10 Productos Más Vendidos (Histórico)")
-ranking = df.groupby("nombre_producto")["cantidad"].sum().reset_index().sort_values("cantidad", ascending=False).head(10)
-fig_top = px.bar(ranking, x="nombre_producto", y="cantidad", color="cantidad",
-                 color_continuous_scale="blues", title="Top 10 Productos por Cantidad Vendida")
-st.plotly_chart(fig_top, use_container_width=True)
-
-# Evolución mensual
-df["mes"] = pd.to_datetime(df["fecha"]).dt.to_period("M").astype(str)
-evolucion = df.groupby(["mes", "nombre_producto"])["cantidad"].sum().reset_index()
-fig_line = px.line(evolucion, x="mes", y="cantidad", color="nombre_producto", title="📈 Evolución Mensual por Producto")
+st.plotly_chart(figura(resumen, "top_productos") or fig_top_productos(resumen), use_container_width=True)
+
+# Evolución por producto: top K + "Otros" y puntos reducidos al ancho del gráfico (graficos.py)
+def evolucion_por_producto(granularidad):
+    return series["mensual" if granularidad == "Mes" else "diaria"][["periodo", "nombre_producto", "cantidad"]]
+
+with st.expander("Opciones del gráfico de evolución"):
+    granularidad = st.radio("Granularidad", ["Mes", "Día"], horizontal=True)
+    top_k = st.slider("Productos destacados (el resto se suma en 'Otros')", 1, 30, TOP_K)
+    ancho = st.slider("Ancho aproximado del gráfico (px)", 400, 2400, ANCHO_GRAFICO_PX, step=100)
+producto_detalle = st.selectbox(
+    "Ver un producto en detalle (resolución completa)",
+    ["(todos)"] + sorted(series["productos"]["nombre_producto"].tolist()),
+)
+
+if producto_detalle == "(todos)":
+    evolucion = reducir_series(
+        top_k_con_otros(evolucion_por_producto(granularidad), "periodo", "cantidad", "nombre_producto", k=top_k),
+        "periodo", "cantidad", "nombre_producto", max_puntos=puntos_para_ancho(ancho),
+    )
+    titulo = f"📈 Evolución por Producto ({granularidad.lower()}, top {top_k})"
+else:
+    # Detalle de un producto: diario y sin reducir
+    evolucion = evolucion_por_producto("Día")
+    evolucion = evolucion[evolucion["nombre_producto"] == producto_detalle]
+    titulo = f"📈 Evolución diaria de {producto_detalle} (todos los puntos)"
+fig_line = px.line(evolucion, x="periodo", y="cantidad", color="nombre_producto", title=titulo,
+                   labels={"periodo": "Fecha"})
 st.plotly_chart(fig_line, use_container_width=True)
 
-# Recomendación automática
+# Recomendación automática (motor vectorizado de alertas.py: caída vs ventana, z-score y cero repentino)
 st.subheader("⚠ Recomendaciones Automáticas")
-caidas = evolucion.groupby("nombre_producto")["cantidad"].agg(["max", "min"]).reset_index()
-caidas["variacion_%"] = ((caidas["min"] - caidas["max"]) / caidas["max"]) * 100
-recomendaciones = caidas[caidas["variacion_%"] < -30]
+with st.expander("Configuración de alertas"):
+    caida_pct = st.slider("Caída mínima vs el período de referencia (%)", 5, 90, 30) / 100
+    ventana = st.slider("Meses de referencia (promedio)", 1, 6, 1)
+alertas = calcular_alertas(matriz_mensual(resumen, "cantidad"), caida_pct=caida_pct, ventana=ventana)
 
-if not recomendaciones.empty:
-    for _, row in recomendaciones.iterrows():
-        st.warning(f"⚠ {row['nombre_producto']} presenta una caída de {abs(row['variacion_%']):.1f}%. Reforzar stock o campañas.")
+if not alertas.empty:
+    for row in alertas.head(10).itertuples():
+        st.warning(f"⚠ {row.producto}: {row.descripcion} ({row.impacto:,.0f} unidades menos). Reforzar stock o campañas.")
+    with st.expander(f"Todas las alertas ({len(alertas)})"):
+        st.dataframe(alertas, use_container_width=True)
 else:
     st.success("✅ No se detectaron productos con caídas significativas.")
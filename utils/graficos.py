@@ -0,0 +1,108 @@
+# ======================================
+# 📉 REDUCCIÓN DE PUNTOS PARA GRÁFICOS - PROYECTO G25
+# ======================================
+# Los gráficos de líneas no necesitan más puntos que píxeles: con miles de productos o
+# granularidad diaria se mandaba al navegador la serie completa. Acá se reduce en el servidor:
+#   - lttb():  Largest-Triangle-Three-Buckets, conserva la forma visual de la serie
+#   - minmax(): mínimo y máximo de cada tramo (conserva picos y valles exactos)
+#   - top_k_con_otros(): deja las K series de mayor total y suma el resto en "Otros"
+#   - reducir_series(): aplica lttb/minmax a cada serie de un DataFrame largo
+# La cantidad de puntos sale del ancho del gráfico (puntos_para_ancho).
+# Lo usan dashboard_dash.py y dashboard_streamlit.py; el detalle de un solo producto
+# se grafica sin reducir.
+# ======================================
+
+import numpy as np
+import pandas as pd
+
+PUNTOS_POR_PX = 0.5    # un punto cada 2 píxeles alcanza para que la línea se vea igual
+MIN_PUNTOS = 50
+TOP_K = 10
+ETIQUETA_OTROS = "Otros"
+
+
+def puntos_para_ancho(ancho_px, puntos_por_px=PUNTOS_POR_PX):
+    """Máximo de puntos por serie para un gráfico de `ancho_px` píxeles (redondeado a 50)."""
+    puntos = int(ancho_px * puntos_por_px) // 50 * 50
+    return max(MIN_PUNTOS, puntos)
+
+
+def _numerico(valores):
+    valores = pd.Series(valores)
+    if pd.api.types.is_datetime64_any_dtype(valores):
+        return valores.astype("int64").to_numpy(dtype="float64")
+    return valores.to_numpy(dtype="float64")
+
+
+def lttb(x, y, n_salida):
+    """Índices (ordenados) de los n_salida puntos que LTTB elige de la serie (x, y), con x creciente."""
+    n = len(x)
+    if n_salida >= n or n_salida < 3:
+        return np.arange(n)
+    x, y = _numerico(x), _numerico(y)
+
+    # n_salida - 2 tramos entre el primer y el último punto (que siempre quedan)
+    bordes = np.linspace(1, n - 1, n_salida - 1).astype(np.intp)
+    idx = np.empty(n_salida, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_salida - 2):
+        ini, fin = bordes[i], bordes[i + 1]
+        if i + 2 < len(bordes):
+            cx, cy = x[bordes[i + 1]:bordes[i + 2]].mean(), y[bordes[i + 1]:bordes[i + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        # área del triángulo (punto elegido antes, candidato, promedio del tramo siguiente)
+        area = np.abs((x[a] - cx) * (y[ini:fin] - y[a]) - (x[a] - x[ini:fin]) * (cy - y[a]))
+        a = ini + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+
+def minmax(x, y, n_salida):
+    """Índices (ordenados) del mínimo y el máximo de cada uno de n_salida // 2 tramos."""
+    n = len(x)
+    if n_salida >= n or n_salida < 2:
+        return np.arange(n)
+    tramos = n_salida // 2
+    tramo = np.arange(n) * tramos // n
+    orden = np.lexsort((_numerico(y), tramo))
+    cortes = np.flatnonzero(np.diff(tramo[orden])) + 1
+    primeros = np.r_[0, cortes]
+    ultimos = np.r_[cortes - 1, n - 1]
+    return np.unique(np.r_[orden[primeros], orden[ultimos], 0, n - 1])
+
+
+METODOS = {"lttb": lttb, "minmax": minmax}
+
+
+def reducir_series(df, x, y, serie=None, max_puntos=500, metodo="lttb"):
+    """Reduce cada serie de df (formato largo) a lo sumo a max_puntos, ordenada por x."""
+    reducir = METODOS[metodo]
+    df = df.sort_values([serie, x] if serie else x, ignore_index=True)
+    if serie is None:
+        return df.iloc[reducir(df[x], df[y], max_puntos)].reset_index(drop=True)
+    partes = []
+    for inicio, fin in _rangos_por_serie(df[serie]):
+        tramo = df.iloc[inicio:fin]
+        partes.append(tramo.iloc[reducir(tramo[x], tramo[y], max_puntos)])
+    return pd.concat(partes, ignore_index=True) if partes else df
+
+
+def _rangos_por_serie(serie):
+    """[inicio, fin) de cada serie en un DataFrame ya ordenado por serie."""
+    valores = serie.to_numpy()
+    cortes = np.flatnonzero(valores[1:] != valores[:-1]) + 1
+    return zip(np.r_[0, cortes], np.r_[cortes, len(valores)])
+
+
+def top_k_con_otros(df, x, y, serie, k=TOP_K, etiqueta=ETIQUETA_OTROS):
+    """Deja las k series con mayor total de y y suma el resto, por x, en una serie 'Otros (n)'."""
+    totales = df.groupby(serie, observed=True)[y].sum()
+    if len(totales) <= k:
+        return df[[x, serie, y]]
+    top = totales.nlargest(k).index
+    es_top = df[serie].isin(top)
+    resto = df.loc[~es_top].groupby(x, as_index=False)[y].sum()
+    resto[serie] = f"{etiqueta} ({len(totales) - k})"
+    return pd.concat([df.loc[es_top, [x, serie, y]], resto[[x, serie, y]]], ignore_index=True)
@@ -5,6 +5,7 @@ Script académico para:
 - construcción de dataset agregado mensual por producto
 - entrenamiento de modelo basado en frecuencia histórica (RandomForest)
 - predicción de productos más vendidos (Top N)
+- resumen de KPIs y series para los dashboards (resumen_dashboard.json, ver resumen_dashboard.py)
 - mini-dashboard con Streamlit (opcional)
 
 Instrucciones:
@@ -13,6 +14,7 @@ Instrucciones:
 - Requisitos:
     pip install pandas numpy scikit-learn joblib streamlit altair
 - Ejecutar (CLI): python proyecto_aurelion.py
+- Incluir las figuras Plotly en el resumen: python proyecto_aurelion.py --figuras
 - Ejecutar (Dashboard): streamlit run proyecto_aurelion.py
 """
 
@@ -26,6 +28,8 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
 import joblib
 
+from resumen_dashboard import construir_hechos, construir_resumen, guardar_resumen, huella_contenido, PATH_RESUMEN
+
 # Optional visualization libs for dashboard
 try:
     import streamlit as st
@@ -191,10 +195,13 @@ def train_and_predict(X, y):
 # ---------------------------
 # Pipeline completo
 # ---------------------------
-def pipeline():
+def pipeline(figuras=False):
     print("=== Pipeline Aurelion: carga, preproc, modelado, predicción ===")
     dfs = load_datasets()
     dfs = standardize_columns(dfs)
+    # Tabla de hechos de los dashboards (la misma que arman en vivo); antes del merge,
+    # que renombra columnas de detalle y productos en el lugar
+    hechos = construir_hechos(dfs['ventas'], dfs['detalle'], dfs.get('productos'), dfs.get('clientes'))
     merged = preprocess_and_merge(dfs)
     pivot = build_monthly_table(merged)
     print(f"Pivot table creada: {pivot.shape[0]} productos x {pivot.shape[1]} meses")
@@ -226,6 +233,17 @@ def pipeline():
     ranking_predicho.head(TOP_N).to_csv("top_predichos.csv", index=False)
     print(f"Top {TOP_N} productos predichos guardados en top_predichos.csv")
 
+    # KPIs y series de los dashboards: se calculan una vez acá y no en cada carga
+    resumen = construir_resumen(
+        hechos,
+        clientes=dfs.get('clientes'),
+        ventas=dfs['ventas'],
+        huella=huella_contenido([BASE_DIR / fname for fname in FILES.values()]),
+        figuras=figuras,
+    )
+    guardar_resumen(resumen, PATH_RESUMEN)
+    print(f"Resumen para los dashboards guardado en {PATH_RESUMEN}")
+
     # Mostrar resumen en consola
     print("\n=== Top productos históricos (último mes real) ===")
     print(ranking_historico.head(TOP_N).to_string(index=False))
@@ -237,7 +255,8 @@ def pipeline():
         'pivot': pivot,
         'ranking_historico': ranking_historico,
         'ranking_predicho': ranking_predicho,
-        'model': model
+        'model': model,
+        'resumen': resumen,
     }
 
 
@@ -257,21 +276,20 @@ def run_streamlit_app(artifacts):
 
     ranking_historico = artifacts['ranking_historico']
     ranking_predicho = artifacts['ranking_predicho']
-    merged = artifacts['merged']
+    # KPIs y series precalculados por el pipeline
+    resumen = artifacts['resumen']
+    series = resumen['series']
 
     # ---------------------------
     # MÉTRICAS PRINCIPALES (KPIs)
     # ---------------------------
-    total_ventas = merged['cantidad'].sum()
-    n_productos = merged['id_producto'].nunique()
-    n_ventas = merged['id_venta'].nunique()
-    n_clientes = merged['id_cliente'].nunique()
+    kpis = resumen['kpis']
 
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("💰 Ventas totales (unidades)", int(total_ventas))
-    col2.metric("📦 Productos únicos", int(n_productos))
-    col3.metric("🧾 Transacciones (ventas)", int(n_ventas))
-    col4.metric("👥 Clientes activos", int(n_clientes))
+    col1.metric("💰 Ventas totales (unidades)", int(kpis['unidades']))
+    col2.metric("📦 Productos únicos", int(kpis['productos']))
+    col3.metric("🧾 Transacciones (ventas)", int(kpis['ventas']))
+    col4.metric("👥 Clientes activos", int(kpis['clientes_con_ventas']))
 
     # ---------------------------
     # TOP HISTÓRICO Y PREDICHO
@@ -310,9 +328,7 @@ def run_streamlit_app(artifacts):
     # ---------------------------
     st.subheader("👥 Clientes más activos")
     clientes_top = (
-        merged.groupby("nombre_cliente")["cantidad"]
-        .sum()
-        .reset_index()
+        series["clientes"][["nombre_cliente", "cantidad"]]
         .sort_values(by="cantidad", ascending=False)
         .head(10)
     )
@@ -326,12 +342,10 @@ def run_streamlit_app(artifacts):
     # ---------------------------
     # COMPARATIVA POR CATEGORÍA
     # ---------------------------
-    if "categoria" in merged.columns:
+    if "categorias" in series:
         st.subheader("🧮 Comparativa entre categorías")
         categoria_sum = (
-            merged.groupby("categoria")["cantidad"]
-            .sum()
-            .reset_index()
+            series["categorias"][["categoria", "cantidad"]]
             .sort_values(by="cantidad", ascending=False)
         )
         chart_cat = alt.Chart(categoria_sum).mark_bar(color='#9467bd').encode(
@@ -359,10 +373,11 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Pipeline Aurelion - análisis y predicción de productos más vendidos")
     parser.add_argument("--run-streamlit", action="store_true", help="Ejecutar dashboard Streamlit tras procesar (streamlit debe estar instalado).")
+    parser.add_argument("--figuras", action="store_true", help="Guardar también las figuras Plotly en el resumen de los dashboards.")
     args = parser.parse_args()
 
     try:
-        artifacts = pipeline()
+        artifacts = pipeline(figuras=args.figuras)
     except Exception as e:
         print("Error en pipeline:", e)
         raise
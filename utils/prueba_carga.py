@@ -0,0 +1,891 @@
+# ======================================
+# 🏋 PRUEBA DE CARGA DE LOS DASHBOARDS - PROYECTO G25
+# ======================================
+# Levanta un dashboard contra un dataset sintético y simula N analistas a la vez:
+#   - dataset: los 4 Excel (clientes, productos, ventas, detalle) con --ventas filas,
+#     generados con semilla fija y reutilizados entre corridas (mismos datos = comparable)
+#   - apps: "dash" (dashboard_dash.py), "streamlit" (dashboard_streamlit.py) y "app"
+#     (Entregable-1/Base de datos/app.py); se corren en una carpeta temporal
+#   - sesiones Dash: como el navegador, piden /, el layout y las dependencias y disparan
+#     los callbacks (hasta 6 en paralelo) en cascada: carga inicial, detalle de un
+#     producto, cambio de ancho de pantalla, refresco periódico
+#   - sesiones Streamlit: hablan el protocolo del websocket (/_stcore/stream) y cambian
+#     widgets al azar (radio, selectbox, slider, multiselect, fechas, checkbox); la
+#     latencia es hasta que termina el script (script_finished)
+#   - entre interacciones cada sesión "piensa" (exponencial con media --pausa)
+#   - se mide latencia (p50/p90/p95/p99), errores, CPU y memoria del servidor (psutil)
+#     por ventana de tiempo
+# El reporte se guarda en JSON (configuración, commit, resumen, por acción y línea de
+# tiempo) y se compara con otro usando --comparar. Todo corre local, sin red externa.
+#
+# Uso:
+#   python prueba_carga.py --app dash --sesiones 20 --duracion 60 --ventas 20000
+#   python prueba_carga.py --app streamlit --sesiones 50 --con-resumen
+#   python prueba_carga.py --comparar reportes_carga/antes.json reportes_carga/despues.json
+# Los datasets y los reportes quedan en datos_carga/ y reportes_carga/ junto a este script.
+# ======================================
+
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import http.client
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+PSUTIL_AVAILABLE = importlib.util.find_spec("psutil") is not None
+WEBSOCKETS_AVAILABLE = importlib.util.find_spec("websockets") is not None
+
+# script, carpeta de los Excel (relativa a donde corre la app) y protocolo
+APPS = {
+    "dash": {"script": os.path.join(AQUI, "dashboard_dash.py"), "carpeta": "base de datos", "protocolo": "http"},
+    "streamlit": {"script": os.path.join(AQUI, "dashboard_streamlit.py"), "carpeta": "base_de_datos", "protocolo": "websocket"},
+    "app": {"script": os.path.join(AQUI, "..", "Entregable-1", "Base de datos", "app.py"), "carpeta": ".", "protocolo": "websocket"},
+}
+ARCHIVOS = ("clientes.xlsx", "productos.xlsx", "ventas.xlsx", "detalle_ventas.xlsx")
+# Junto al script (no en el directorio actual); ignoradas por git
+CARPETA_DATASETS = os.path.join(AQUI, "datos_carga")
+CARPETA_REPORTES = os.path.join(AQUI, "reportes_carga")
+
+SESIONES = 20
+DURACION_S = 60
+RAMPA_S = 10          # las sesiones arrancan repartidas en este tiempo
+PAUSA_S = 2.0         # tiempo medio de "lectura" entre interacciones
+VENTAS = 5000
+TIMEOUT_S = 60        # una interacción que tarda más cuenta como error
+VENTANA_S = 5         # agregación de la línea de tiempo
+MUESTREO_S = 1.0      # cada cuánto se mide CPU y memoria del servidor
+PARALELO_NAVEGADOR = 6  # conexiones simultáneas por sesión (como un navegador)
+ANCHOS_PANTALLA = (1280, 1440, 1920, 2560)
+PERCENTILES = (50, 90, 95, 99)
+FORMATO = 1
+
+
+# =============================
+# 📂 DATASET SINTÉTICO
+# =============================
+
+def generar_dataset(ventas=VENTAS, semilla=0, carpeta=CARPETA_DATASETS):
+    """Los 4 Excel con el esquema real (ver dataset.md); se reutilizan si ya existen."""
+    destino = os.path.join(carpeta, f"ventas-{ventas}-semilla-{semilla}")
+    if os.path.exists(os.path.join(destino, ".completo")):
+        return destino
+
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(semilla)
+    n_clientes = max(100, ventas // 20)
+    n_productos = max(100, ventas // 100)
+    nombres = np.array(["Mariana", "Nicolas", "Olivia", "Guadalupe", "Juan", "Lucia", "Mateo", "Sofia"])
+    apellidos = np.array(["Lopez", "Rojas", "Gomez", "Romero", "Perez", "Diaz", "Torres", "Ruiz"])
+    ciudades = np.array(["Carlos Paz", "Córdoba", "Río Cuarto", "Villa María", "Alta Gracia"])
+
+    ids_cliente = np.arange(1, n_clientes + 1)
+    nombre_cliente = [f"{n} {a} {i}" for i, n, a in zip(ids_cliente, rng.choice(nombres, n_clientes), rng.choice(apellidos, n_clientes))]
+    email = [f"{nombre.lower().replace(' ', '.')}@mail.com" for nombre in nombre_cliente]
+    clientes = pd.DataFrame({
+        "id_cliente": ids_cliente,
+        "nombre_cliente": nombre_cliente,
+        "email": email,
+        "ciudad": rng.choice(ciudades, n_clientes),
+        "fecha_alta": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365, n_clientes), unit="D"),
+    })
+
+    ids_producto = np.arange(1, n_productos + 1)
+    productos = pd.DataFrame({
+        "id_producto": ids_producto,
+        "nombre_producto": [f"Producto {i:04d}" for i in ids_producto],
+        "categoria": rng.choice(["Alimentos", "Limpieza"], n_productos),
+        "precio_unitario": rng.integers(300, 9000, n_productos),
+    })
+
+    # Popularidad desigual (Zipf): pocos productos y clientes concentran las ventas
+    def zipf(n, tamaño):
+        pesos = 1 / np.arange(1, n + 1)
+        return rng.choice(n, tamaño, p=pesos / pesos.sum())
+
+    cliente_venta = zipf(n_clientes, ventas)
+    ventas_df = pd.DataFrame({
+        "id_venta": np.arange(1, ventas + 1),
+        "fecha": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 540, ventas), unit="D"),
+        "id_cliente": ids_cliente[cliente_venta],
+        "nombre_cliente": clientes["nombre_cliente"].to_numpy()[cliente_venta],
+        "email": clientes["email"].to_numpy()[cliente_venta],
+        "medio_pago": rng.choice(["efectivo", "tarjeta", "qr", "transferencia"], ventas),
+    })
+
+    lineas = rng.integers(1, 6, ventas)
+    producto_linea = zipf(n_productos, int(lineas.sum()))
+    cantidad = rng.integers(1, 6, len(producto_linea))
+    precio = productos["precio_unitario"].to_numpy()[producto_linea]
+    detalle = pd.DataFrame({
+        "id_venta": np.repeat(ventas_df["id_venta"].to_numpy(), lineas),
+        "id_producto": ids_producto[producto_linea],
+        "nombre_producto": productos["nombre_producto"].to_numpy()[producto_linea],
+        "cantidad": cantidad,
+        "precio_unitario": precio,
+        "importe": cantidad * precio,
+    })
+
+    tmp = f"{destino}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for nombre, df in zip(ARCHIVOS, (clientes, productos, ventas_df, detalle)):
+        df.to_excel(os.path.join(tmp, nombre), index=False)
+    # Predicciones de ejemplo para el gráfico del modelo (dashboard_dash.py)
+    top = detalle.groupby("nombre_producto")["cantidad"].sum().nlargest(10)
+    pd.DataFrame({"nombre_producto": top.index, "predicted_quantity": top.to_numpy() / 18}).to_csv(
+        os.path.join(tmp, "top_predichos.csv"), index=False)
+    open(os.path.join(tmp, ".completo"), "w").close()
+    shutil.rmtree(destino, ignore_errors=True)
+    os.replace(tmp, destino)
+    return destino
+
+
+def preparar_corrida(app, dataset, con_resumen=False):
+    """Carpeta temporal donde corre la app: los Excel donde los busca y, opcionalmente, el resumen."""
+    corrida = tempfile.mkdtemp(prefix=f"carga-{app}-")
+    carpeta = os.path.join(corrida, APPS[app]["carpeta"])
+    os.makedirs(carpeta, exist_ok=True)
+    for nombre in ARCHIVOS:
+        shutil.copy(os.path.join(dataset, nombre), carpeta)
+    shutil.copy(os.path.join(dataset, "top_predichos.csv"), corrida)
+    if con_resumen:
+        _escribir_resumen(carpeta, corrida)
+    return corrida
+
+
+def _escribir_resumen(carpeta, corrida):
+    """El resumen que dejaría proyecto_aurelion.py (resumen_dashboard.py) para estos Excel."""
+    import pandas as pd
+
+    sys.path.insert(0, AQUI)
+    from resumen_dashboard import construir_hechos, construir_resumen, guardar_resumen, huella_contenido
+
+    tablas = {nombre: pd.read_excel(os.path.join(carpeta, nombre)) for nombre in ARCHIVOS}
+    hechos = construir_hechos(tablas["ventas.xlsx"], tablas["detalle_ventas.xlsx"],
+                              tablas["productos.xlsx"], tablas["clientes.xlsx"])
+    resumen = construir_resumen(hechos, clientes=tablas["clientes.xlsx"], ventas=tablas["ventas.xlsx"],
+                                huella=huella_contenido([os.path.join(carpeta, n) for n in ARCHIVOS]))
+    guardar_resumen(resumen, os.path.join(corrida, "resumen_dashboard.json"))
+
+
+# =============================
+# 🚀 SERVIDOR
+# =============================
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(app, corrida, puerto, workers=1):
+    """Arranca la app en `corrida` (sesión o, en Windows, grupo de procesos propio, para cortar todo el árbol)."""
+    script = os.path.abspath(APPS[app]["script"])
+    if app == "dash" and workers > 1:
+        if importlib.util.find_spec("gunicorn") is None:
+            raise RuntimeError("--workers requiere gunicorn: pip install gunicorn")
+        comando = [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{puerto}",
+                   "--pythonpath", os.path.dirname(script), "dashboard_dash:server"]
+    elif app == "dash":
+        codigo = (f"import sys; sys.path.insert(0, {os.path.dirname(script)!r}); import dashboard_dash as d; "
+                  f"d.app.run(host='127.0.0.1', port={puerto}, debug=False)")
+        comando = [sys.executable, "-c", codigo]
+    else:
+        comando = [sys.executable, "-m", "streamlit", "run", script, "--server.port", str(puerto),
+                   "--server.address", "127.0.0.1", "--server.headless", "true",
+                   "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"]
+    log = open(os.path.join(corrida, "servidor.log"), "wb")
+    if os.name == "nt":
+        grupo = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        grupo = {"start_new_session": True}
+    return subprocess.Popen(comando, cwd=corrida, stdout=log, stderr=subprocess.STDOUT, **grupo)
+
+
+def esperar_servidor(app, puerto, proceso, timeout=120):
+    """Segundos hasta que la app responde (la primera carga de datos queda para la primera sesión)."""
+    ruta = "/" if APPS[app]["protocolo"] == "http" else "/_stcore/health"
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El servidor terminó al arrancar (código {proceso.returncode}); ver servidor.log")
+        try:
+            conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=5)
+            conexion.request("GET", ruta)
+            if conexion.getresponse().status == 200:
+                return time.perf_counter() - t0
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"El servidor no respondió en {timeout} s")
+
+
+def detener_servidor(proceso):
+    """Termina el servidor y sus hijos (workers de gunicorn); si en 10 s no terminó, los mata."""
+    hijos = _hijos(proceso)
+    _senal_arbol(proceso, hijos, forzar=False)
+    try:
+        proceso.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        _senal_arbol(proceso, hijos, forzar=True)
+        proceso.wait()
+
+
+def _hijos(proceso):
+    """Procesos hijos del servidor (sólo hacen falta en Windows, que no tiene grupos POSIX)."""
+    if os.name != "nt" or not PSUTIL_AVAILABLE:
+        return []
+    import psutil
+
+    try:
+        return psutil.Process(proceso.pid).children(recursive=True)
+    except psutil.NoSuchProcess:
+        return []
+
+
+def _senal_arbol(proceso, hijos, forzar):
+    if os.name != "nt":
+        try:
+            os.killpg(proceso.pid, signal.SIGKILL if forzar else signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        return
+    if hijos:
+        import psutil
+
+        for hijo in hijos:
+            try:
+                if forzar:
+                    hijo.kill()
+                else:
+                    hijo.terminate()
+            except psutil.NoSuchProcess:
+                pass
+    if forzar:
+        proceso.kill()
+    else:
+        proceso.terminate()
+
+
+# =============================
+# 📏 MEDICIONES
+# =============================
+
+class Registro:
+    """Latencias y errores de todas las sesiones (interacciones y requests individuales)."""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.eventos = []  # (t, nivel, accion, latencia_s, error)
+        self.lock = threading.Lock()
+        self.sesiones_activas = 0
+
+    def agregar(self, accion, latencia, error=None, nivel="interaccion"):
+        with self.lock:
+            self.eventos.append((time.perf_counter() - self.t0, nivel, accion, latencia, error))
+
+    def sesion(self, delta):
+        with self.lock:
+            self.sesiones_activas += delta
+
+
+class MonitorRecursos:
+    """CPU (% de un núcleo) y memoria del servidor y sus procesos hijos, cada MUESTREO_S."""
+
+    def __init__(self, pid, registro, intervalo=MUESTREO_S):
+        self.pid = pid
+        self.registro = registro
+        self.intervalo = intervalo
+        self.muestras = []
+        self._detener = threading.Event()
+        self._procesos = {}
+
+    def iniciar(self):
+        if PSUTIL_AVAILABLE:
+            threading.Thread(target=self._muestrear, daemon=True, name="monitor-recursos").start()
+        return self
+
+    def detener(self):
+        self._detener.set()
+
+    def _arbol(self):
+        import psutil
+
+        raiz = psutil.Process(self.pid)
+        vivos = {}
+        for proceso in [raiz] + raiz.children(recursive=True):
+            vivos[proceso.pid] = self._procesos.get(proceso.pid, proceso)
+        self._procesos = vivos
+        return list(vivos.values())
+
+    def _muestrear(self):
+        import psutil
+
+        cliente = psutil.Process()
+        cliente.cpu_percent()
+        while not self._detener.wait(self.intervalo):
+            cpu = rss = pss = 0.0
+            try:
+                for proceso in self._arbol():
+                    with proceso.oneshot():
+                        cpu += proceso.cpu_percent()
+                        memoria = proceso.memory_full_info()
+                        rss += memoria.rss
+                        pss += getattr(memoria, "pss", memoria.rss)
+            except psutil.Error:
+                continue
+            self.muestras.append({
+                "t": round(time.perf_counter() - self.registro.t0, 2),
+                "cpu_pct": round(cpu, 1),
+                "rss_mb": round(rss / 2**20, 1),
+                "pss_mb": round(pss / 2**20, 1),
+                "cliente_cpu_pct": round(cliente.cpu_percent(), 1),
+                "sesiones": self.registro.sesiones_activas,
+            })
+
+
+# =============================
+# 🖱 SESIONES DASH (HTTP)
+# =============================
+
+class SesionDash:
+    """Un navegador: layout, dependencias y callbacks en cascada (Input -> Output -> Input)."""
+
+    def __init__(self, puerto, registro, rng, timeout=TIMEOUT_S):
+        self.puerto = puerto
+        self.registro = registro
+        self.rng = rng
+        self.timeout = timeout
+        self.estado = {}      # "id.propiedad" -> valor actual en el navegador
+        self.dependencias = []
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(PARALELO_NAVEGADOR)
+
+    def _conexion(self):
+        if getattr(self._local, "conexion", None) is None:
+            self._local.conexion = http.client.HTTPConnection("127.0.0.1", self.puerto, timeout=self.timeout)
+        return self._local.conexion
+
+    def _pedir(self, metodo, ruta, cuerpo=None, accion=None):
+        t0 = time.perf_counter()
+        error = None
+        try:
+            conexion = self._conexion()
+            cabeceras = {"Content-Type": "application/json"} if cuerpo is not None else {}
+            conexion.request(metodo, ruta, body=json.dumps(cuerpo) if cuerpo is not None else None, headers=cabeceras)
+            respuesta = conexion.getresponse()
+            datos = respuesta.read()
+            if respuesta.status not in (200, 204):
+                error = f"HTTP {respuesta.status} en {accion or ruta}"
+        except (OSError, http.client.HTTPException) as e:
+            self._local.conexion = None
+            error, respuesta, datos = f"{type(e).__name__}: {e}", None, b""
+        self.registro.agregar(accion or f"GET {ruta}", time.perf_counter() - t0, error, nivel="request")
+        if error:
+            raise RuntimeError(error)
+        if respuesta.status == 200 and "json" in (respuesta.getheader("Content-Type") or ""):
+            return json.loads(datos)
+        return None
+
+    def cargar(self):
+        self._pedir("GET", "/")
+        layout = self._pedir("GET", "/_dash-layout")
+        self.dependencias = [d for d in self._pedir("GET", "/_dash-dependencies") if not d.get("clientside_function")]
+        self._recorrer_layout(layout)
+        # El callback del lado del cliente informa el ancho de la ventana al cargar
+        self.estado["ancho_pantalla.data"] = self.rng.choice(ANCHOS_PANTALLA)
+        self._disparar(None)
+
+    def _recorrer_layout(self, nodo):
+        if isinstance(nodo, list):
+            for hijo in nodo:
+                self._recorrer_layout(hijo)
+        elif isinstance(nodo, dict) and "props" in nodo:
+            props = nodo["props"]
+            if "id" in props:
+                for propiedad, valor in props.items():
+                    self.estado.setdefault(f"{props['id']}.{propiedad}", valor)
+            self._recorrer_layout(props.get("children"))
+
+    @staticmethod
+    def _salidas(dependencia):
+        salida = dependencia["output"]
+        partes = salida.strip(".").split("...") if salida.startswith("..") else [salida]
+        return [tuple(parte.rsplit(".", 1)) for parte in partes]
+
+    def _llamar(self, dependencia, cambiados):
+        salidas = self._salidas(dependencia)
+        cuerpo = {
+            "output": dependencia["output"],
+            "outputs": [{"id": i, "property": p} for i, p in salidas] if len(salidas) > 1
+            else {"id": salidas[0][0], "property": salidas[0][1]},
+            "inputs": [{**e, "value": self.estado.get(f"{e['id']}.{e['property']}")} for e in dependencia["inputs"]],
+            "state": [{**e, "value": self.estado.get(f"{e['id']}.{e['property']}")} for e in dependencia["state"]],
+            "changedPropIds": sorted(cambiados),
+        }
+        respuesta = self._pedir("POST", "/_dash-update-component", cuerpo, accion=f"callback {salidas[0][0]}")
+        return (respuesta or {}).get("response", {})
+
+    def _disparar(self, cambiados):
+        """Llama los callbacks afectados por `cambiados` (None = carga inicial) y sigue la cascada."""
+        cambiados = None if cambiados is None else dict.fromkeys(cambiados)  # propiedad -> callback que la cambió
+        while True:
+            # Un callback no se vuelve a disparar por su propia salida
+            pendientes = [
+                d for d in self.dependencias
+                if cambiados is None or any(cambiados.get(clave, d) is not d for clave in self._entradas(d))
+            ]
+            if not pendientes:
+                return
+            respuestas = list(self._pool.map(lambda d: (d, self._llamar(d, list(cambiados or []))), pendientes))
+            nuevos = {}
+            for dependencia, respuesta in respuestas:
+                for id_, props in respuesta.items():
+                    for propiedad, valor in props.items():
+                        clave = f"{id_}.{propiedad}"
+                        if self.estado.get(clave) != valor:
+                            self.estado[clave] = valor
+                            nuevos[clave] = dependencia
+            cambiados = nuevos
+
+    @staticmethod
+    def _entradas(dependencia):
+        return [f"{e['id']}.{e['property']}" for e in dependencia["inputs"]]
+
+    # Interacciones (nombre -> peso)
+    def interacciones(self):
+        return {"detalle de un producto": 4, "volver a todos": 2, "cambiar ancho": 1, "refresco periódico": 3}
+
+    def interactuar(self, nombre):
+        if not self.dependencias:  # la carga inicial falló: el analista recarga la página
+            self.cargar()
+        elif nombre == "detalle de un producto":
+            opciones = self.estado.get("producto_evolucion.options") or [None]
+            opcion = self.rng.choice(opciones)
+            self.estado["producto_evolucion.value"] = opcion.get("value") if isinstance(opcion, dict) else opcion
+            self._disparar({"producto_evolucion.value"})
+        elif nombre == "volver a todos":
+            self.estado["producto_evolucion.value"] = None
+            self._disparar({"producto_evolucion.value"})
+        elif nombre == "cambiar ancho":
+            self.estado["ancho_pantalla.data"] = self.rng.choice(ANCHOS_PANTALLA)
+            self._disparar({"ancho_pantalla.data"})
+        elif nombre == "refresco periódico":
+            self.estado["refresco.n_intervals"] = (self.estado.get("refresco.n_intervals") or 0) + 1
+            self._disparar({"refresco.n_intervals"})
+
+    def cerrar(self):
+        self._pool.shutdown(wait=False)
+
+
+# =============================
+# 🖱 SESIONES STREAMLIT (WEBSOCKET)
+# =============================
+
+TIPOS_WIDGET = ("radio", "selectbox", "multiselect", "slider", "checkbox", "date_input")
+
+
+class SesionStreamlit:
+    """Un navegador: websocket a /_stcore/stream, rerun del script con el estado de los widgets."""
+
+    def __init__(self, puerto, registro, rng, timeout=TIMEOUT_S):
+        self.puerto = puerto
+        self.registro = registro
+        self.rng = rng
+        self.timeout = timeout
+        self.ws = None
+        self.widgets = {}  # id -> (tipo, proto) de la última corrida
+        self.valores = {}  # id -> WidgetState enviado
+
+    async def _conectar(self):
+        import websockets
+
+        if self.ws is not None:
+            await self.ws.close()
+        self.ws = await websockets.connect(f"ws://127.0.0.1:{self.puerto}/_stcore/stream",
+                                           subprotocols=["streamlit"], max_size=None)
+        self.valores = {}
+
+    async def _rerun(self):
+        """Manda el rerun y espera script_finished. Devuelve el error del script, si hubo."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensaje = BackMsg()
+        mensaje.rerun_script.query_string = ""
+        mensaje.rerun_script.page_script_hash = ""
+        for estado in self.valores.values():
+            mensaje.rerun_script.widget_states.widgets.add().CopyFrom(estado)
+        await self.ws.send(mensaje.SerializeToString())
+
+        widgets, error = {}, None
+        while True:
+            recibido = ForwardMsg()
+            recibido.ParseFromString(await self.ws.recv())
+            tipo = recibido.WhichOneof("type")
+            if tipo == "delta" and recibido.delta.WhichOneof("type") == "new_element":
+                elemento = recibido.delta.new_element
+                clase = elemento.WhichOneof("type")
+                if clase == "exception" and error is None:
+                    error = f"{elemento.exception.type}: {elemento.exception.message[:200]}"
+                elif clase in TIPOS_WIDGET and not getattr(elemento, clase).disabled:
+                    proto = getattr(elemento, clase)
+                    widgets[proto.id] = (clase, proto)
+            elif tipo == "script_finished":
+                if recibido.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    error = "error de compilación del script"
+                # Una corrida interrumpida por otro rerun no trae todos los widgets
+                if recibido.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    self.widgets = widgets
+                return error
+
+    async def _medir(self, accion, corrutina):
+        t0 = time.perf_counter()
+        try:
+            error = await asyncio.wait_for(corrutina, self.timeout)
+        except Exception as e:  # timeout, conexión cerrada, ...
+            error = f"{type(e).__name__}: {e}"
+            self.ws = None
+        self.registro.agregar(accion, time.perf_counter() - t0, error, nivel="request")
+        if error:
+            raise RuntimeError(error)
+
+    async def cargar(self):
+        async def carga():
+            await self._conectar()
+            return await self._rerun()
+        await self._medir("websocket + primera corrida", carga())
+
+    def interacciones(self):
+        pesos = {f"{tipo}: {proto.label[:40]}": 3 for tipo, proto in self.widgets.values()}
+        return {**pesos, "recargar la página": 1}
+
+    async def interactuar(self, nombre):
+        if nombre == "recargar la página" or self.ws is None:
+            await self.cargar()
+            return
+        for id_, (tipo, proto) in self.widgets.items():
+            if f"{tipo}: {proto.label[:40]}" == nombre:
+                self.valores[id_] = self._valor_al_azar(id_, tipo, proto)
+                await self._medir(f"rerun ({tipo})", self._rerun())
+                return
+
+    def _valor_al_azar(self, id_, tipo, proto):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        estado = WidgetState(id=id_)
+        if tipo in ("radio", "selectbox") and proto.options:
+            estado.string_value = self.rng.choice(list(proto.options))
+        elif tipo == "multiselect" and proto.options:
+            opciones = list(proto.options)
+            estado.string_array_value.data.extend(self.rng.sample(opciones, self.rng.randint(1, len(opciones))))
+        elif tipo == "slider" and not proto.options:
+            pasos = max(int((proto.max - proto.min) / (proto.step or 1)), 0)
+            valores = sorted(proto.min + self.rng.randint(0, pasos) * (proto.step or 1) for _ in proto.default)
+            estado.double_array_value.data.extend(valores)
+        elif tipo == "checkbox":
+            estado.bool_value = not self.valores.get(id_, WidgetState()).bool_value
+        elif tipo == "date_input" and proto.min and proto.max:
+            minimo, maximo = (datetime.fromisoformat(v.replace("/", "-")).date() for v in (proto.min, proto.max))
+            dias = sorted(self.rng.randint(0, (maximo - minimo).days) for _ in range(2 if proto.is_range else 1))
+            estado.string_array_value.data.extend((minimo + timedelta(days=d)).isoformat() for d in dias)
+        return estado
+
+    async def cerrar(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+
+# =============================
+# 🏃 SIMULACIÓN
+# =============================
+
+def _elegir(rng, pesos):
+    nombres = list(pesos)
+    return rng.choices(nombres, weights=[pesos[n] for n in nombres])[0] if nombres else None
+
+
+def correr_sesion(indice, app, puerto, registro, fin, pausa, semilla, timeout):
+    """Hilo de una sesión: carga, interacciones con pausas hasta `fin`, cierre."""
+    rng = random.Random(semilla * 1000 + indice)
+    registro.sesion(+1)
+    try:
+        if APPS[app]["protocolo"] == "http":
+            _sesion_dash(SesionDash(puerto, registro, rng, timeout), registro, rng, fin, pausa)
+        else:
+            asyncio.run(_sesion_streamlit(SesionStreamlit(puerto, registro, rng, timeout), registro, rng, fin, pausa))
+    finally:
+        registro.sesion(-1)
+
+
+def _interaccion(registro, accion, funcion):
+    t0 = time.perf_counter()
+    try:
+        funcion()
+        registro.agregar(accion, time.perf_counter() - t0)
+    except Exception as e:
+        registro.agregar(accion, time.perf_counter() - t0, f"{type(e).__name__}: {e}")
+
+
+def _sesion_dash(sesion, registro, rng, fin, pausa):
+    try:
+        _interaccion(registro, "carga inicial", sesion.cargar)
+        while time.perf_counter() + pausa < fin:
+            time.sleep(rng.expovariate(1 / pausa))
+            nombre = _elegir(rng, sesion.interacciones())
+            _interaccion(registro, nombre, lambda: sesion.interactuar(nombre))
+    finally:
+        sesion.cerrar()
+
+
+async def _sesion_streamlit(sesion, registro, rng, fin, pausa):
+    async def medir(accion, corrutina):
+        t0 = time.perf_counter()
+        try:
+            await corrutina
+            registro.agregar(accion, time.perf_counter() - t0)
+        except Exception as e:
+            registro.agregar(accion, time.perf_counter() - t0, f"{type(e).__name__}: {e}")
+
+    try:
+        await medir("carga inicial", sesion.cargar())
+        while time.perf_counter() + pausa < fin:
+            await asyncio.sleep(rng.expovariate(1 / pausa))
+            nombre = _elegir(rng, sesion.interacciones())
+            await medir(nombre, sesion.interactuar(nombre))
+    finally:
+        try:
+            await sesion.cerrar()
+        except Exception:
+            pass
+
+
+def prueba_de_carga(app="dash", sesiones=SESIONES, duracion=DURACION_S, rampa=RAMPA_S, pausa=PAUSA_S,
+                    ventas=VENTAS, semilla=0, con_resumen=False, workers=1, timeout=TIMEOUT_S, puerto=None):
+    """Corre la prueba completa y devuelve el reporte (dict)."""
+    if APPS[app]["protocolo"] == "websocket" and not WEBSOCKETS_AVAILABLE:
+        raise RuntimeError("Las sesiones Streamlit requieren: pip install websockets")
+    print(f"Dataset sintético: {ventas:,} ventas (semilla {semilla})...")
+    dataset = generar_dataset(ventas, semilla)
+    corrida = preparar_corrida(app, dataset, con_resumen and app != "app")
+    puerto = puerto or _puerto_libre()
+
+    proceso = iniciar_servidor(app, corrida, puerto, workers)
+    try:
+        arranque = esperar_servidor(app, puerto, proceso)
+        print(f"{app} escuchando en 127.0.0.1:{puerto} (arranque {arranque:.1f} s); "
+              f"{sesiones} sesiones durante {duracion} s...")
+        registro = Registro()
+        monitor = MonitorRecursos(proceso.pid, registro).iniciar()
+        fin = registro.t0 + rampa + duracion
+        hilos = []
+        for i in range(sesiones):
+            time.sleep(rampa / sesiones)
+            hilo = threading.Thread(target=correr_sesion, daemon=True, name=f"sesion-{i}",
+                                    args=(i, app, puerto, registro, fin, pausa, semilla, timeout))
+            hilo.start()
+            hilos.append(hilo)
+        for hilo in hilos:
+            hilo.join(max(fin - time.perf_counter(), 0) + timeout + 5)
+        monitor.detener()
+        vivo = proceso.poll() is None
+    finally:
+        detener_servidor(proceso)
+
+    config = {"app": app, "sesiones": sesiones, "duracion_s": duracion, "rampa_s": rampa, "pausa_s": pausa,
+              "ventas": ventas, "semilla": semilla, "con_resumen": con_resumen, "workers": workers, "timeout_s": timeout}
+    reporte = armar_reporte(registro, monitor, config, arranque)
+    reporte["servidor_vivo_al_final"] = vivo
+    reporte["log_servidor"] = os.path.join(corrida, "servidor.log")
+    return reporte
+
+
+# =============================
+# 📊 REPORTE
+# =============================
+
+def _estadisticas(latencias):
+    import numpy as np
+
+    if not latencias:
+        return {}
+    valores = np.asarray(latencias) * 1000
+    estadisticas = {f"p{p}_ms": round(float(np.percentile(valores, p)), 1) for p in PERCENTILES}
+    estadisticas.update(media_ms=round(float(valores.mean()), 1), max_ms=round(float(valores.max()), 1))
+    return estadisticas
+
+
+def _commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=AQUI, capture_output=True, text=True).stdout.strip()
+        sucio = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=AQUI,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{commit}{'-modificado' if sucio else ''}" if commit else None
+    except OSError:
+        return None
+
+
+def armar_reporte(registro, monitor, config, arranque_s):
+    eventos = list(registro.eventos)
+    interacciones = [e for e in eventos if e[1] == "interaccion"]
+    requests = [e for e in eventos if e[1] == "request"]
+    duracion = max((e[0] for e in eventos), default=0) or 1
+
+    def resumen_de(grupo):
+        errores = sum(1 for e in grupo if e[4])
+        return {"n": len(grupo), "errores": errores, "tasa_error": round(errores / len(grupo), 4) if grupo else 0,
+                **_estadisticas([e[3] for e in grupo if not e[4]])}
+
+    por_accion = defaultdict(list)
+    for evento in eventos:
+        por_accion[(evento[1], evento[2])].append(evento)
+
+    linea = []
+    muestras = monitor.muestras
+    for inicio in range(0, int(duracion) + 1, VENTANA_S):
+        ventana = [e for e in interacciones if inicio <= e[0] < inicio + VENTANA_S]
+        recursos = [m for m in muestras if inicio <= m["t"] < inicio + VENTANA_S]
+        fila = {"t": inicio, "interacciones_por_s": round(len(ventana) / VENTANA_S, 2),
+                **{k: v for k, v in resumen_de(ventana).items() if k in ("errores", "p50_ms", "p95_ms")}}
+        if recursos:
+            fila.update(cpu_pct=round(sum(m["cpu_pct"] for m in recursos) / len(recursos), 1),
+                        rss_mb=max(m["rss_mb"] for m in recursos), pss_mb=max(m["pss_mb"] for m in recursos),
+                        sesiones=max(m["sesiones"] for m in recursos))
+        linea.append(fila)
+
+    errores_ejemplo = list(dict.fromkeys(e[4] for e in eventos if e[4]))[:10]
+    return {
+        "formato": FORMATO,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "config": config,
+        "arranque_s": round(arranque_s, 2),
+        "resumen": {**resumen_de(interacciones), "interacciones_por_s": round(len(interacciones) / duracion, 2),
+                    "requests": len(requests), "requests_por_s": round(len(requests) / duracion, 2)},
+        "por_accion": {f"{'  ' if nivel == 'request' else ''}{accion}": resumen_de(grupo)
+                       for (nivel, accion), grupo in sorted(por_accion.items())},
+        "recursos": {
+            "cpu_pct_media": round(sum(m["cpu_pct"] for m in muestras) / len(muestras), 1) if muestras else None,
+            "cpu_pct_max": max((m["cpu_pct"] for m in muestras), default=None),
+            "rss_mb_max": max((m["rss_mb"] for m in muestras), default=None),
+            "pss_mb_max": max((m["pss_mb"] for m in muestras), default=None),
+            "cliente_cpu_pct_media": round(sum(m["cliente_cpu_pct"] for m in muestras) / len(muestras), 1) if muestras else None,
+        },
+        "linea_de_tiempo": linea,
+        "muestras_recursos": muestras,
+        "errores_ejemplo": errores_ejemplo,
+    }
+
+
+def guardar_reporte(reporte, carpeta=CARPETA_REPORTES):
+    os.makedirs(carpeta, exist_ok=True)
+    config = reporte["config"]
+    nombre = f"{datetime.now():%Y%m%d-%H%M%S}-{config['app']}-{config['sesiones']}s-{reporte['commit'] or 'sin-git'}.json"
+    ruta = os.path.join(carpeta, nombre)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+    return ruta
+
+
+def imprimir_reporte(reporte):
+    config, resumen, recursos = reporte["config"], reporte["resumen"], reporte["recursos"]
+    print(f"\n=== {config['app']} · {config['sesiones']} sesiones · {config['ventas']:,} ventas · commit {reporte['commit']} ===")
+    print(f"Interacciones: {resumen['n']} ({resumen['interacciones_por_s']}/s), errores {resumen['tasa_error']:.1%}; "
+          f"requests: {resumen['requests']} ({resumen['requests_por_s']}/s)")
+    print(f"\n{'acción':<46} {'n':>6} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    for accion, e in reporte["por_accion"].items():
+        print(f"{accion[:46]:<46} {e['n']:>6} {e['tasa_error']:>6.1%} {e.get('p50_ms', '-'):>8} "
+              f"{e.get('p95_ms', '-'):>8} {e.get('p99_ms', '-'):>8} {e.get('max_ms', '-'):>8}")
+    if recursos["cpu_pct_media"] is not None:
+        print(f"\nServidor: CPU media {recursos['cpu_pct_media']}% (máx {recursos['cpu_pct_max']}%), "
+              f"RSS máx {recursos['rss_mb_max']} MB, PSS máx {recursos['pss_mb_max']} MB; "
+              f"generador de carga: CPU media {recursos['cliente_cpu_pct_media']}%")
+    else:
+        print("\nCPU y memoria: instalar psutil para medirlas")
+    print(f"\n{'t (s)':>6} {'ses.':>5} {'int/s':>6} {'err':>4} {'p50':>8} {'p95':>8} {'CPU%':>7} {'RSS MB':>8}")
+    for fila in reporte["linea_de_tiempo"]:
+        print(f"{fila['t']:>6} {fila.get('sesiones', '-'):>5} {fila['interacciones_por_s']:>6} {fila['errores']:>4} "
+              f"{fila.get('p50_ms', '-'):>8} {fila.get('p95_ms', '-'):>8} {fila.get('cpu_pct', '-'):>7} {fila.get('rss_mb', '-'):>8}")
+    for error in reporte["errores_ejemplo"]:
+        print(f"⚠ {error}")
+
+
+def comparar_reportes(ruta_a, ruta_b):
+    """Tabla antes/después por acción (p50, p95, errores) y recursos del servidor."""
+    with open(ruta_a, encoding="utf-8") as f:
+        a = json.load(f)
+    with open(ruta_b, encoding="utf-8") as f:
+        b = json.load(f)
+    distintas = {k: (a["config"].get(k), v) for k, v in b["config"].items() if a["config"].get(k) != v}
+    print(f"A: {ruta_a} (commit {a['commit']})\nB: {ruta_b} (commit {b['commit']})")
+    if distintas:
+        print(f"⚠ Configuraciones distintas (la comparación no es directa): {distintas}")
+
+    def delta(x, y):
+        return f"{(y - x) / x:+.0%}" if isinstance(x, (int, float)) and isinstance(y, (int, float)) and x else ""
+
+    print(f"\n{'acción':<40} {'p50 A':>8} {'p50 B':>8} {'Δ':>6} {'p95 A':>8} {'p95 B':>8} {'Δ':>6} {'err A':>6} {'err B':>6}")
+    filas = [("TOTAL (interacciones)", a["resumen"], b["resumen"])]
+    filas += [(accion, a["por_accion"].get(accion, {}), b["por_accion"].get(accion, {}))
+              for accion in dict.fromkeys(list(a["por_accion"]) + list(b["por_accion"]))]
+    for accion, x, y in filas:
+        print(f"{accion[:40]:<40} {x.get('p50_ms', '-'):>8} {y.get('p50_ms', '-'):>8} {delta(x.get('p50_ms'), y.get('p50_ms')):>6} "
+              f"{x.get('p95_ms', '-'):>8} {y.get('p95_ms', '-'):>8} {delta(x.get('p95_ms'), y.get('p95_ms')):>6} "
+              f"{x.get('tasa_error', 0):>6.1%} {y.get('tasa_error', 0):>6.1%}")
+    print()
+    for clave in ("cpu_pct_media", "cpu_pct_max", "rss_mb_max", "pss_mb_max"):
+        x, y = a["recursos"].get(clave), b["recursos"].get(clave)
+        print(f"{clave:<20} {x!s:>10} {y!s:>10} {delta(x, y):>6}")
+    print(f"{'interacciones_por_s':<20} {a['resumen']['interacciones_por_s']:>10} {b['resumen']['interacciones_por_s']:>10} "
+          f"{delta(a['resumen']['interacciones_por_s'], b['resumen']['interacciones_por_s']):>6}")
+
+
+# =============================
+# ▶️ EJECUCIÓN
+# =============================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Prueba de carga local de los dashboards (sesiones concurrentes simuladas)")
+    parser.add_argument("--app", choices=list(APPS), default="dash")
+    parser.add_argument("--sesiones", type=int, default=SESIONES, help="Analistas simultáneos.")
+    parser.add_argument("--duracion", type=int, default=DURACION_S, help="Segundos de carga sostenida (después de la rampa).")
+    parser.add_argument("--rampa", type=float, default=RAMPA_S, help="Segundos en los que arrancan todas las sesiones.")
+    parser.add_argument("--pausa", type=float, default=PAUSA_S, help="Pausa media entre interacciones de una sesión (s).")
+    parser.add_argument("--ventas", type=int, default=VENTAS, help="Tamaño del dataset sintético (ventas; ~3 líneas cada una).")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--con-resumen", action="store_true", help="Servir con resumen_dashboard.json precalculado (dash/streamlit).")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de gunicorn para dash (requiere gunicorn).")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_S)
+    parser.add_argument("--puerto", type=int, default=None, help="Puerto del servidor (por defecto uno libre).")
+    parser.add_argument("--salida", default=CARPETA_REPORTES, help="Carpeta de los reportes JSON.")
+    parser.add_argument("--comparar", nargs=2, metavar=("A.json", "B.json"), help="Comparar dos reportes y salir.")
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar_reportes(*args.comparar)
+        sys.exit(0)
+
+    reporte = prueba_de_carga(
+        app=args.app, sesiones=args.sesiones, duracion=args.duracion, rampa=args.rampa, pausa=args.pausa,
+        ventas=args.ventas, semilla=args.semilla, con_resumen=args.con_resumen, workers=args.workers,
+        timeout=args.timeout, puerto=args.puerto,
+    )
+    imprimir_reporte(reporte)
+    print(f"\nReporte guardado en {guardar_reporte(reporte, args.salida)}")
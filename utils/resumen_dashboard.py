@@ -0,0 +1,209 @@
+# ======================================
+# 📋 RESUMEN PRECALCULADO PARA LOS DASHBOARDS - PROYECTO G25
+# ======================================
+# Los dashboards recalculaban en cada carga sumas, nunique y groupbys sobre la tabla de
+# hechos completa. El pipeline (proyecto_aurelion.py) los calcula una vez y los guarda
+# en resumen_dashboard.json:
+#   - kpis: unidades, importe, ventas, productos, clientes (y clientes registrados);
+#     con la tabla de ventas, "ventas" es len(ventas) como el "Total Ventas" original
+#     (también cuenta las ventas sin líneas) y "clientes_con_ventas" sale de ventas
+#   - series listas para graficar: por producto, por cliente, por categoría, total
+#     mensual y por producto x mes / x día (para el detalle de un producto)
+#   - figuras (opcional, --figuras): JSON de Plotly que el dashboard muestra sin armarlas
+#   - huella: sha256 de cada Excel de origen
+# leer_resumen() devuelve None si el archivo no existe, es de otro formato o los Excel
+# cambiaron desde que se generó: el dashboard arma entonces el mismo resumen en vivo
+# con construir_resumen(), así que los gráficos salen siempre del mismo código.
+# La tabla de hechos también es una sola (construir_hechos): el pipeline y el cálculo
+# en vivo de los dashboards parten de los 4 Excel y llegan a los mismos KPIs.
+# Lo usan proyecto_aurelion.py, dashboard_dash.py y dashboard_streamlit.py.
+# ======================================
+
+import hashlib
+import importlib.util
+import json
+import os
+import time
+import uuid
+
+import pandas as pd
+
+PATH_RESUMEN = "./resumen_dashboard.json"
+FORMATO = 2  # se incrementa si cambia la estructura: un resumen viejo se ignora
+PLOTLY_AVAILABLE = importlib.util.find_spec("plotly") is not None
+
+# Series guardadas; "periodo" es siempre una fecha
+SERIES_FECHA = ("mensual_total", "mensual", "diaria")
+
+
+def huella_contenido(rutas):
+    """sha256 del contenido de cada archivo, por nombre (las copias en otra carpeta coinciden)."""
+    huella = {}
+    for ruta in rutas:
+        digest = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                digest.update(bloque)
+        huella[os.path.basename(ruta)] = digest.hexdigest()
+    return huella
+
+
+def construir_hechos(ventas, detalle, productos=None, clientes=None):
+    """
+    Tabla de hechos de los resúmenes: una fila por línea de detalle con la fecha y el
+    cliente de su venta (una venta sin líneas no vendió nada; una línea sin venta no
+    tiene fecha), la categoría del producto y el nombre del cliente.
+    importe: la columna del detalle; si no está, cantidad * precio_unitario (el del
+    detalle o, si falta, el de productos).
+    """
+    ventas = ventas.rename(columns={"fecha_venta": "fecha"}) if "fecha" not in ventas.columns else ventas
+    cabecera = ventas[[c for c in ("id_venta", "fecha", "id_cliente", "nombre_cliente") if c in ventas.columns]]
+    hechos = detalle.drop(columns=[c for c in cabecera.columns if c != "id_venta"], errors="ignore")
+    hechos = hechos.merge(cabecera, on="id_venta", how="inner")
+
+    if productos is not None:
+        catalogo = productos[[c for c in ("id_producto", "nombre_producto", "categoria", "precio_unitario") if c in productos.columns]]
+        hechos = hechos.merge(catalogo.drop(columns=[c for c in hechos.columns if c != "id_producto"], errors="ignore"),
+                              on="id_producto", how="left")
+        catalogo = catalogo.set_index("id_producto")
+        for col in ("nombre_producto", "precio_unitario"):
+            if col in catalogo.columns:
+                hechos[col] = hechos[col].fillna(hechos["id_producto"].map(catalogo[col]))
+    if clientes is not None and "nombre_cliente" not in hechos.columns and "nombre_cliente" in clientes.columns:
+        hechos = hechos.merge(clientes[["id_cliente", "nombre_cliente"]], on="id_cliente", how="left")
+
+    if "importe" not in hechos.columns:
+        hechos["importe"] = hechos["cantidad"] * hechos["precio_unitario"]
+    hechos["fecha"] = pd.to_datetime(hechos["fecha"])
+    columnas = ["fecha", "id_venta", "id_cliente", "nombre_cliente", "id_producto", "nombre_producto",
+                "categoria", "cantidad", "importe"]
+    return hechos[[c for c in columnas if c in hechos.columns]]
+
+
+def construir_resumen(hechos, clientes=None, importe="importe", huella=None, figuras=False, ventas=None):
+    """
+    KPIs y series de la tabla de hechos (una fila por línea de venta, ver construir_hechos)
+    con las columnas fecha, id_venta, id_cliente, id_producto, nombre_producto, cantidad
+    y `importe`; nombre_cliente y categoria son opcionales (sin ellas no se arma esa serie).
+    Con `ventas`, kpis["ventas"] cuenta todas las ventas (también las que no tienen líneas)
+    y kpis["clientes_con_ventas"] los clientes de esas ventas, como los KPIs originales
+    de los dashboards y del pipeline (merge left desde ventas).
+    """
+    fecha = pd.to_datetime(hechos["fecha"])
+    valores = pd.DataFrame({"cantidad": hechos["cantidad"], "importe": hechos[importe]})
+
+    def por(*claves):
+        return valores.groupby(list(claves)).sum().reset_index()
+
+    mes = fecha.dt.to_period("M").dt.to_timestamp().rename("periodo")
+    series = {
+        "productos": por(hechos["nombre_producto"]),
+        "mensual_total": por(mes),
+        "mensual": por(mes, hechos["nombre_producto"]),
+        "diaria": por(fecha.dt.normalize().rename("periodo"), hechos["nombre_producto"]),
+    }
+    if "nombre_cliente" in hechos.columns:
+        series["clientes"] = por(hechos["nombre_cliente"])
+    if "categoria" in hechos.columns:
+        series["categorias"] = por(hechos["categoria"])
+
+    kpis = {
+        "unidades": valores["cantidad"].sum(),
+        "importe": valores["importe"].sum(),
+        "ventas": len(ventas) if ventas is not None else hechos["id_venta"].nunique(),
+        "productos": hechos["id_producto"].nunique(),
+        "clientes": hechos["id_cliente"].nunique(),
+    }
+    if clientes is not None:
+        kpis["clientes_registrados"] = len(clientes)
+    if ventas is not None:
+        kpis["clientes_con_ventas"] = ventas["id_cliente"].nunique()
+
+    resumen = {
+        "formato": FORMATO,
+        "creado": time.time(),
+        "origen": "en vivo",
+        "huella": huella or {},
+        "kpis": {clave: valor.item() if hasattr(valor, "item") else valor for clave, valor in kpis.items()},
+        "series": series,
+        "figuras": {},
+    }
+    if figuras and PLOTLY_AVAILABLE:
+        resumen["figuras"]["top_productos"] = json.loads(fig_top_productos(resumen).to_json())
+    return resumen
+
+
+# =============================
+# Figuras serializables
+# =============================
+
+def top_productos(resumen, por="cantidad", n=10):
+    return resumen["series"]["productos"].sort_values(por, ascending=False).head(n)
+
+
+def fig_top_productos(resumen):
+    """Top 10 productos por cantidad (el gráfico de barras de dashboard_streamlit.py)."""
+    import plotly.express as px
+
+    return px.bar(top_productos(resumen), x="nombre_producto", y="cantidad", color="cantidad",
+                  color_continuous_scale="blues", title="Top 10 Productos por Cantidad Vendida")
+
+
+def figura(resumen, nombre):
+    """Figura precalculada (dict de Plotly) o None si el resumen no la trae."""
+    return resumen["figuras"].get(nombre)
+
+
+# =============================
+# Lectura y escritura
+# =============================
+
+def guardar_resumen(resumen, ruta=PATH_RESUMEN):
+    """Escribe el resumen como JSON (tmp + os.replace: un lector nunca ve un archivo a medias)."""
+    contenido = {clave: valor for clave, valor in resumen.items() if clave not in ("series", "origen")}
+    contenido["series"] = {
+        nombre: json.loads(serie.to_json(orient="split", index=False, date_format="iso"))
+        for nombre, serie in resumen["series"].items()
+    }
+    tmp = f"{ruta}.{uuid.uuid4().hex[:6]}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(contenido, f, ensure_ascii=False)
+    os.replace(tmp, ruta)
+    return ruta
+
+
+def leer_resumen(ruta=PATH_RESUMEN, carpeta_datos=None):
+    """
+    Resumen guardado por el pipeline, o None si falta, es de otro formato o (con
+    carpeta_datos) algún Excel de la huella cambió: en ese caso hay que calcular en vivo.
+    """
+    if not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            contenido = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠ Resumen ilegible ({e}): se calcula en vivo")
+        return None
+    if contenido.get("formato") != FORMATO:
+        return None
+    if carpeta_datos is not None:
+        rutas = [os.path.join(carpeta_datos, nombre) for nombre in contenido["huella"]]
+        if not all(os.path.exists(r) for r in rutas) or huella_contenido(rutas) != contenido["huella"]:
+            print("⚠ Resumen desactualizado (cambiaron los Excel): se calcula en vivo")
+            return None
+
+    series = {}
+    for nombre, datos in contenido["series"].items():
+        serie = pd.DataFrame(datos["data"], columns=datos["columns"])
+        if nombre in SERIES_FECHA:
+            serie["periodo"] = pd.to_datetime(serie["periodo"]).dt.tz_localize(None)
+        series[nombre] = serie
+    return {**contenido, "series": series, "origen": "pipeline"}
+
+
+def matriz_mensual(resumen, valor="cantidad"):
+    """Matriz producto x mes del resumen: lo mismo que alertas.serie_mensual sobre los hechos."""
+    mensual = resumen["series"]["mensual"]
+    matriz = mensual.set_index(["nombre_producto", "periodo"])[valor].rename_axis(["nombre_producto", "mes"])
+    return matriz.unstack("mes", fill_value=0).sort_index(axis=1)
@@ -0,0 +1,241 @@
+# ======================================
+# 🧠 TABLA DE HECHOS COMPARTIDA ENTRE WORKERS - PROYECTO G25
+# ======================================
+# Con varios workers (gunicorn dashboard_dash:server -w N) cada proceso armaba su propia
+# copia del DataFrame unificado. Acá la tabla se escribe UNA vez como archivo Arrow sin
+# comprimir (en /dev/shm si existe: memoria, sin disco) y cada worker la mapea (mmap):
+#   - numéricos y fechas: arrays NumPy que apuntan directo al mapa (cero copias)
+#   - textos: columnas str respaldadas por Arrow sobre el mismo mapa (cero copias)
+#   - las páginas las comparte el sistema operativo: la memoria no crece con los workers
+# El archivo lleva la huella de los Excel de origen en el nombre: el worker que toma el
+# lock (archivo creado con O_EXCL) lo arma y lo publica (escritura atómica); los demás
+# esperan y sólo lo mapean. Si /dev/shm se llena o no se puede escribir, cada worker
+# sigue con su copia privada.
+# Los arrays mapeados son de sólo lectura: los dashboards no modifican el DataFrame.
+# Desde que los dashboards leen resumen_dashboard.json la tabla sólo se arma cuando el
+# resumen falta o quedó viejo: cada worker la mapea, calcula el resumen y la suelta.
+#
+# Benchmark de arranque y memoria (PSS) por cantidad de workers:
+#   python tabla_compartida.py --filas 2000000 --workers 1 2 4 8
+# ======================================
+
+import glob
+import importlib.util
+import os
+import tempfile
+import time
+import uuid
+
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+CARPETA = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "aurelion")
+ESPERA_MAX_S = 120   # lo que un worker espera a que otro publique la tabla
+ESPERA_LOCK_S = 0.1  # intervalo entre revisiones mientras espera
+
+
+def _ruta(nombre, version, carpeta):
+    return os.path.join(carpeta, f"{nombre}-{version}.arrow")
+
+
+def publicar(df, nombre, version, carpeta=CARPETA):
+    """Escribe df como Arrow IPC sin comprimir (tmp + os.replace) y borra versiones anteriores."""
+    import pyarrow as pa
+
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = _ruta(nombre, version, carpeta)
+    tabla = pa.Table.from_pandas(df.rename(columns=str), preserve_index=False).combine_chunks()
+    # pandas guarda los str como large_string: escribirlos así evita un cast (copia) al mapear
+    tabla = tabla.cast(pa.schema([
+        campo.with_type(pa.large_string()) if pa.types.is_string(campo.type) else campo for campo in tabla.schema
+    ]))
+    tmp = f"{ruta}.{uuid.uuid4().hex[:6]}.tmp"
+    try:
+        with pa.OSFile(tmp, "wb") as f, pa.ipc.new_file(f, tabla.schema) as writer:
+            writer.write_table(tabla)
+        os.replace(tmp, ruta)
+    except OSError:
+        _borrar(tmp)  # un archivo a medio escribir no debe seguir ocupando /dev/shm
+        raise
+    # Los workers que todavía mapean una versión vieja la siguen leyendo (Linux: unlink no la invalida)
+    for vieja in glob.glob(os.path.join(carpeta, f"{nombre}-*.arrow")):
+        if vieja != ruta:
+            try:
+                os.remove(vieja)
+            except OSError:
+                pass
+    return ruta
+
+
+def adjuntar(ruta):
+    """DataFrame sobre el archivo mapeado; las columnas con nulos (o bool) se copian."""
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+    tabla = pa.ipc.open_file(pa.memory_map(ruta)).read_all()
+    columnas = {}
+    for nombre in tabla.column_names:
+        columna = tabla.column(nombre)
+        if pa.types.is_string(columna.type) or pa.types.is_large_string(columna.type):
+            columnas[nombre] = columna.to_pandas(types_mapper={columna.type: pd.StringDtype("pyarrow", na_value=np.nan)}.get)
+            continue
+        try:
+            columnas[nombre] = columna.chunk(0).to_numpy(zero_copy_only=True) if columna.num_chunks == 1 else None
+        except pa.ArrowInvalid:
+            columnas[nombre] = None
+        if columnas[nombre] is None:
+            columnas[nombre] = columna.to_pandas()
+    return pd.DataFrame(columnas, copy=False)
+
+
+def cargar_compartida(nombre, version, construir, carpeta=CARPETA, espera_max_s=ESPERA_MAX_S):
+    """
+    La tabla `nombre` en la versión dada: se mapea si ya existe; si no, la arma un solo
+    worker (el que crea el lock con O_EXCL) y los demás esperan a que la publique.
+    Si la carpeta compartida falla (sin espacio en /dev/shm, sin permisos) o la espera
+    vence, se devuelve una copia privada de construir().
+    """
+    ruta = _ruta(nombre, version, carpeta)
+    lock = f"{ruta}.lock"
+    limite = time.monotonic() + espera_max_s
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+        while not os.path.exists(ruta):
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # Otro worker la está armando; un lock más viejo que la espera máxima quedó
+                # de un worker que murió a mitad de camino
+                if _edad_s(lock) > espera_max_s:
+                    _borrar(lock)
+                elif time.monotonic() > limite:
+                    print(f"⚠ Tabla compartida {nombre}: vence la espera del lock; se arma una copia privada")
+                    return construir()
+                else:
+                    time.sleep(ESPERA_LOCK_S)
+                continue
+            os.close(fd)
+            try:
+                if not os.path.exists(ruta):
+                    df = construir()
+                    try:
+                        publicar(df, nombre, version, carpeta)
+                    except OSError as e:
+                        print(f"⚠ Tabla compartida {nombre}: no se pudo publicar ({e}); se usa una copia privada")
+                        return df
+            finally:
+                _borrar(lock)
+        return adjuntar(ruta)
+    except OSError as e:
+        print(f"⚠ Tabla compartida {nombre}: {e}; se arma una copia privada")
+        return construir()
+
+
+def _edad_s(ruta):
+    try:
+        return time.time() - os.path.getmtime(ruta)
+    except OSError:
+        return 0.0
+
+
+def _borrar(ruta):
+    try:
+        os.remove(ruta)
+    except OSError:
+        pass
+
+
+# ======================================
+# Benchmark: copia por worker vs tabla compartida
+# ======================================
+def _memoria_mb():
+    """RSS y PSS (memoria proporcional: las páginas compartidas se reparten entre procesos)."""
+    valores = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for linea in f:
+            partes = linea.split()
+            if partes[0] in ("Rss:", "Pss:"):
+                valores[partes[0][:-1].lower()] = int(partes[1]) / 1024
+    return valores
+
+
+def _sintetica(filas, seed=0):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    clientes = np.array([f"Cliente {i}" for i in range(5000)], dtype=object)
+    productos = np.array([f"Producto {i}" for i in range(2000)], dtype=object)
+    id_cliente = rng.integers(0, len(clientes), filas)
+    id_producto = rng.integers(0, len(productos), filas)
+    cantidad = rng.integers(1, 10, filas)
+    precio = rng.integers(500, 9000, filas)
+    return pd.DataFrame({
+        "id_venta": np.arange(filas) // 3,
+        "fecha": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 5 * 365, filas), unit="D"),
+        "id_cliente": id_cliente,
+        "nombre_cliente": pd.array(clientes[id_cliente], dtype="str"),
+        "medio_pago": pd.array(rng.choice(["efectivo", "tarjeta", "qr", "transferencia"], filas), dtype="str"),
+        "id_producto": id_producto,
+        "nombre_producto": pd.array(productos[id_producto], dtype="str"),
+        "categoria": pd.array(rng.choice(["Alimentos", "Limpieza"], filas), dtype="str"),
+        "cantidad": cantidad,
+        "precio_unitario": precio,
+        "total": (cantidad * precio).astype("float64"),
+    })
+
+
+def _worker(modo, ruta, barrera, cola):
+    import pandas as pd
+    import pyarrow as pa
+
+    base = _memoria_mb()
+    t0 = time.perf_counter()
+    if modo == "compartida":
+        df = adjuntar(ruta)
+    else:  # cada worker con su copia privada, como sin este módulo
+        with pa.OSFile(ruta) as f:
+            df = pa.ipc.open_file(f).read_all().to_pandas()
+    # Tocar todas las columnas (las páginas quedan residentes), como al armar los gráficos
+    df.groupby("nombre_producto")["total"].sum()
+    df["id_cliente"].nunique()
+    df["fecha"].dt.to_period("M").nunique()
+    arranque = time.perf_counter() - t0
+    barrera.wait()  # todos los workers vivos y con los datos cargados al medir
+    memoria = _memoria_mb()
+    cola.put({"arranque_s": arranque, "pss_mb": memoria["pss"], "datos_pss_mb": memoria["pss"] - base["pss"],
+              "rss_mb": memoria["rss"]})
+    barrera.wait()
+    del df, pd
+
+
+if __name__ == "__main__":
+    import argparse
+    import multiprocessing as mp
+
+    parser = argparse.ArgumentParser(description="Arranque y memoria por worker: copia privada vs tabla compartida")
+    parser.add_argument("--filas", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    df = _sintetica(args.filas)
+    t0 = time.perf_counter()
+    ruta = publicar(df, "benchmark", "sintetica")
+    print(f"Tabla sintética: {args.filas:,} filas, {df.memory_usage(deep=True).sum() / 2**20:.0f} MB en pandas; "
+          f"publicada en {ruta} ({os.path.getsize(ruta) / 2**20:.0f} MB) en {time.perf_counter() - t0:.2f} s")
+    del df
+
+    ctx = mp.get_context("spawn")
+    print(f"\n{'workers':>7} {'modo':>11} {'arranque medio':>15} {'PSS total':>10} {'PSS datos':>10} {'RSS suma':>9}")
+    for n in args.workers:
+        for modo in ("copia", "compartida"):
+            barrera, cola = ctx.Barrier(n), ctx.Queue()
+            procesos = [ctx.Process(target=_worker, args=(modo, ruta, barrera, cola)) for _ in range(n)]
+            for p in procesos:
+                p.start()
+            res = [cola.get() for _ in range(n)]
+            for p in procesos:
+                p.join()
+            print(f"{n:>7} {modo:>11} {sum(r['arranque_s'] for r in res) / n:>13.2f} s"
+                  f" {sum(r['pss_mb'] for r in res):>7.0f} MB {sum(r['datos_pss_mb'] for r in res):>7.0f} MB"
+                  f" {sum(r['rss_mb'] for r in res):>6.0f} MB")
+    os.remove(ruta)
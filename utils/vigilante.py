@@ -0,0 +1,167 @@
+# ======================================
+# 👀 VIGILANTE DE DATOS - PROYECTO G25
+# ======================================
+# Recarga en segundo plano los datos de los dashboards cuando cambian los archivos:
+#   - cada "tarea" tiene sus archivos (globs) y su función de carga; si cambian los
+#     archivos de una tarea, sólo esa se vuelve a calcular
+#   - el cálculo corre en un hilo aparte; los requests siguen leyendo la versión
+#     anterior hasta que la nueva está completa y se reemplaza de una vez (atómico)
+#   - debounce: una ráfaga de escrituras (Excel guarda en varios pasos) dispara una
+#     sola recarga, cuando los archivos dejan de cambiar por DEBOUNCE_S segundos
+#   - version: hash de (ruta, tamaño, mtime) de todos los archivos vigilados; es la
+#     misma en todos los procesos que ven los mismos archivos
+#   - con watchdog instalado los eventos del sistema de archivos despiertan al hilo
+#     al instante; sin watchdog se revisa cada INTERVALO_S segundos
+# Si una recarga falla (archivo a medio escribir, columnas faltantes) se sigue sirviendo
+# la versión anterior y se reintenta cuando los archivos vuelvan a cambiar.
+# Lo usan dashboard_dash.py y dashboard_streamlit.py.
+# ======================================
+
+import glob
+import hashlib
+import importlib.util
+import os
+import threading
+import time
+from collections import namedtuple
+
+INTERVALO_S = 2.0   # revisión periódica (también con watchdog, por si se pierde un evento)
+DEBOUNCE_S = 1.0    # los archivos tienen que quedar quietos este tiempo antes de recargar
+WATCHDOG_AVAILABLE = importlib.util.find_spec("watchdog") is not None
+
+Snapshot = namedtuple("Snapshot", ["version", "datos", "cargado"])
+
+
+class VigilanteDatos:
+    """
+    tareas: dict nombre -> (lista de rutas o globs, función sin argumentos que carga los datos).
+    La primera llamada a snapshot() carga todo (en el hilo que la pide) e inicia el vigilante.
+    """
+
+    def __init__(self, tareas, intervalo_s=INTERVALO_S, debounce_s=DEBOUNCE_S):
+        self.tareas = tareas
+        self.intervalo_s = intervalo_s
+        self.debounce_s = debounce_s
+        self._snapshot = None
+        self._firmas = {}
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self.recargas = 0
+        self.ultimo_error = None
+
+    # --- lectura (no bloquea salvo la primera vez) ---
+    def snapshot(self):
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    firmas = self._firmas_actuales()
+                    datos = {nombre: construir() for nombre, (_, construir) in self.tareas.items()}
+                    self._firmas = firmas
+                    self._snapshot = Snapshot(_version(firmas), datos, time.time())
+                    self._iniciar()
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self.snapshot().version
+
+    def datos(self, nombre):
+        return self.snapshot().datos[nombre]
+
+    # --- hilo vigilante ---
+    def _iniciar(self):
+        threading.Thread(target=self._vigilar, daemon=True, name="vigilante-datos").start()
+        if WATCHDOG_AVAILABLE:
+            self._iniciar_watchdog()
+
+    def _iniciar_watchdog(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        despertar = self._despertar
+
+        class _Aviso(FileSystemEventHandler):
+            def on_any_event(self, event):
+                despertar.set()
+
+        carpetas = {os.path.dirname(os.path.abspath(p)) for patrones, _ in self.tareas.values() for p in patrones}
+        observer = Observer()
+        observer.daemon = True
+        for carpeta in carpetas:
+            if os.path.isdir(carpeta):
+                observer.schedule(_Aviso(), carpeta, recursive=False)
+        observer.start()
+
+    def detener(self):
+        self._detener.set()
+        self._despertar.set()
+
+    def _vigilar(self):
+        while not self._detener.is_set():
+            self._despertar.wait(self.intervalo_s)
+            self._despertar.clear()
+            firmas = self._firmas_actuales()
+            if firmas == self._firmas:
+                continue
+            # Debounce: esperar a que los archivos dejen de cambiar
+            while not self._detener.is_set():
+                time.sleep(self.debounce_s)
+                nuevas = self._firmas_actuales()
+                if nuevas == firmas:
+                    break
+                firmas = nuevas
+            self._recargar(firmas)
+
+    def _recargar(self, firmas):
+        cambiadas = [nombre for nombre in self.tareas if firmas[nombre] != self._firmas.get(nombre)]
+        datos = dict(self._snapshot.datos)
+        try:
+            for nombre in cambiadas:
+                datos[nombre] = self.tareas[nombre][1]()
+        except Exception as e:
+            self.ultimo_error = f"{type(e).__name__}: {e}"
+            print(f"⚠ Vigilante: no se pudo recargar {cambiadas} ({self.ultimo_error}); se mantiene la versión anterior")
+            self._firmas = firmas  # no reintentar hasta el próximo cambio
+            return
+        self._firmas = firmas
+        self._snapshot = Snapshot(_version(firmas), datos, time.time())  # reemplazo atómico
+        self.recargas += 1
+        self.ultimo_error = None
+        print(f"🔄 Vigilante: recargado {', '.join(cambiadas)} (versión {self._snapshot.version})")
+
+    def _firmas_actuales(self):
+        return {nombre: _firma(patrones) for nombre, (patrones, _) in self.tareas.items()}
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "cargado": snapshot.cargado if snapshot else None,
+            "recargas": self.recargas,
+            "ultimo_error": self.ultimo_error,
+            "watchdog": WATCHDOG_AVAILABLE,
+        }
+
+
+def _firma(patrones):
+    """(ruta, tamaño, mtime) de cada archivo que coincide con los patrones."""
+    firma = []
+    for patron in patrones:
+        rutas = sorted(glob.glob(patron)) if glob.has_magic(patron) else [patron]
+        for ruta in rutas:
+            try:
+                stat = os.stat(ruta)
+                firma.append((ruta, stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                firma.append((ruta, None, None))
+    return tuple(firma)
+
+
+def huella_archivos(patrones):
+    """Hash de (ruta, tamaño, mtime) de los archivos: cambia si cambia alguno de ellos."""
+    return hashlib.sha1(repr(_firma(patrones)).encode()).hexdigest()[:12]
+
+
+def _version(firmas):
+    return hashlib.sha1(repr(sorted(firmas.items())).encode()).hexdigest()[:12]